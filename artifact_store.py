@@ -0,0 +1,163 @@
+# artifact_store.py
+"""
+ARMAZÉM DE ARTEFATOS ENDEREÇADO POR CONTEÚDO
+
+Responsável por:
+- Guardar relatórios (output_files) e logs do Quartus por chave de build
+- Índice com tamanho e último acesso de cada objeto
+- Remoção LRU quando o armazém excede o tamanho máximo
+- Escritas concorrentes seguras (publicação atômica via rename + lock do índice)
+
+Estrutura:
+    <ARTIFACT_STORE_DIR>/
+        index.json
+        objects/<ab>/<chave>/output_files/...
+        objects/<ab>/<chave>/logs/quartus_*.log
+"""
+
+import shutil
+import time
+import uuid
+from pathlib import Path
+from typing import Any
+
+import compile
+import config
+import resources
+
+# =============================================================================
+# CAMINHOS
+# =============================================================================
+
+def _objects_dir() -> Path:
+    return config.ARTIFACT_STORE_DIR / "objects"
+
+def _object_dir(key: str) -> Path:
+    return _objects_dir() / key[:2] / key
+
+def _index_path() -> Path:
+    return config.ARTIFACT_STORE_DIR / "index.json"
+
+def _index_lock_path() -> Path:
+    return config.ARTIFACT_STORE_DIR / "index.lock"
+
+def _dir_size(path: Path) -> int:
+    return sum(f.stat().st_size for f in path.rglob("*") if f.is_file())
+
+# =============================================================================
+# ÍNDICE
+# =============================================================================
+
+def _update_index(key: str, **fields: Any):
+    """Atualiza (ou cria) a entrada de um objeto no índice."""
+    with resources.file_lock(_index_lock_path()):
+        index = resources.read_json(_index_path())
+        entry = index.setdefault(key, {})
+        entry.update(fields)
+        resources.write_json_atomic(_index_path(), index)
+
+def evict(max_bytes: int = None) -> int:
+    """Remove objetos menos usados recentemente até caber em max_bytes."""
+    if max_bytes is None:
+        max_bytes = config.ARTIFACT_STORE_MAX_BYTES
+
+    removed = 0
+    with resources.file_lock(_index_lock_path()):
+        index = resources.read_json(_index_path())
+
+        # Descarta entradas cujo objeto sumiu
+        index = {key: entry for key, entry in index.items() if _object_dir(key).exists()}
+
+        total = sum(entry.get("size", 0) for entry in index.values())
+        for key in sorted(index, key=lambda k: index[k].get("last_access", 0)):
+            if total <= max_bytes:
+                break
+            total -= index[key].get("size", 0)
+            shutil.rmtree(_object_dir(key), ignore_errors=True)
+            del index[key]
+            removed += 1
+
+        resources.write_json_atomic(_index_path(), index)
+
+    if removed:
+        print(f"🧹 Armazém de artefatos: {removed} objeto(s) removido(s) (LRU)")
+    return removed
+
+# =============================================================================
+# PUBLICAÇÃO E RECUPERAÇÃO
+# =============================================================================
+
+def publish(key: str, work_dir: Path, module_name: str, N: Any) -> bool:
+    """Publica output_files e logs de uma compilação bem-sucedida.
+
+    Só objetos completos (com o .pow.rpt) são publicados: a chave de build
+    não inclui o modo de potência, e um objeto sem potência (--no-power ou
+    quartus_pow com falha) seria recuperado depois no lugar de uma
+    compilação com potência.
+    """
+    if not config.ARTIFACT_STORE_ENABLED:
+        return False
+
+    out_dir = work_dir / "output_files"
+    if not (out_dir / f"{module_name}.pow.rpt").exists():
+        return False
+
+    object_dir = _object_dir(key)
+    if object_dir.exists():
+        _update_index(key, last_access=time.time())
+        return True
+
+    # Monta o objeto em diretório temporário e publica com rename atômico
+    object_dir.parent.mkdir(parents=True, exist_ok=True)
+    staging_dir = object_dir.parent / f".tmp-{uuid.uuid4().hex}"
+    try:
+        shutil.copytree(out_dir, staging_dir / "output_files")
+        logs_dir = staging_dir / "logs"
+        logs_dir.mkdir()
+        for log_file in work_dir.glob("quartus_*.log"):
+            shutil.copy2(log_file, logs_dir / log_file.name)
+        staging_dir.rename(object_dir)
+    except OSError:
+        # Outro escritor publicou a mesma chave primeiro (ou falha de I/O)
+        shutil.rmtree(staging_dir, ignore_errors=True)
+        return object_dir.exists()
+
+    _update_index(
+        key, size=_dir_size(object_dir), last_access=time.time(),
+        module=module_name, N=N, created=time.time()
+    )
+    print(f"📦 Artefatos publicados: {module_name} (N={N}) [{key[:12]}]")
+    evict()
+    return True
+
+def fetch(key: str, work_dir: Path, module_name: str, N: Any) -> bool:
+    """Copia artefatos do armazém para o diretório de trabalho, se existirem.
+
+    O manifesto de estágios (e o db/ local) não corresponde aos relatórios
+    recuperados: o manifesto é removido para que a próxima execução em
+    estágios refaça tudo em vez de pular ou retomar o estágio errado.
+    """
+    if not config.ARTIFACT_STORE_ENABLED:
+        return False
+
+    object_dir = _object_dir(key)
+    if not (object_dir / "output_files").exists():
+        return False
+
+    out_dir = work_dir / "output_files"
+    try:
+        if out_dir.exists():
+            shutil.rmtree(out_dir)
+        shutil.copytree(object_dir / "output_files", out_dir)
+        for log_file in (object_dir / "logs").glob("*.log"):
+            shutil.copy2(log_file, work_dir / log_file.name)
+    except OSError as e:
+        # Objeto removido por outro processo durante a cópia
+        print(f"⚠️ Falha ao recuperar artefatos de {module_name} (N={N}): {e}")
+        shutil.rmtree(out_dir, ignore_errors=True)
+        return False
+
+    (work_dir / compile.STAGE_MANIFEST_NAME).unlink(missing_ok=True)
+    _update_index(key, last_access=time.time())
+    print(f"📦 Artefatos recuperados do armazém: {module_name} (N={N}) [{key[:12]}]")
+    return True
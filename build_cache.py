@@ -0,0 +1,146 @@
+# build_cache.py
+"""
+CACHE INCREMENTAL DE COMPILAÇÃO
+
+Responsável por:
+- Chave de build por hash de conteúdo (RTL + dependências transitivas,
+  SDC, texto do QSF gerado e N)
+- Manifesto por projeto/variante (.build_manifest.json)
+- Decisão de reaproveitar output_files em vez de recompilar no Quartus
+- Snapshot das fontes para detectar execuções em que só testbenches mudaram
+"""
+
+import hashlib
+import json
+import re
+import time
+from pathlib import Path
+from typing import List, Dict, Any, Optional
+
+import config
+import compile
+
+MANIFEST_NAME = ".build_manifest.json"
+
+# Linhas do QSF que não influenciam o resultado (ex.: orçamento de núcleos)
+_VOLATILE_QSF_LINES = re.compile(r"^.*NUM_PARALLEL_PROCESSORS.*$", re.MULTILINE)
+
+# =============================================================================
+# CHAVE DE BUILD
+# =============================================================================
+
+def _hash_file(hasher, file_path: Path):
+    """Adiciona nome e conteúdo de um arquivo ao hash."""
+    hasher.update(file_path.name.encode())
+    hasher.update(b"\0")
+    hasher.update(file_path.read_bytes() if file_path.exists() else b"<ausente>")
+    hasher.update(b"\0")
+
+def get_key_rtl_files(module_name: str, work_dir: Path, dependencies: Dict) -> List[Path]:
+    """Arquivos RTL do módulo e de suas dependências transitivas no diretório de trabalho."""
+    return compile.project_rtl_files(module_name, work_dir, dependencies)
+
+def compute_build_key(module_name: str, work_dir: Path, sdc_files: List[Path],
+                      qsf_text: str, N: Any, dependencies: Dict) -> str:
+    """Calcula a chave de conteúdo de uma compilação Quartus."""
+    hasher = hashlib.sha256()
+    hasher.update(f"quartus={config.QUARTUS_BIN}|top={module_name}|N={N}\n".encode())
+
+    for rtl_file in get_key_rtl_files(module_name, work_dir, dependencies):
+        _hash_file(hasher, rtl_file)
+
+    for sdc_file in sorted(sdc_files, key=lambda p: p.name):
+        _hash_file(hasher, sdc_file)
+
+    hasher.update(_VOLATILE_QSF_LINES.sub("", qsf_text).encode())
+    return hasher.hexdigest()
+
+# =============================================================================
+# MANIFESTO
+# =============================================================================
+
+def read_manifest(work_dir: Path) -> Optional[Dict]:
+    """Lê o manifesto de build de um diretório de trabalho."""
+    manifest_path = work_dir / MANIFEST_NAME
+    if not manifest_path.exists():
+        return None
+    try:
+        with open(manifest_path, "r", encoding="utf-8") as f:
+            return json.load(f)
+    except (OSError, ValueError):
+        return None
+
+def write_manifest(work_dir: Path, module_name: str, N: Any, key: str):
+    """Registra a chave da última compilação bem-sucedida."""
+    manifest = {
+        "module": module_name,
+        "N": N,
+        "key": key,
+        "built_at": time.strftime("%Y-%m-%d %H:%M:%S"),
+    }
+    with open(work_dir / MANIFEST_NAME, "w", encoding="utf-8") as f:
+        json.dump(manifest, f, indent=2)
+
+def invalidate(work_dir: Path):
+    """Remove o manifesto, forçando recompilação."""
+    manifest_path = work_dir / MANIFEST_NAME
+    if manifest_path.exists():
+        manifest_path.unlink()
+
+def is_up_to_date(work_dir: Path, module_name: str, key: str) -> bool:
+    """Verifica se a chave bate com o manifesto e se os relatórios ainda existem."""
+    if not config.BUILD_CACHE_ENABLED:
+        return False
+
+    manifest = read_manifest(work_dir)
+    if not manifest or manifest.get("key") != key:
+        return False
+
+    out_dir = work_dir / "output_files"
+    return (out_dir / f"{module_name}.fit.summary").exists()
+
+# =============================================================================
+# DETECÇÃO DE MUDANÇAS (PROJETO x TESTBENCH)
+# =============================================================================
+
+def _hash_tree(root: Path, patterns: List[str]) -> str:
+    """Hash do conteúdo de todos os arquivos de uma árvore que casam com os padrões."""
+    hasher = hashlib.sha256()
+    files = sorted({f for pattern in patterns for f in root.rglob(pattern) if f.is_file()})
+    for file_path in files:
+        hasher.update(str(file_path.relative_to(root)).encode())
+        hasher.update(b"\0")
+        _hash_file(hasher, file_path)
+    return hasher.hexdigest()
+
+def compute_source_snapshot() -> Dict[str, str]:
+    """Impressões digitais separadas das fontes de projeto e dos testbenches."""
+    design = hashlib.sha256()
+    design.update(_hash_tree(config.RTL_DIR, ["*.v", "*.sv"]).encode())
+    design.update(_hash_tree(config.SDC_DIR, ["*.sdc"]).encode())
+    if config.DEPENDENCIES_FILE.exists():
+        design.update(config.DEPENDENCIES_FILE.read_bytes())
+
+    return {
+        "design": design.hexdigest(),
+        "testbench": _hash_tree(config.TB_DIR, ["*.v", "*.sv"]),
+    }
+
+def load_source_snapshot() -> Optional[Dict[str, str]]:
+    """Snapshot salvo pela última execução completa bem-sucedida."""
+    try:
+        with open(config.SOURCE_SNAPSHOT_FILE, "r", encoding="utf-8") as f:
+            return json.load(f)
+    except (OSError, ValueError):
+        return None
+
+def save_source_snapshot(snapshot: Dict[str, str]):
+    """Salva o snapshot das fontes após uma execução completa bem-sucedida."""
+    config.SOURCE_SNAPSHOT_FILE.parent.mkdir(parents=True, exist_ok=True)
+    with open(config.SOURCE_SNAPSHOT_FILE, "w", encoding="utf-8") as f:
+        json.dump(snapshot, f, indent=2)
+
+def only_testbenches_changed(current: Dict[str, str]) -> bool:
+    """True se as fontes de projeto (RTL, SDC, dependências) não mudaram desde o último build."""
+    previous = load_source_snapshot()
+    return bool(previous) and previous.get("design") == current["design"]
@@ -9,15 +9,23 @@ Responsável por:
 - Processamento de parâmetros
 """
 
+import hashlib
+import io
+import json
 import os
-import subprocess
 import time
 import re
-import shutil
 from pathlib import Path
 from typing import List, Tuple, Set, Dict, Any
 
 import config
+import log_watcher
+import module_index
+import project_loader
+import resources
+import staging
+import tool_policy
+import tool_runner
 
 # =============================================================================
 # TIPOS DE DADOS
@@ -29,47 +37,40 @@ ProjectFiles = Tuple[Path, List[Path], List[Path]]  # (project_path, rtl_files,
 # EXECUÇÃO DE COMANDOS EXTERNOS
 # =============================================================================
 
-def run_cmd(cmd: List[str], logfile: Path) -> bool:
-    """Executa comando externo e salva log."""
+def run_cmd(cmd: List[str], logfile: Path, cwd: Path = None, key: str = None,
+            line_hook: tool_runner.LineHook = None) -> tool_policy.ToolOutcome:
+    """Executa comando externo transmitindo a saída para o log.
+
+    O diretório de trabalho é passado explicitamente ao processo filho (cwd),
+    sem alterar o diretório do interpretador, permitindo execuções concorrentes.
+    Com `key` (resources.job_key), o job passa pela admissão de memória, o
+    pico de RSS é registrado no histórico e o timeout é aprendido das
+    durações anteriores (tool_policy). `line_hook` recebe cada linha de
+    saída em tempo real.
+    """
     print(f"\n[EXECUTANDO] {' '.join(cmd)}")
-    start = time.time()
     
-    result = subprocess.run(cmd, capture_output=True, text=True)
-    elapsed = time.time() - start
-
-    # Salva log
-    with open(logfile, "w") as f:
-        f.write(result.stdout)
-        f.write(result.stderr)
-
-    if result.returncode != 0:
-        print(f"❌ Erro ({elapsed:.1f}s)")
-        print(result.stderr)
-        return False
+    outcome = tool_policy.run(cmd, logfile, cwd=cwd, key=key, line_hook=line_hook)
+    result = outcome.result
+
+    if outcome.classification == tool_policy.TIMEOUT:
+        print(f"⏰ TIMEOUT ({result.elapsed:.1f}s, limite {outcome.timeout:.0f}s)")
+    elif outcome.classification == tool_policy.INFRASTRUCTURE:
+        print(f"🧯 Falha de infraestrutura após {outcome.attempts} tentativa(s) ({result.elapsed:.1f}s)")
+        print(outcome.infra_line or "\n".join(result.stderr_tail))
+    elif result.abort_reason:
+        print(f"🛑 Abortado ({result.elapsed:.1f}s): {result.abort_reason}")
+    elif not outcome.ok:
+        print(f"❌ Erro ({result.elapsed:.1f}s)")
+        print("\n".join(result.stderr_tail))
     else:
-        print(f"✅ Sucesso ({elapsed:.1f}s)")
-        return True
+        print(f"✅ Sucesso ({result.elapsed:.1f}s)")
+    return outcome
 
 # =============================================================================
 # GERENCIAMENTO DE DEPENDÊNCIAS
 # =============================================================================
 
-def get_all_dependencies(module: str, dependencies_dict: Dict, seen: Set = None) -> Set[str]:
-    """Obtém todas as dependências recursivas de um módulo."""
-    if seen is None:
-        seen = set()
-    if module in seen:
-        return set()
-    
-    seen.add(module)
-    deps = set()
-    
-    for dep in dependencies_dict.get(module, []):
-        deps.add(dep)
-        deps.update(get_all_dependencies(dep, dependencies_dict, seen))
-    
-    return deps
-
 def get_all_modules_from_tree(tree: Dict) -> Set[str]:
     """Extrai todos os nomes de módulos da árvore JSON."""
     modules = set()
@@ -88,39 +89,21 @@ def get_all_modules_from_tree(tree: Dict) -> Set[str]:
     extract_modules(tree)
     return modules
 
-def get_all_dependencies_from_tree(module: str, dependencies_tree: Dict, seen: Set = None) -> Set[str]:
-    """Obtém dependências recursivas da árvore hierárquica."""
-    if seen is None:
-        seen = set()
-    if module in seen:
-        return set()
-    
-    seen.add(module)
-    deps = set()
-    
-    def find_dependencies_in_node(node, current_module):
-        if isinstance(node, dict):
-            for key, value in node.items():
-                if key == current_module:
-                    if isinstance(value, list):
-                        return set(value)
-                    elif isinstance(value, dict):
-                        return set(value.keys())
-                elif isinstance(value, dict):
-                    result = find_dependencies_in_node(value, current_module)
-                    if result:
-                        return result
-        return set()
-    
-    # Encontra dependências diretas
-    direct_deps = find_dependencies_in_node(dependencies_tree, module)
-    deps.update(direct_deps)
-    
-    # Encontra dependências recursivas
-    for dep in direct_deps:
-        deps.update(get_all_dependencies_from_tree(dep, dependencies_tree, seen))
-    
-    return deps
+def get_all_dependencies_from_tree(module: str, dependencies_tree: Dict) -> Set[str]:
+    """Obtém dependências recursivas da árvore hierárquica.
+
+    Consulta o fecho transitivo memoizado do grafo achatado (project_loader).
+    """
+    return project_loader.dependency_graph(dependencies_tree).dependencies(module)
+
+def project_rtl_files(module: str, project_path: Path, dependencies_tree: Dict) -> List[Path]:
+    """RTL do top e de todo o fecho de dependências no diretório do projeto.
+
+    Derivado apenas da árvore (ordem estável), não do que foi copiado nesta
+    execução.
+    """
+    names = {module} | get_all_dependencies_from_tree(module, dependencies_tree)
+    return [project_path / f"{name}.v" for name in sorted(names)]
 
 # =============================================================================
 # BUSCA DE ARQUIVOS
@@ -140,23 +123,18 @@ def find_corresponding_tb(rtl_file: Path) -> Path:
     if tb_candidate.exists():
         return tb_candidate
     
-    # Busca recursiva como fallback
-    for tb_file in config.TB_DIR.rglob(f"{rtl_file.stem}_tb.v"):
-        return tb_file
-    for tb_file in config.TB_DIR.rglob(f"{rtl_file.stem}_tb.sv"):
-        return tb_file
-    
-    return None
+    # Busca no índice como fallback
+    return (module_index.find_testbench(f"{rtl_file.stem}_tb.v")
+            or module_index.find_testbench(f"{rtl_file.stem}_tb.sv"))
 
 def find_corresponding_sdc(rtl_file: Path) -> List[Path]:
     """Encontra arquivos SDC correspondentes."""
     sdc_files = []
     
     # Busca TODOS os arquivos .sdc no diretório SDC
-    for sdc_file in config.SDC_DIR.glob("*.sdc"):
-        if sdc_file.exists():
-            sdc_files.append(sdc_file)
-            print(f"   ✅ SDC encontrado: {sdc_file.name}")
+    for sdc_file in module_index.sdc_files():
+        sdc_files.append(sdc_file)
+        print(f"   ✅ SDC encontrado: {sdc_file.name}")
     
     if not sdc_files:
         print(f"   ⚠️ Nenhum arquivo .sdc encontrado em {config.SDC_DIR}")
@@ -168,23 +146,25 @@ def find_corresponding_sdc(rtl_file: Path) -> List[Path]:
 # =============================================================================
 
 def copy_dependencies(module_name: str, project_path: Path, dependencies_tree: Dict) -> List[Path]:
-    """Copia todas as dependências para a pasta do projeto."""
+    """Copia todas as dependências para a pasta do projeto.
+
+    Toda dependência é re-staged (stage_file não faz nada se o link ainda
+    aponta para a fonte; um salvamento atômico do editor quebra o link e a
+    cópia é refeita) e retornada, em ordem estável.
+    """
     dependencies = get_all_dependencies_from_tree(module_name, dependencies_tree)
     copied_files = []
     
-    for dep in dependencies:
-        found = False
-        for rtl_file in config.RTL_DIR.rglob(f"{dep}.v"):
-            dst_file = project_path / rtl_file.name
-            if not dst_file.exists():  # Evita duplicatas
-                shutil.copy(rtl_file, dst_file)
-                copied_files.append(dst_file)
-                print(f"{'  ' * 4}📄 Dep: {dep}.v")
-            found = True
-            break
-        
-        if not found:
+    for dep in sorted(dependencies):
+        rtl_file = module_index.find_rtl(dep)
+        if rtl_file is None:
             print(f"{'  ' * 4}⚠️ Dep não encontrada: {dep}.v")
+            continue
+        
+        dst_file = project_path / rtl_file.name
+        if staging.stage_file(rtl_file, dst_file) != "linked":
+            print(f"{'  ' * 4}📄 Dep: {dep}.v")
+        copied_files.append(dst_file)
     
     return copied_files
 
@@ -194,9 +174,9 @@ def copy_project_files(module_name: str, verilog_file: Path, dependencies_tree:
     project_path = config.BUILD_DIR / module_name
     project_path.mkdir(parents=True, exist_ok=True)
     
-    # Copia arquivo RTL principal
+    # Arquivo RTL principal (link, sem duplicar bytes)
     dst_file = project_path / verilog_file.name
-    shutil.copy(verilog_file, dst_file)
+    staging.stage_file(verilog_file, dst_file)
     
     # Copia dependências
     all_rtl_files = copy_dependencies(module_name, project_path, dependencies_tree)
@@ -207,7 +187,7 @@ def copy_project_files(module_name: str, verilog_file: Path, dependencies_tree:
     copied_sdc_files = []
     for sdc_file in sdc_files:
         sdc_dst = project_path / sdc_file.name
-        shutil.copy(sdc_file, sdc_dst)
+        staging.stage_file(sdc_file, sdc_dst)
         copied_sdc_files.append(sdc_dst)
         print(f"   📋 SDC: {sdc_file.name}")
     
@@ -223,6 +203,7 @@ def copy_hierarchical_projects(tree: Dict, parent_path: Path = None, current_dep
     """Carrega projetos da estrutura hierárquica."""
     if parent_path is None:
         parent_path = config.RTL_DIR
+    tree = project_loader.module_tree(tree)
 
     # PRIMEIRO: Copia a estrutura de diretórios
     copy_project_directory_structure(tree)
@@ -240,7 +221,7 @@ def copy_hierarchical_projects(tree: Dict, parent_path: Path = None, current_dep
             return
 
         # Processa arquivos .v nesta pasta
-        for verilog_file in current_path.glob("*.v"):
+        for verilog_file in module_index.rtl_files_in(current_path):
             module_name = verilog_file.stem
             
             # Filtra módulos não presentes no JSON
@@ -284,9 +265,9 @@ def copy_project_files_to_structured_path(module_name: str, verilog_file: Path,
     # Cria pasta do projeto específica
     project_path.mkdir(parents=True, exist_ok=True)
     
-    # Copia arquivo RTL principal
+    # Arquivo RTL principal (link, sem duplicar bytes)
     dst_file = project_path / verilog_file.name
-    shutil.copy(verilog_file, dst_file)
+    staging.stage_file(verilog_file, dst_file)
     
     # Copia dependências
     all_rtl_files = copy_dependencies(module_name, project_path, dependencies_tree)
@@ -297,7 +278,7 @@ def copy_project_files_to_structured_path(module_name: str, verilog_file: Path,
     copied_sdc_files = []
     for sdc_file in sdc_files:
         sdc_dst = project_path / sdc_file.name
-        shutil.copy(sdc_file, sdc_dst)
+        staging.stage_file(sdc_file, sdc_dst)
         copied_sdc_files.append(sdc_dst)
         print(f"   📋 SDC: {sdc_file.name}")
     
@@ -315,29 +296,27 @@ def copy_files_for_project(project_name: str, module_name: str, dependencies_dic
     project_path.mkdir(parents=True, exist_ok=True)
 
     # Obtém dependências
-    all_deps = get_all_dependencies(module_name, dependencies_dict)
+    all_deps = get_all_dependencies_from_tree(module_name, dependencies_dict)
     files_to_copy = [module_name] + list(all_deps)
     copied_files = []
 
     # Copia arquivos RTL
     for module in files_to_copy:
-        found = False
-        for rtl_file in config.RTL_DIR.rglob(f"{module}.v"):
-            dst_file = project_path / rtl_file.name
-            shutil.copy(rtl_file, dst_file)
-            copied_files.append(dst_file)
-            found = True
-            break
-        
-        if not found:
+        rtl_file = module_index.find_rtl(module)
+        if rtl_file is None:
             print(f"⚠️ Arquivo {module}.v não encontrado em {config.RTL_DIR}!")
+            continue
+        
+        dst_file = project_path / rtl_file.name
+        staging.stage_file(rtl_file, dst_file)
+        copied_files.append(dst_file)
 
     # Copia SDCs
-    sdc_files = list(config.SDC_DIR.glob("*.sdc"))
+    sdc_files = module_index.sdc_files()
     copied_sdc_files = []
     for sdc_file in sdc_files:
         dst_sdc = project_path / sdc_file.name
-        shutil.copy(sdc_file, dst_sdc)
+        staging.stage_file(sdc_file, dst_sdc)
         copied_sdc_files.append(dst_sdc)
 
     print(f"📂 Arquivos copiados: {[f.name for f in copied_files + copied_sdc_files]}")
@@ -347,61 +326,88 @@ def copy_files_for_project(project_name: str, module_name: str, dependencies_dic
 # GERENCIAMENTO DE PROJETOS QUARTUS
 # =============================================================================
 
+def render_optimized_qsf(project_path: Path, top_module: str, 
+                         rtl_files: List[Path], sdc_files: List[Path] = []) -> str:
+    """Monta o texto do QSF otimizado para Quartus."""
+    f = io.StringIO()
+    
+    f.write("# =============================================================================\n")
+    f.write("# CONFIGURAÇÕES OTIMIZADAS - QUARTUS\n")
+    f.write("# =============================================================================\n\n")
+    
+    # Configurações básicas
+    f.write('# PROJECT SETTINGS\n')
+    f.write('set_global_assignment -name FAMILY "Cyclone V"\n')
+    f.write('set_global_assignment -name DEVICE 5CSEMA5F31C6\n')
+    f.write(f'set_global_assignment -name TOP_LEVEL_ENTITY {top_module}\n')
+    f.write('set_global_assignment -name PROJECT_OUTPUT_DIRECTORY output_files\n')
+    f.write('set_global_assignment -name BOARD "DE1-SoC Board"\n\n')
+    
+    # Power settings
+    f.write('# POWER SETTINGS\n')
+    f.write('set_global_assignment -name POWER_PRESET_COOLING_SOLUTION "23 MM HEAT SINK WITH 200 LFPM AIRFLOW"\n')
+    f.write('set_global_assignment -name POWER_BOARD_THERMAL_MODEL "NONE (CONSERVATIVE)"\n')
+    f.write('set_global_assignment -name POWER_DEFAULT_INPUT_IO_TOGGLE_RATE "12.5%"\n')
+    f.write('set_global_assignment -name POWER_HPS_ENABLE OFF\n\n')
+    
+    # Otimizações
+    f.write('# OTIMIZAÇÕES\n')
+    f.write('set_global_assignment -name OPTIMIZATION_MODE "AGGRESSIVE PERFORMANCE"\n')
+    f.write('set_global_assignment -name PHYSICAL_SYNTHESIS_EFFORT "EXTRA"\n')
+    f.write('set_global_assignment -name TIMING_ANALYZER_MULTICORNER_ANALYSIS ON\n')
+    f.write('set_global_assignment -name NUM_PARALLEL_PROCESSORS ALL\n\n')
+    
+    # Arquivos
+    f.write('# DESIGN FILES\n')
+    for rtl in rtl_files:
+        rel_path = os.path.relpath(rtl, project_path)
+        f.write(f'set_global_assignment -name VERILOG_FILE "{rel_path}"\n')
+    
+    # SDC Files
+    if sdc_files:
+        f.write('\n# TIMING CONSTRAINTS\n')
+        for sdc in sdc_files:
+            f.write(f'set_global_assignment -name SDC_FILE "{sdc.name}"\n')
+    
+    f.write('\n# PIN ASSIGNMENTS\n')
+    f.write('set_location_assignment PIN_AF14 -to CLOCK_50\n')
+    f.write('set_instance_assignment -name IO_STANDARD "3.3-V LVTTL" -to CLOCK_50\n\n')
+    
+    f.write("# =============================================================================\n")
+    f.write("# END\n")
+    f.write("# =============================================================================\n")
+
+    return f.getvalue()
+
 def generate_optimized_qsf(project_path: Path, top_module: str, 
                           rtl_files: List[Path], sdc_files: List[Path] = []) -> Path:
     """Gera arquivo QSF otimizado para Quartus."""
     qsf_path = project_path / f"{top_module}.qsf"
     
     with open(qsf_path, "w") as f:
-        f.write("# =============================================================================\n")
-        f.write("# CONFIGURAÇÕES OTIMIZADAS - QUARTUS\n")
-        f.write("# =============================================================================\n\n")
-        
-        # Configurações básicas
-        f.write('# PROJECT SETTINGS\n')
-        f.write('set_global_assignment -name FAMILY "Cyclone V"\n')
-        f.write('set_global_assignment -name DEVICE 5CSEMA5F31C6\n')
-        f.write(f'set_global_assignment -name TOP_LEVEL_ENTITY {top_module}\n')
-        f.write('set_global_assignment -name PROJECT_OUTPUT_DIRECTORY output_files\n')
-        f.write('set_global_assignment -name BOARD "DE1-SoC Board"\n\n')
-        
-        # Power settings
-        f.write('# POWER SETTINGS\n')
-        f.write('set_global_assignment -name POWER_PRESET_COOLING_SOLUTION "23 MM HEAT SINK WITH 200 LFPM AIRFLOW"\n')
-        f.write('set_global_assignment -name POWER_BOARD_THERMAL_MODEL "NONE (CONSERVATIVE)"\n')
-        f.write('set_global_assignment -name POWER_DEFAULT_INPUT_IO_TOGGLE_RATE "12.5%"\n')
-        f.write('set_global_assignment -name POWER_HPS_ENABLE OFF\n\n')
-        
-        # Otimizações
-        f.write('# OTIMIZAÇÕES\n')
-        f.write('set_global_assignment -name OPTIMIZATION_MODE "AGGRESSIVE PERFORMANCE"\n')
-        f.write('set_global_assignment -name PHYSICAL_SYNTHESIS_EFFORT "EXTRA"\n')
-        f.write('set_global_assignment -name TIMING_ANALYZER_MULTICORNER_ANALYSIS ON\n')
-        f.write('set_global_assignment -name NUM_PARALLEL_PROCESSORS ALL\n\n')
-        
-        # Arquivos
-        f.write('# DESIGN FILES\n')
-        for rtl in rtl_files:
-            rel_path = os.path.relpath(rtl, project_path)
-            f.write(f'set_global_assignment -name VERILOG_FILE "{rel_path}"\n')
-        
-        # SDC Files
-        if sdc_files:
-            f.write('\n# TIMING CONSTRAINTS\n')
-            for sdc in sdc_files:
-                f.write(f'set_global_assignment -name SDC_FILE "{sdc.name}"\n')
-        
-        f.write('\n# PIN ASSIGNMENTS\n')
-        f.write('set_location_assignment PIN_AF14 -to CLOCK_50\n')
-        f.write('set_instance_assignment -name IO_STANDARD "3.3-V LVTTL" -to CLOCK_50\n\n')
-        
-        f.write("# =============================================================================\n")
-        f.write("# END\n")
-        f.write("# =============================================================================\n")
+        f.write(render_optimized_qsf(project_path, top_module, rtl_files, sdc_files))
 
     print(f"✅ QSF gerado: {qsf_path.name}")
     return qsf_path
 
+def set_qsf_parallel_processors(qsf_path: Path, cores: int) -> bool:
+    """Reescreve NUM_PARALLEL_PROCESSORS do QSF com o orçamento de núcleos do job."""
+    if not qsf_path.exists():
+        print(f"⚠️ QSF não encontrado: {qsf_path.name}")
+        return False
+
+    content = qsf_path.read_text()
+    new_content, count = re.subn(
+        r"(set_global_assignment\s+-name\s+NUM_PARALLEL_PROCESSORS\s+)\S+",
+        r"\g<1>" + str(cores),
+        content
+    )
+    if count == 0:
+        new_content = content + f"set_global_assignment -name NUM_PARALLEL_PROCESSORS {cores}\n"
+
+    qsf_path.write_text(new_content)
+    return True
+
 def create_qpf(project_path: Path, project_name: str):
     """Cria arquivo QPF do projeto."""
     qpf_path = project_path / f"{project_name}.qpf"
@@ -418,6 +424,11 @@ def create_qpf(project_path: Path, project_name: str):
 # MODIFICAÇÃO DE PARÂMETROS
 # =============================================================================
 
+def apply_parameter(content: str, param_name: str, value: int) -> Tuple[str, int]:
+    """Aplica o valor do parâmetro ao conteúdo Verilog (sem tocar em disco)."""
+    pattern = rf"(parameter\s+{param_name}\s*=\s*)(\d+)"
+    return re.subn(pattern, r"\g<1>" + str(value), content)
+
 def set_parameter_in_verilog(module_name: str, project_path: Path, 
                            param_name: str, value: int) -> bool:
     """Define valor de parâmetro em arquivo Verilog."""
@@ -430,14 +441,11 @@ def set_parameter_in_verilog(module_name: str, project_path: Path,
     with open(top_file, "r") as f:
         content = f.read()
 
-    pattern = rf"(parameter\s+{param_name}\s*=\s*)(\d+)"
-    replacement = r"\g<1>" + str(value)
-
-    new_content, count = re.subn(pattern, replacement, content)
+    new_content, count = apply_parameter(content, param_name, value)
 
     if count > 0:
-        with open(top_file, "w") as f:
-            f.write(new_content)
+        # Substituição atômica: quebra o link com a fonte original (staging)
+        staging.write_text_atomic(top_file, new_content)
         print(f"🔧 Parâmetro {param_name} atualizado para {value}")
         return True
     else:
@@ -448,65 +456,205 @@ def set_parameter_in_verilog(module_name: str, project_path: Path,
 # COMPILAÇÃO QUARTUS
 # =============================================================================
 
-def compile_project(project_name: str, project_path: Path) -> bool:
+def compile_project(project_name: str, project_path: Path, include_power: bool = True) -> bool:
     """Executa compilação completa no Quartus."""
-    os.chdir(project_path)
     print(f"\n🚀 Compilando projeto {project_name}...")
 
-    # Compilação principal
-    success = run_cmd(
-        [
-            f"{config.QUARTUS_BIN}\\quartus_sh",
-            "--flow", "compile",
-            project_name
-        ],
-        logfile=project_path / "quartus_compile.log"
-    )
-    
-    if not success:
-        return False
+    stages = QUARTUS_STAGE_NAMES if include_power else COMPILE_STAGE_NAMES
+    with resources.core_budget(config.QUARTUS_MAX_CORES_PER_JOB, label=project_name) as cores:
+        set_qsf_parallel_processors(project_path / f"{project_name}.qsf", cores)
+        return run_quartus_stages(project_name, project_path, "default", stages)
 
-    # Análise de potência
-    print("\n⚡ Executando análise de potência...")
-    run_cmd(
-        [f"{config.QUARTUS_BIN}\\quartus_pow", project_name],
-        logfile=project_path / "quartus_power.log"
-    )
-    
-    return True
+def get_n_project_files(project_path: Path) -> Tuple[List[Path], List[Path]]:
+    """Arquivos Verilog e SDC que entram no QSF de uma variante N."""
+    return sorted(project_path.glob("*.v")), sorted(project_path.glob("*.sdc"))
 
 # compile.py (adição desta função)
-def compile_project_with_n(project_name: str, project_path: Path, N: int) -> bool:
+def compile_project_with_n(project_name: str, project_path: Path, N: int,
+                           include_power: bool = True) -> bool:
     """Executa compilação completa no Quartus para projeto com parâmetro N."""
-    os.chdir(project_path)
     print(f"\n🚀 Compilando projeto {project_name} com N={N}...")
 
     # Gera QSF específico para este N
-    rtl_files = list(project_path.glob("*.v"))
-    sdc_files = list(project_path.glob("*.sdc"))
-    generate_optimized_qsf(project_path, project_name, rtl_files, sdc_files)
+    rtl_files, sdc_files = get_n_project_files(project_path)
+    qsf_path = generate_optimized_qsf(project_path, project_name, rtl_files, sdc_files)
     create_qpf(project_path, project_name)
 
-    # Compilação principal
-    success = run_cmd(
-        [
-            f"{config.QUARTUS_BIN}\\quartus_sh",
-            "--flow", "compile",
-            project_name
-        ],
-        logfile=project_path / f"quartus_compile_N{N}.log"
-    )
-    
-    if not success:
-        return False
+    stages = QUARTUS_STAGE_NAMES if include_power else COMPILE_STAGE_NAMES
+    with resources.core_budget(config.QUARTUS_MAX_CORES_PER_JOB, label=f"{project_name} N={N}") as cores:
+        set_qsf_parallel_processors(qsf_path, cores)
+        return run_quartus_stages(project_name, project_path, N, stages)
 
-    # Análise de potência
-    print(f"\n⚡ Executando análise de potência para N={N}...")
-    run_cmd(
-        [f"{config.QUARTUS_BIN}\\quartus_pow", project_name],
-        logfile=project_path / f"quartus_power_N{N}.log"
-    )
-    
+def run_power_analysis(project_name: str, project_path: Path, N: Any = "default") -> bool:
+    """Executa apenas o estágio quartus_pow sobre um projeto já compilado."""
+    label = project_name if N == "default" else f"{project_name} N={N} (potência)"
+    with resources.core_budget(config.QUARTUS_MAX_CORES_PER_JOB, label=label) as cores:
+        set_qsf_parallel_processors(project_path / f"{project_name}.qsf", cores)
+        return run_quartus_stages(project_name, project_path, N, ("pow",))
+
+# =============================================================================
+# FLUXO QUARTUS EM ESTÁGIOS (map → fit → sta → pow)
+# =============================================================================
+
+STAGE_MANIFEST_NAME = ".stage_manifest.json"
+COMPILE_STATUS_NAME = "compile_status.json"  # Resultado da última compilação (e motivo da falha)
+
+# Estágio, executável e relatório que comprova a execução
+QUARTUS_STAGES = [
+    ("map", "quartus_map", "map.summary"),
+    ("fit", "quartus_fit", "fit.summary"),
+    ("sta", "quartus_sta", "sta.rpt"),
+    ("pow", "quartus_pow", "pow.rpt"),
+]
+QUARTUS_STAGE_NAMES = tuple(stage for stage, _, _ in QUARTUS_STAGES)
+COMPILE_STAGE_NAMES = ("map", "fit", "sta")  # Caminho crítico (sem potência)
+
+# Estágios que consomem o resultado de cada estágio
+STAGE_DEPENDENTS = {"map": ["fit", "sta", "pow"], "fit": ["sta", "pow"], "sta": [], "pow": []}
+
+def _hash_text(*parts: str) -> str:
+    hasher = hashlib.sha256()
+    for part in parts:
+        hasher.update(part.encode())
+        hasher.update(b"\0")
+    return hasher.hexdigest()
+
+def _hash_listed_files(project_path: Path, qsf_lines: List[str]) -> str:
+    """Hash do conteúdo dos arquivos referenciados por linhas do QSF."""
+    hasher = hashlib.sha256()
+    for line in qsf_lines:
+        match = re.search(r'"([^"]+)"\s*$', line)
+        if not match:
+            continue
+        file_path = project_path / match.group(1)
+        hasher.update(match.group(1).encode())
+        hasher.update(file_path.read_bytes() if file_path.exists() else b"<ausente>")
+    return hasher.hexdigest()
+
+def compute_stage_fingerprints(project_name: str, project_path: Path) -> Dict[str, str]:
+    """Calcula a impressão digital de entrada de cada estágio do Quartus.
+
+    - map: RTL + configurações gerais do QSF
+    - fit: resultado do map
+    - sta: resultado do fit + SDC (mudança só no SDC refaz apenas o timing)
+    - pow: resultado do fit + configurações de potência (toggle rate etc.)
+    """
+    qsf_path = project_path / f"{project_name}.qsf"
+    qsf_lines = qsf_path.read_text().splitlines() if qsf_path.exists() else []
+
+    sdc_lines, power_lines, base_lines = [], [], []
+    for line in qsf_lines:
+        if "NUM_PARALLEL_PROCESSORS" in line or line.startswith("#"):
+            continue
+        if "SDC_FILE" in line:
+            sdc_lines.append(line)
+        elif "-name POWER_" in line:
+            power_lines.append(line)
+        else:
+            base_lines.append(line)
+
+    rtl_lines = [line for line in base_lines if "VERILOG_FILE" in line]
+    map_fp = _hash_text(config.QUARTUS_BIN, *base_lines, _hash_listed_files(project_path, rtl_lines))
+    fit_fp = _hash_text("fit", map_fp)
+    sta_fp = _hash_text("sta", fit_fp, *sdc_lines, _hash_listed_files(project_path, sdc_lines))
+    pow_fp = _hash_text("pow", fit_fp, *power_lines)
+
+    return {"map": map_fp, "fit": fit_fp, "sta": sta_fp, "pow": pow_fp}
+
+def _read_stage_manifest(project_path: Path) -> Dict[str, str]:
+    manifest_path = project_path / STAGE_MANIFEST_NAME
+    try:
+        with open(manifest_path, "r", encoding="utf-8") as f:
+            return json.load(f)
+    except (OSError, ValueError):
+        return {}
+
+def _write_stage_manifest(project_path: Path, manifest: Dict[str, str]):
+    with open(project_path / STAGE_MANIFEST_NAME, "w", encoding="utf-8") as f:
+        json.dump(manifest, f, indent=2)
+
+def write_compile_status(project_path: Path, status: str, stage: str = None,
+                         reason: str = None, line: str = None,
+                         classification: str = tool_policy.OK):
+    """Registra o resultado da compilação (OK, FAILED ou ABORTED), o motivo e a
+    classificação da falha (tool_policy: DESIGN_ERROR, TIMEOUT, INFRASTRUCTURE)."""
+    with open(project_path / COMPILE_STATUS_NAME, "w", encoding="utf-8") as f:
+        json.dump({
+            "status": status,
+            "classification": classification,
+            "stage": stage,
+            "reason": reason,
+            "line": line,
+            "time": time.strftime("%Y-%m-%d %H:%M:%S"),
+        }, f, indent=2)
+
+def read_compile_status(project_path: Path) -> Dict[str, Any]:
+    """Lê o resultado da última compilação ({} se não houver)."""
+    try:
+        with open(project_path / COMPILE_STATUS_NAME, "r", encoding="utf-8") as f:
+            return json.load(f)
+    except (OSError, ValueError):
+        return {}
+
+def run_quartus_stages(project_name: str, project_path: Path, N: Any = "default",
+                       stages: Tuple[str, ...] = QUARTUS_STAGE_NAMES) -> bool:
+    """Executa os estágios pedidos do Quartus, pulando os que não mudaram.
+
+    Cada estágio tem log próprio (quartus_<estágio>[_N{N}].log). Um estágio é
+    refeito quando sua impressão digital muda, quando foi invalidado por um
+    estágio anterior refeito, ou quando seu relatório/banco (db/) sumiu.
+    Falha no quartus_pow não invalida a compilação, mas fica registrada no
+    compile_status.json (estágio "pow"). Cada estágio é observado
+    por log_watcher.LogWatcher: linhas fatais ou padrões de parada encerram a
+    ferramenta na hora e o motivo vai para compile_status.json.
+    """
+    fingerprints = compute_stage_fingerprints(project_name, project_path)
+    manifest = _read_stage_manifest(project_path)
+    out_dir = project_path / "output_files"
+    log_suffix = "" if N == "default" else f"_N{N}"
+
+    for stage, tool, report_suffix in QUARTUS_STAGES:
+        if stage not in stages:
+            continue
+
+        up_to_date = (
+            manifest.get(stage) == fingerprints[stage]
+            and (out_dir / f"{project_name}.{report_suffix}").exists()
+            and (project_path / "db").exists()
+        )
+        if up_to_date:
+            print(f"♻️ {tool}: entradas inalteradas, estágio pulado")
+            continue
+
+        if stage == "pow":
+            print(f"\n⚡ Executando análise de potência{'' if N == 'default' else f' para N={N}'}...")
+
+        # Refazer um estágio invalida os estágios que dependem dele
+        for invalidated in [stage] + STAGE_DEPENDENTS[stage]:
+            manifest.pop(invalidated, None)
+        _write_stage_manifest(project_path, manifest)
+
+        watcher = log_watcher.LogWatcher(stage)
+        outcome = run_cmd(
+            [f"{config.QUARTUS_BIN}\\{tool}", project_name],
+            logfile=project_path / f"quartus_{stage}{log_suffix}.log",
+            cwd=project_path,
+            key=resources.job_key(project_name, N, tool),
+            line_hook=watcher
+        )
+
+        if not outcome.ok:
+            status = "ABORTED" if watcher.reason else "FAILED"
+            write_compile_status(
+                project_path, status, stage, watcher.reason or outcome.infra_line,
+                watcher.line, outcome.classification
+            )
+            return stage == "pow"
+
+        manifest[stage] = fingerprints[stage]
+        _write_stage_manifest(project_path, manifest)
+
+    write_compile_status(project_path, "OK")
     return True
 
 
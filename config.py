@@ -1,4 +1,6 @@
 # config.py - Atualizado com estrutura numerada
+import os
+import tempfile
 from pathlib import Path
 
 # ========================
@@ -84,4 +86,90 @@ CATEGORY_MAPPING = {
     "fpu_add": RTL_FPU_ADD_SUB_DIR,
     "fpu_mult": RTL_FPU_MULT_DIR,
     "fpu_div": RTL_FPU_DIV_DIR,
-}
\ No newline at end of file
+}
+# ========================
+# EXECUÇÃO PARALELA
+# ========================
+DEFAULT_JOBS = 1  # Módulos compilados simultaneamente (--jobs)
+SWEEP_JOBS = 1    # Variantes N compiladas simultaneamente por módulo (--sweep-jobs)
+PIPELINE_SIM_WORKERS = 1    # Simulações ModelSim simultâneas no modo --pipeline
+PIPELINE_SYNTH_WORKERS = 1  # Compilações Quartus simultâneas no modo --pipeline
+
+# ========================
+# FILA DE JOBS DISTRIBUÍDA
+# ========================
+JOB_QUEUE_DIR = BUILD_DIR / "queue"  # Diretório compartilhado entre workers (--queue-dir)
+JOB_LEASE_SECONDS = 300.0   # Validade do lease; renovado a cada 1/3 enquanto o job roda
+JOB_POLL_INTERVAL = 5.0     # Espera do worker quando só há jobs bloqueados/em execução
+JOB_QUEUE_MAX_ATTEMPTS = 3  # Tentativas antes de marcar um job abandonado como FAILED
+
+# ========================
+# EXECUÇÃO DE FERRAMENTAS
+# ========================
+# Timeout (s) por ferramenta sem histórico; ausente ou None = sem limite
+TOOL_TIMEOUTS = {
+    "quartus_map": 3600,
+    "quartus_fit": 7200,
+    "quartus_sta": 1800,
+    "quartus_pow": 1800,
+    "vlib": 60,
+    "vlog": 300,
+    "vdir": 60,
+    "vsim": 600,
+}
+TOOL_TIMEOUT_FACTOR = 3.0    # Timeout aprendido = fator x maior duração registrada
+TOOL_TIMEOUT_MIN_S = 30.0    # Piso do timeout aprendido (módulos minúsculos)
+TOOL_MAX_RETRIES = 2         # Novas tentativas para falhas de infraestrutura
+TOOL_RETRY_BACKOFF_S = 30.0  # Espera antes da 1ª nova tentativa (dobra a cada uma)
+
+# Parada antecipada do Quartus (além das linhas "Error (")
+QUARTUS_STOP_PATTERNS = []   # Regex que encerram a ferramenta ao aparecer no log
+SETUP_SLACK_TARGET_NS = None # Encerra o timing se o pior slack de setup ficar abaixo (--slack-target)
+
+# ========================
+# MODO WATCH
+# ========================
+WATCH_DEBOUNCE_S = 1.0     # Silêncio exigido após a última edição antes de reconstruir
+WATCH_POLL_INTERVAL = 1.0  # Intervalo da varredura quando watchdog/inotify não está disponível
+
+# ========================
+# GOVERNANÇA DE RECURSOS
+# ========================
+LOCK_DIR = Path(tempfile.gettempdir()) / "fpuflow_locks"  # Locks locais da máquina
+CORE_TOKENS = os.cpu_count() or 1  # Núcleos disponíveis para todos os jobs
+QUARTUS_MAX_CORES_PER_JOB = 4      # Orçamento máximo por compilação Quartus
+TOKEN_POLL_INTERVAL = 2.0          # Segundos entre tentativas de admissão
+RESOURCE_HISTORY_FILE = BUILD_DIR / ".resource_history.json"  # Picos de memória por módulo/N
+MEMORY_CEILING_MB = None           # Teto de memória para admissão (--mem-limit); None desativa
+DEFAULT_JOB_MEMORY_MB = 2048       # Estimativa para jobs sem histórico
+MEMORY_SAMPLE_INTERVAL = 1.0       # Segundos entre amostras de RSS
+
+# ========================
+# CACHE INCREMENTAL
+# ========================
+BUILD_CACHE_ENABLED = True  # Pula o Quartus quando a chave de conteúdo não mudou (--force desativa)
+SIM_ONLY = False            # Apenas ModelSim, reaproveitando síntese anterior (--sim-only)
+SOURCE_SNAPSHOT_FILE = BUILD_DIR / ".source_snapshot.json"  # Fontes do último build completo
+MODULE_INDEX_FILE = BUILD_DIR / ".module_index.json"        # Índice nome → caminho de RTL/TB/SDC
+DEPENDENCY_GRAPH_FILE = BUILD_DIR / ".dependency_graph.json"  # Grafo achatado do dependencies.json
+VERILOG_INDEX_FILE = BUILD_DIR / ".verilog_index.json"      # Metadados Verilog por hash de arquivo
+STAGING_LINK_MODES = ("hardlink", "reflink", "symlink")     # Ordem de tentativa; () = sempre copiar
+ARTIFACT_STORE_ENABLED = True
+ARTIFACT_STORE_DIR = Path(os.environ.get("FPUFLOW_ARTIFACT_STORE", ROOT / ".artifact_store"))  # Pode ficar em FS compartilhado
+ARTIFACT_STORE_MAX_BYTES = 5 * 1024 ** 3  # Acima disso, remoção LRU
+
+# ========================
+# SIMULAÇÃO MODELSIM
+# ========================
+MODELSIM_SHARED_LIBS = True  # Dependências compiladas uma vez em bibliotecas -L compartilhadas
+MODELSIM_LIB_DIR = BUILD_DIR / "modelsim_libs"  # <módulo>_<hash do fonte>
+MODELSIM_COMPILE_MODE = "batch"  # "batch" (um vlog para .v e outro para SV) ou "per_file"
+VLOG_EXTRA_ARGS = []             # Opções extras do vlog (mudá-las recria a library work)
+SIM_RESULTS_WORK_MODE = "manifest"  # Library work nos resultados: "manifest", "hardlink" ou "none"
+SIM_RESULT_PATTERNS = ["*.log", "*.txt", "*.csv", "*.vcd"]  # Artefatos guardados por execução
+
+# ========================
+# ANÁLISE DE POTÊNCIA
+# ========================
+POWER_MODE = "async"  # "async" (background), "inline" ou "off" (--no-power)
+POWER_WORKERS = 2     # Execuções simultâneas de quartus_pow em background
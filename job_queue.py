@@ -0,0 +1,373 @@
+# job_queue.py
+"""
+FILA DE JOBS COMPARTILHADA (SQLite)
+
+Responsável por:
+- Submissão de um job por módulo/N em um diretório compartilhado
+- Workers que reivindicam jobs com lease (renovada enquanto o job roda)
+- Reaproveitamento de jobs cujo lease expirou (worker morto ou máquina caída)
+- Jobs de dependentes de um módulo com falha são pulados (SKIPPED_DEP_FAILED)
+- Gravação dos resultados (CompiledProject) para o passo final de relatórios
+
+Vários workers, na mesma máquina ou em hosts de build diferentes, podem
+compartilhar o mesmo --queue-dir. O diretório de build precisa estar no
+mesmo caminho em todos os hosts.
+"""
+
+import json
+import os
+import socket
+import sqlite3
+import threading
+import time
+from contextlib import closing
+from pathlib import Path
+from typing import List, Dict, Any, Optional, Tuple
+
+import config
+import compile
+import power_analysis
+import project_processor
+
+QUEUE_DB_NAME = "jobs.sqlite"
+
+# Estados de um job
+PENDING = "PENDING"
+RUNNING = "RUNNING"
+DONE = "DONE"
+FAILED = "FAILED"
+SKIPPED = project_processor.STATUS_SKIPPED_DEP_FAILED  # Dependência com falha
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS jobs (
+    id            INTEGER PRIMARY KEY AUTOINCREMENT,
+    module        TEXT NOT NULL,
+    n             TEXT NOT NULL,
+    project_info  TEXT NOT NULL,
+    deps          TEXT NOT NULL,
+    state         TEXT NOT NULL,
+    attempts      INTEGER NOT NULL DEFAULT 0,
+    lease_owner   TEXT,
+    lease_expires REAL,
+    result        TEXT,
+    error         TEXT,
+    updated       REAL NOT NULL,
+    UNIQUE (module, n)
+)
+"""
+
+# =============================================================================
+# CONEXÃO
+# =============================================================================
+
+def _connect(queue_dir: Path) -> sqlite3.Connection:
+    """Abre o banco da fila (cria o esquema se necessário)."""
+    queue_dir.mkdir(parents=True, exist_ok=True)
+    conn = sqlite3.connect(str(queue_dir / QUEUE_DB_NAME), timeout=60, isolation_level=None)
+    conn.row_factory = sqlite3.Row
+    conn.execute(_SCHEMA)
+    return conn
+
+def worker_id() -> str:
+    """Identificador padrão do worker: host e pid."""
+    return f"{socket.gethostname()}:{os.getpid()}"
+
+# =============================================================================
+# SERIALIZAÇÃO
+# =============================================================================
+
+def _encode_project_info(project_info: Tuple) -> str:
+    module_name, project_path, rtl_files, sdc_files, copied_tbs = project_info
+    return json.dumps({
+        "module": module_name,
+        "path": str(project_path),
+        "rtl": [str(f) for f in rtl_files],
+        "sdc": [str(f) for f in sdc_files],
+        "tbs": [str(f) for f in copied_tbs],
+    })
+
+def _decode_project_info(text: str) -> Tuple:
+    data = json.loads(text)
+    return (
+        data["module"],
+        Path(data["path"]),
+        [Path(f) for f in data["rtl"]],
+        [Path(f) for f in data["sdc"]],
+        [Path(f) for f in data["tbs"]],
+    )
+
+def _encode_result(project: project_processor.CompiledProject) -> str:
+    module_name, work_dir, N, out_dir, tb_files, sim_results = project
+    return json.dumps({
+        "module": module_name,
+        "work_dir": str(work_dir),
+        "N": N,
+        "out_dir": str(out_dir),
+        "tbs": [str(f) for f in tb_files],
+        "sim_results": sim_results,
+    }, default=str)
+
+def _decode_result(text: str) -> project_processor.CompiledProject:
+    data = json.loads(text)
+    return (
+        data["module"],
+        Path(data["work_dir"]),
+        data["N"],
+        Path(data["out_dir"]),
+        [Path(f) for f in data["tbs"]],
+        data["sim_results"],
+    )
+
+def _decode_n(text: str) -> Any:
+    return text if text == "default" else int(text)
+
+# =============================================================================
+# SUBMISSÃO
+# =============================================================================
+
+def submit_projects(queue_dir: Path, projects_info: List[Tuple], dependencies: Dict,
+                    bitwidths: List[int]) -> int:
+    """Enfileira um job por módulo/N. Jobs já existentes voltam para PENDING.
+
+    Retorna o número de jobs submetidos.
+    """
+    now = time.time()
+    submitted = 0
+    with closing(_connect(queue_dir)) as conn:
+        conn.execute("BEGIN IMMEDIATE")
+        for project_info in projects_info:
+            module_name, project_path = project_info[0], project_info[1]
+            if project_processor.check_has_parameter_n(project_path, module_name):
+                variants = [str(N) for N in bitwidths]
+            else:
+                variants = ["default"]
+
+            deps = [
+                dep for dep in compile.get_all_dependencies_from_tree(module_name, dependencies)
+                if dep != module_name
+            ]
+            for N in variants:
+                conn.execute(
+                    """INSERT INTO jobs (module, n, project_info, deps, state, updated)
+                       VALUES (?, ?, ?, ?, ?, ?)
+                       ON CONFLICT (module, n) DO UPDATE SET
+                           project_info = excluded.project_info, deps = excluded.deps,
+                           state = excluded.state, attempts = 0, lease_owner = NULL,
+                           lease_expires = NULL, result = NULL, error = NULL,
+                           updated = excluded.updated""",
+                    (module_name, N, _encode_project_info(project_info), json.dumps(deps),
+                     PENDING, now)
+                )
+                submitted += 1
+        conn.execute("COMMIT")
+
+    print(f"📬 {submitted} job(s) submetido(s) em {queue_dir}")
+    return submitted
+
+# =============================================================================
+# REIVINDICAÇÃO COM LEASE
+# =============================================================================
+
+def _deps_finished(conn: sqlite3.Connection, deps: List[str]) -> bool:
+    """True se todos os jobs dos módulos dos quais o job depende terminaram."""
+    if not deps:
+        return True
+    placeholders = ",".join("?" * len(deps))
+    row = conn.execute(
+        f"SELECT COUNT(*) FROM jobs WHERE module IN ({placeholders}) AND state NOT IN (?, ?, ?)",
+        (*deps, DONE, FAILED, SKIPPED)
+    ).fetchone()
+    return row[0] == 0
+
+def _failed_dependency(conn: sqlite3.Connection, deps: List[str]) -> Optional[str]:
+    """Primeiro módulo do qual o job depende que tem job com falha ou pulado."""
+    if not deps:
+        return None
+    placeholders = ",".join("?" * len(deps))
+    row = conn.execute(
+        f"SELECT module FROM jobs WHERE module IN ({placeholders}) AND state IN (?, ?) ORDER BY id",
+        (*deps, FAILED, SKIPPED)
+    ).fetchone()
+    return row["module"] if row else None
+
+def claim_job(queue_dir: Path, owner: str) -> Optional[sqlite3.Row]:
+    """Reivindica o próximo job disponível (pendente ou com lease expirado)."""
+    now = time.time()
+    with closing(_connect(queue_dir)) as conn:
+        conn.execute("BEGIN IMMEDIATE")
+        candidates = conn.execute(
+            """SELECT * FROM jobs
+               WHERE state = ? OR (state = ? AND lease_expires < ?)
+               ORDER BY id""",
+            (PENDING, RUNNING, now)
+        ).fetchall()
+
+        for job in candidates:
+            if job["attempts"] >= config.JOB_QUEUE_MAX_ATTEMPTS:
+                conn.execute(
+                    "UPDATE jobs SET state = ?, error = ?, updated = ? WHERE id = ?",
+                    (FAILED, f"lease expirado após {job['attempts']} tentativa(s)", now, job["id"])
+                )
+                continue
+            deps = json.loads(job["deps"])
+            if not _deps_finished(conn, deps):
+                continue
+            failed_dependency = _failed_dependency(conn, deps)
+            if failed_dependency:
+                print(f"⏭️ Job {job['module']} (N={job['n']}): pulado, dependência {failed_dependency} falhou")
+                conn.execute(
+                    "UPDATE jobs SET state = ?, error = ?, updated = ? WHERE id = ?",
+                    (SKIPPED, f"dependência {failed_dependency} falhou", now, job["id"])
+                )
+                continue
+
+            conn.execute(
+                """UPDATE jobs SET state = ?, attempts = attempts + 1, lease_owner = ?,
+                       lease_expires = ?, updated = ? WHERE id = ?""",
+                (RUNNING, owner, now + config.JOB_LEASE_SECONDS, now, job["id"])
+            )
+            conn.execute("COMMIT")
+            return job
+
+        conn.execute("COMMIT")
+    return None
+
+def _renew_lease(queue_dir: Path, job_id: int, owner: str) -> bool:
+    """Estende o lease; False se o job foi tomado por outro worker."""
+    with closing(_connect(queue_dir)) as conn:
+        cursor = conn.execute(
+            "UPDATE jobs SET lease_expires = ? WHERE id = ? AND state = ? AND lease_owner = ?",
+            (time.time() + config.JOB_LEASE_SECONDS, job_id, RUNNING, owner)
+        )
+        return cursor.rowcount == 1
+
+def _start_heartbeat(queue_dir: Path, job_id: int, owner: str):
+    """Renova o lease em background; retorna função que para a renovação."""
+    stop_event = threading.Event()
+
+    def beat():
+        while not stop_event.wait(config.JOB_LEASE_SECONDS / 3):
+            if not _renew_lease(queue_dir, job_id, owner):
+                print(f"⚠️ Lease do job {job_id} perdido para outro worker")
+                break
+
+    heartbeat = threading.Thread(target=beat, name=f"lease-{job_id}", daemon=True)
+    heartbeat.start()
+
+    def stop():
+        stop_event.set()
+        heartbeat.join()
+
+    return stop
+
+def complete_job(queue_dir: Path, job_id: int, owner: str,
+                 results: List[project_processor.CompiledProject], error: str = None):
+    """Grava o resultado do job (DONE se compilou, FAILED caso contrário)."""
+    with closing(_connect(queue_dir)) as conn:
+        if results:
+            conn.execute(
+                """UPDATE jobs SET state = ?, result = ?, lease_owner = NULL, updated = ?
+                   WHERE id = ? AND lease_owner = ?""",
+                (DONE, _encode_result(results[0]), time.time(), job_id, owner)
+            )
+        else:
+            conn.execute(
+                """UPDATE jobs SET state = ?, error = ?, lease_owner = NULL, updated = ?
+                   WHERE id = ? AND lease_owner = ?""",
+                (FAILED, error or "falha na compilação", time.time(), job_id, owner)
+            )
+
+# =============================================================================
+# WORKER
+# =============================================================================
+
+def _run_job(job: sqlite3.Row, dependencies: Dict,
+             run_simulations: bool) -> List[project_processor.CompiledProject]:
+    """Executa um job com a lógica existente de compilação."""
+    project_info = _decode_project_info(job["project_info"])
+    N = _decode_n(job["n"])
+
+    try:
+        if N == "default":
+            project = project_processor.compile_single_project(project_info, dependencies, run_simulations)
+            results = [project] if project else []
+        else:
+            results = project_processor.compile_parametrized_project(
+                project_info, dependencies, [N], run_simulations, max_workers=1
+            )
+    except Exception as e:
+        print(f"💥 ERRO inesperado no job {job['module']} (N={job['n']}): {e}")
+        return []
+
+    # O .pow.rpt precisa existir antes do job ser dado como concluído
+    power_analysis.wait_all()
+    return results
+
+def _has_open_jobs(queue_dir: Path) -> bool:
+    with closing(_connect(queue_dir)) as conn:
+        row = conn.execute(
+            "SELECT COUNT(*) FROM jobs WHERE state IN (?, ?)", (PENDING, RUNNING)
+        ).fetchone()
+        return row[0] > 0
+
+def run_worker(queue_dir: Path, dependencies: Dict, run_simulations: bool, owner: str = None,
+               max_jobs: int = None) -> int:
+    """Loop do worker: reivindica e executa jobs até a fila esvaziar.
+
+    Retorna o número de jobs executados por este worker.
+    """
+    owner = owner or worker_id()
+    executed = 0
+    print(f"👷 Worker {owner} na fila {queue_dir}")
+
+    while max_jobs is None or executed < max_jobs:
+        job = claim_job(queue_dir, owner)
+        if job is None:
+            if not _has_open_jobs(queue_dir):
+                break
+            # Jobs bloqueados por dependências ou em execução em outros workers
+            time.sleep(config.JOB_POLL_INTERVAL)
+            continue
+
+        print(f"\n📥 [{owner}] Job {job['id']}: {job['module']} (N={job['n']})")
+        stop_heartbeat = _start_heartbeat(queue_dir, job["id"], owner)
+        try:
+            results = _run_job(job, dependencies, run_simulations)
+        finally:
+            stop_heartbeat()
+        error = None
+        if not results:
+            failure = project_processor.variant_failure(
+                _decode_project_info(job["project_info"]), _decode_n(job["n"])
+            )
+            error = f"{failure['Status']}: {failure['Reason']}"
+        complete_job(queue_dir, job["id"], owner, results, error)
+        executed += 1
+
+    print(f"🏁 Worker {owner}: {executed} job(s) executado(s)")
+    return executed
+
+# =============================================================================
+# RESULTADOS
+# =============================================================================
+
+def collect_results(queue_dir: Path) -> Tuple[List[project_processor.CompiledProject],
+                                              List[project_processor.FailedProject]]:
+    """Resultados dos jobs concluídos e falhas, na ordem de submissão."""
+    with closing(_connect(queue_dir)) as conn:
+        rows = conn.execute(
+            "SELECT module, n, state, error, result FROM jobs ORDER BY id"
+        ).fetchall()
+
+    compiled_projects = []
+    failed_projects = []
+    for row in rows:
+        if row["state"] == DONE:
+            compiled_projects.append(_decode_result(row["result"]))
+        elif row["state"] in (FAILED, SKIPPED):
+            failed_projects.append(project_processor.failure_record(
+                row["module"], _decode_n(row["n"]), row["state"], row["error"] or ""
+            ))
+        else:
+            print(f"⚠️ Job {row['module']} (N={row['n']}) em {row['state']}")
+    return compiled_projects, failed_projects
@@ -0,0 +1,60 @@
+# log_watcher.py
+"""
+OBSERVADOR DE LOG COM PARADA ANTECIPADA (FAIL-FAST)
+
+Responsável por:
+- Reconhecer linhas fatais "Error (" do Quartus durante a execução
+- Padrões de parada configuráveis (config.QUARTUS_STOP_PATTERNS)
+- Parada por slack de setup abaixo do alvo (config.SETUP_SLACK_TARGET_NS)
+
+Usado como hook de linha do tool_runner: devolver um motivo encerra a
+ferramenta na hora, liberando núcleos e memória para o próximo job.
+"""
+
+import re
+from typing import Optional, List, Pattern
+
+import config
+
+# Linha fatal do Quartus, ex.: "Error (10161): Verilog HDL error at ..."
+FATAL_ERROR_PATTERN = re.compile(r"^\s*Error \(\d+\)")
+
+# Ex.: "Info (332146): Worst-case setup slack is -1.234"
+SETUP_SLACK_PATTERN = re.compile(r"Worst-case setup slack is\s+(-?[\d.]+)")
+
+class LogWatcher:
+    """Hook de linha que decide quando uma execução do Quartus está condenada."""
+
+    def __init__(self, stage: str, slack_target_ns: float = None,
+                 stop_patterns: List[str] = None):
+        self.stage = stage
+        self.slack_target_ns = (
+            config.SETUP_SLACK_TARGET_NS if slack_target_ns is None else slack_target_ns
+        )
+        patterns = config.QUARTUS_STOP_PATTERNS if stop_patterns is None else stop_patterns
+        self.stop_patterns: List[Pattern] = [re.compile(pattern) for pattern in patterns]
+        self.reason: Optional[str] = None
+        self.line: Optional[str] = None
+
+    def __call__(self, stream: str, line: str) -> Optional[str]:
+        reason = self._check(line)
+        if reason and self.reason is None:
+            self.reason = reason
+            self.line = line.strip()
+        return reason
+
+    def _check(self, line: str) -> Optional[str]:
+        if FATAL_ERROR_PATTERN.match(line):
+            return f"erro fatal em {self.stage}: {line.strip()}"
+
+        for pattern in self.stop_patterns:
+            if pattern.search(line):
+                return f"padrão de parada '{pattern.pattern}' em {self.stage}"
+
+        if self.slack_target_ns is not None:
+            match = SETUP_SLACK_PATTERN.search(line)
+            if match and float(match.group(1)) < self.slack_target_ns:
+                return (f"slack de setup {float(match.group(1)):.3f} ns abaixo do alvo "
+                        f"{self.slack_target_ns:.3f} ns")
+
+        return None
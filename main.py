@@ -10,16 +10,98 @@ Este script orquestra todo o processo:
 5. Gera relatórios consolidados
 """
 
+import argparse
 import json
 from pathlib import Path
+from typing import Dict, List
+import build_cache
 import config
+import job_queue
+import pipeline
 import project_loader
 import project_processor
 import report_generator
+import scheduler
+import watch
+
+def parse_args(argv=None) -> argparse.Namespace:
+    """Interpreta argumentos de linha de comando."""
+    parser = argparse.ArgumentParser(description="Build automatizado + simulação + relatório")
+    parser.add_argument(
+        "-j", "--jobs", type=int, default=config.DEFAULT_JOBS,
+        help="Número máximo de módulos compilados em paralelo"
+    )
+    parser.add_argument(
+        "--sweep-jobs", type=int, default=config.SWEEP_JOBS,
+        help="Número máximo de variantes N compiladas em paralelo por módulo"
+    )
+    parser.add_argument(
+        "--mem-limit", type=int, default=config.MEMORY_CEILING_MB, metavar="MB",
+        help="Teto de memória (MB) para admitir novas ferramentas simultâneas"
+    )
+    parser.add_argument(
+        "--force", action="store_true",
+        help="Ignora o cache incremental e recompila todos os módulos"
+    )
+    parser.add_argument(
+        "--no-power", action="store_true",
+        help="Modo de iteração rápida: sem quartus_pow e sem colunas de potência"
+    )
+    parser.add_argument(
+        "--slack-target", type=float, default=config.SETUP_SLACK_TARGET_NS, metavar="NS",
+        help="Aborta o timing assim que o pior slack de setup ficar abaixo deste valor"
+    )
+    parser.add_argument(
+        "--sim-only", action="store_true",
+        help="Pula o Quartus e apenas simula, reaproveitando a síntese anterior nos relatórios"
+    )
+    parser.add_argument(
+        "--detect-changes", action="store_true",
+        help="Ativa --sim-only automaticamente quando apenas testbenches mudaram"
+    )
+    parser.add_argument(
+        "--sim-results", choices=("manifest", "hardlink", "none"), default=config.SIM_RESULTS_WORK_MODE,
+        help="Library work nos resultados de cada testbench: manifesto, árvore de hard links "
+             "ou nenhuma (só logs, resumos e VCD)"
+    )
+    parser.add_argument(
+        "--pipeline", action="store_true",
+        help="Executa em estágios (cópia → simulação RTL → Quartus) ligados por filas"
+    )
+    parser.add_argument(
+        "--watch", action="store_true",
+        help="Após o build, monitora src/ e reconstrói só os módulos afetados por cada alteração"
+    )
+    parser.add_argument(
+        "--queue-dir", type=Path, default=config.JOB_QUEUE_DIR,
+        help="Diretório compartilhado da fila de jobs (submit/worker/report)"
+    )
+
+    # Sem subcomando: execução local completa
+    subparsers = parser.add_subparsers(dest="command")
+    subparsers.add_parser("submit", help="Enfileira um job por módulo/N na fila compartilhada")
+    worker_parser = subparsers.add_parser("worker", help="Executa jobs da fila até esvaziá-la")
+    worker_parser.add_argument("--worker-id", default=None, help="Identificador do worker (padrão: host:pid)")
+    worker_parser.add_argument("--max-jobs", type=int, default=None, help="Encerra após N jobs")
+    subparsers.add_parser("report", help="Gera os relatórios a partir dos resultados da fila")
+    return parser.parse_args(argv)
+
+def generate_reports(compiled_projects: List, failed_projects: List = None) -> List[Dict]:
+    """Gera os relatórios finais, incluindo as variantes com falha."""
+    rows = []
+    if failed_projects:
+        print(f"⚠️ {len(failed_projects)} variante(s) com falha ou pulada(s)")
+    if compiled_projects or failed_projects:
+        rows = report_generator.generate_all_reports(compiled_projects, failed_projects)
+        print("✅ Relatórios gerados com sucesso")
+    if not compiled_projects:
+        print("❌ Nenhum projeto foi compilado")
+    return rows
 
 # main.py (apenas a parte do loop principal)
-def main():
+def main(argv=None):
     """Fluxo principal de execução."""
+    args = parse_args(argv)
     print("🚀 Build automatizado + simulação + relatório completo")
     
     # ========================
@@ -28,64 +110,70 @@ def main():
     run_simulations = project_processor.verify_simulation_environment()
     dependencies = project_loader.load_dependencies()
     bitwidths = [4, 8]
-    compiled_projects = []
+    source_snapshot = build_cache.compute_source_snapshot()
+    sim_only = args.sim_only
+    if not sim_only and not args.force and args.detect_changes:
+        sim_only = build_cache.only_testbenches_changed(source_snapshot)
+        if sim_only:
+            print("🧪 Apenas testbenches mudaram desde o último build: modo sim-only")
+    runtime_overrides = {
+        "SWEEP_JOBS": args.sweep_jobs,
+        "MEMORY_CEILING_MB": args.mem_limit,
+        "BUILD_CACHE_ENABLED": config.BUILD_CACHE_ENABLED and not args.force,
+        "POWER_MODE": "off" if args.no_power else config.POWER_MODE,
+        "SIM_ONLY": sim_only,
+        "SETUP_SLACK_TARGET_NS": args.slack_target,
+        "SIM_RESULTS_WORK_MODE": args.sim_results,
+    }
+    scheduler.apply_overrides(runtime_overrides)
+
+    # ========================
+    # FILA DE JOBS (submit / worker / report)
+    # ========================
+    if args.command == "submit":
+        job_queue.submit_projects(args.queue_dir, project_loader.load_projects(dependencies), dependencies, bitwidths)
+        return
+    if args.command == "worker":
+        job_queue.run_worker(args.queue_dir, dependencies, run_simulations, owner=args.worker_id, max_jobs=args.max_jobs)
+        return
+    if args.command == "report":
+        generate_reports(*job_queue.collect_results(args.queue_dir))
+        return
 
     # ========================
     # DETECTA ESTRUTURA DO PROJETO
     # ========================
-    if project_loader.is_hierarchical(dependencies):
-        print("🌲 Estrutura hierárquica detectada")
-        projects_info = project_loader.load_hierarchical_projects(dependencies)
-    else:
-        print("📜 Estrutura plana detectada") 
-        projects_info = project_loader.load_flat_projects(dependencies)
+    valid_projects = project_loader.load_projects(dependencies)
 
     # ========================
     # LOOP PRINCIPAL - PROCESSAMENTO
     # ========================
-    for project_info in projects_info:
-        # Handle diferentes formatos de retorno
-        if len(project_info) == 4:
-            module_name, project_path, rtl_files, sdc_files = project_info
-            copied_tbs = []  # Inicializa vazio
-        elif len(project_info) == 5:
-            module_name, project_path, rtl_files, sdc_files, copied_tbs = project_info
-        else:
-            print(f"❌ Formato inválido de project_info: {project_info}")
-            continue
-            
-        print(f"\n🔧 Processando módulo: {module_name}")
-
-        # Verifica se tem parâmetro N
-        has_N = project_processor.check_has_parameter_n(project_path, module_name)
-        
-        if has_N:
-            # Projeto com parâmetro N - múltiplas compilações com organização
-            projects = project_processor.compile_parametrized_project(
-                (module_name, project_path, rtl_files, sdc_files, copied_tbs), 
-                bitwidths, run_simulations
-            )
-            compiled_projects.extend(projects)
-        else:
-            # Projeto único - uma compilação
-            project = project_processor.compile_single_project(
-                (module_name, project_path, rtl_files, sdc_files, copied_tbs), 
-                run_simulations
-            )
-            if project:
-                compiled_projects.append(project)
+    if args.pipeline:
+        compiled_projects, failed_projects = pipeline.run_pipeline(
+            valid_projects, dependencies, bitwidths, run_simulations
+        )
+    else:
+        compiled_projects, failed_projects = scheduler.run_projects(
+            valid_projects, dependencies, bitwidths, run_simulations,
+            jobs=args.jobs, overrides=runtime_overrides
+        )
+
+    # Snapshot das fontes só após um build completo sem falhas
+    if not sim_only and not failed_projects:
+        build_cache.save_source_snapshot(source_snapshot)
 
     # ========================
     # RELATÓRIOS FINAIS
     # ========================
-    if compiled_projects:
-        report_generator.generate_all_reports(compiled_projects)
-        print("✅ Relatórios gerados com sucesso")
-    else:
-        print("❌ Nenhum projeto foi compilado")
+    report_rows = generate_reports(compiled_projects, failed_projects)
 
     print("\n🎯 Fluxo completo concluído!")
 
+    if args.watch:
+        watch.watch(dependencies, bitwidths, run_simulations,
+                    args.jobs, runtime_overrides, report_rows,
+                    detect_changes=args.detect_changes and not args.force and not args.sim_only)
+
 
 
 if __name__ == "__main__":
@@ -0,0 +1,94 @@
+# modelsim_libs.py
+"""
+BIBLIOTECAS MODELSIM COMPARTILHADAS
+
+Responsável por:
+- Compilar cada módulo de dependência uma única vez em uma biblioteca
+  própria (config.MODELSIM_LIB_DIR/<módulo>_<hash>)
+- Chave por hash do conteúdo do fonte + opções do vlog + instalação do
+  ModelSim: o mesmo fonte (linkado em vários projetos e variantes N)
+  reaproveita a mesma biblioteca; fonte alterado gera outra chave
+- Lock entre processos para que jobs paralelos não compilem a mesma
+  biblioteca ao mesmo tempo
+
+Os dependentes referenciam as bibliotecas com `vsim -L <dir>`; parâmetros
+passados na instanciação são resolvidos na elaboração, então uma única
+biblioteca serve a todos os valores de N.
+"""
+
+import hashlib
+import shutil
+import time
+from pathlib import Path
+from typing import List, Optional
+
+import config
+import resources
+import tool_runner
+import verilog_index
+
+# Marcador gravado só após vlog bem-sucedido (biblioteca pronta para uso)
+READY_MARKER = "_fpuflow_ready.json"
+
+def _vlog_args(source: Path) -> List[str]:
+    sv_args = ["-sv"] if (source.suffix.lower() == ".sv"
+                          or verilog_index.uses_systemverilog(source)) else []
+    return [*config.VLOG_EXTRA_ARGS, *sv_args]
+
+def library_key(source: Path) -> str:
+    """Hash do fonte, das opções do vlog e da instalação do ModelSim."""
+    hasher = hashlib.sha256()
+    hasher.update(f"modelsim={config.MODELSIM_DIR}|{source.name}|{' '.join(_vlog_args(source))}\n".encode())
+    hasher.update(source.read_bytes())
+    return hasher.hexdigest()
+
+def library_dir(source: Path) -> Path:
+    return config.MODELSIM_LIB_DIR / f"{source.stem}_{library_key(source)[:16]}"
+
+def ensure_library(source: Path) -> Optional[Path]:
+    """Biblioteca compilada do fonte (compila se ainda não existir)."""
+    lib_dir = library_dir(source)
+    if (lib_dir / READY_MARKER).exists():
+        return lib_dir
+
+    with resources.file_lock(config.LOCK_DIR / f"modelsim_lib_{lib_dir.name}.lock"):
+        # Outro processo pode ter compilado enquanto aguardávamos o lock
+        if (lib_dir / READY_MARKER).exists():
+            return lib_dir
+        if lib_dir.exists():
+            shutil.rmtree(lib_dir)  # Compilação anterior interrompida
+        lib_dir.parent.mkdir(parents=True, exist_ok=True)
+
+        vlib = tool_runner.run_tool(
+            [str(config.MODELSIM_DIR / "vlib"), lib_dir.name],
+            lib_dir.parent / f"{lib_dir.name}.vlib.log", cwd=lib_dir.parent
+        )
+        if not vlib.ok:
+            print(f"   ❌ Falha ao criar biblioteca {lib_dir.name}: {' '.join(vlib.stderr_tail)}")
+            return None
+
+        cmd = [str(config.MODELSIM_DIR / "vlog.exe"), "-work", lib_dir.name,
+               *_vlog_args(source), str(source)]
+        result = tool_runner.run_tool(cmd, lib_dir / "vlog.log", cwd=lib_dir.parent)
+        if not result.ok:
+            print(f"   ❌ Falha ao compilar {source.name} na biblioteca compartilhada")
+            for err in result.stderr_tail[:3]:
+                if err.strip():
+                    print(f"      {err}")
+            return None
+
+        resources.write_json_atomic(lib_dir / READY_MARKER, {
+            "source": str(source), "compiled": time.time(),
+        })
+        print(f"   📚 Biblioteca compartilhada: {lib_dir.name}")
+    return lib_dir
+
+def ensure_libraries(sources: List[Path]) -> Optional[List[Path]]:
+    """Bibliotecas de todas as dependências (None se alguma falhar)."""
+    libraries = []
+    for source in sources:
+        lib_dir = ensure_library(source)
+        if lib_dir is None:
+            return None
+        libraries.append(lib_dir)
+    return libraries
@@ -0,0 +1,183 @@
+# module_index.py
+"""
+ÍNDICE DE ARQUIVOS RTL, TESTBENCH E SDC
+
+Responsável por:
+- Uma única varredura de src/rtl, src/tb e src/sdc (nome de arquivo → caminhos)
+- Persistência em disco, invalidada pelo mtime dos diretórios varridos
+- Aviso de módulos/testbenches com nome duplicado
+- Consultas usadas no lugar de rglob/glob por dependência e por projeto
+- Mapa módulo → testbenches por regras exatas de nome (<m>_tb, tb_<m>,
+  <m>_tb_<variante>), sem casamentos por substring
+
+O mtime de um diretório muda quando entradas são criadas, removidas ou
+renomeadas, então validar o índice custa um stat por diretório em vez
+de uma varredura completa por consulta.
+"""
+
+import json
+import os
+import threading
+from pathlib import Path
+from typing import Dict, List, Optional
+
+import config
+
+INDEX_VERSION = 1
+
+# Categoria → (diretório raiz, extensões indexadas)
+_CATEGORIES = {
+    "rtl": (lambda: config.RTL_DIR, (".v", ".sv")),
+    "tb": (lambda: config.TB_DIR, (".v", ".sv")),
+    "sdc": (lambda: config.SDC_DIR, (".sdc",)),
+}
+
+_index: Optional[Dict] = None
+_testbench_map: Optional[Dict[str, List[Path]]] = None
+_lock = threading.Lock()
+
+# =============================================================================
+# VARREDURA E PERSISTÊNCIA
+# =============================================================================
+
+def _scan() -> Dict:
+    """Varre todas as raízes uma única vez."""
+    index = {"version": INDEX_VERSION, "dirs": {}, "files": {}}
+
+    for category, (root_getter, extensions) in _CATEGORIES.items():
+        root = root_getter()
+        files: Dict[str, List[str]] = {}
+        if root.exists():
+            for dirpath, dirnames, filenames in os.walk(root):
+                dirnames.sort()
+                index["dirs"][dirpath] = os.stat(dirpath).st_mtime_ns
+                for filename in sorted(filenames):
+                    if filename.endswith(extensions):
+                        files.setdefault(filename, []).append(os.path.join(dirpath, filename))
+        index["files"][category] = files
+
+    return index
+
+def _is_valid(index: Dict) -> bool:
+    """True se nenhum diretório varrido mudou desde a varredura."""
+    if index.get("version") != INDEX_VERSION:
+        return False
+    for category, (root_getter, _) in _CATEGORIES.items():
+        root = root_getter()
+        if root.exists() and str(root) not in index["dirs"]:
+            return False
+    for dirpath, mtime in index["dirs"].items():
+        try:
+            if os.stat(dirpath).st_mtime_ns != mtime:
+                return False
+        except OSError:
+            return False
+    return True
+
+def _load() -> Optional[Dict]:
+    try:
+        with open(config.MODULE_INDEX_FILE, "r", encoding="utf-8") as f:
+            return json.load(f)
+    except (OSError, ValueError):
+        return None
+
+def _save(index: Dict):
+    config.MODULE_INDEX_FILE.parent.mkdir(parents=True, exist_ok=True)
+    tmp_path = config.MODULE_INDEX_FILE.with_name(f"{config.MODULE_INDEX_FILE.name}.{os.getpid()}.tmp")
+    with open(tmp_path, "w", encoding="utf-8") as f:
+        json.dump(index, f)
+    os.replace(tmp_path, config.MODULE_INDEX_FILE)
+
+def _report_duplicates(index: Dict):
+    """Avisa sobre nomes de arquivo presentes em mais de um diretório."""
+    for category in ("rtl", "tb"):
+        for filename, paths in index["files"][category].items():
+            if len(paths) > 1:
+                print(f"⚠️ {category.upper()} duplicado: {filename} em {len(paths)} locais "
+                      f"(usando {Path(paths[0]).relative_to(config.SRC_DIR)})")
+                for path in paths[1:]:
+                    print(f"   ↳ ignorado: {Path(path).relative_to(config.SRC_DIR)}")
+
+def get_index() -> Dict:
+    """Índice atual (memória → disco → nova varredura)."""
+    global _index
+    with _lock:
+        if _index is None:
+            stored = _load()
+            if stored is not None and _is_valid(stored):
+                _index = stored
+            else:
+                _index = _scan()
+                _save(_index)
+                total = sum(len(files) for files in _index["files"].values())
+                print(f"🗂️ Índice de fontes atualizado: {total} arquivo(s)")
+                _report_duplicates(_index)
+        return _index
+
+def invalidate():
+    """Descarta o índice em memória (a próxima consulta revalida pelo disco)."""
+    global _index, _testbench_map
+    with _lock:
+        _index = None
+        _testbench_map = None
+
+# =============================================================================
+# CONSULTAS
+# =============================================================================
+
+def _paths(category: str, filename: str) -> List[Path]:
+    return [Path(p) for p in get_index()["files"][category].get(filename, [])]
+
+def find_rtl(module_name: str, extension: str = ".v") -> Optional[Path]:
+    """Arquivo RTL de um módulo (primeiro em ordem de caminho, se duplicado)."""
+    paths = _paths("rtl", f"{module_name}{extension}")
+    return paths[0] if paths else None
+
+def rtl_files_in(directory: Path, extension: str = ".v") -> List[Path]:
+    """Arquivos RTL diretamente dentro de um diretório."""
+    directory = str(directory)
+    return sorted(
+        Path(path)
+        for filename, paths in get_index()["files"]["rtl"].items() if filename.endswith(extension)
+        for path in paths if os.path.dirname(path) == directory
+    )
+
+def find_testbench(filename: str) -> Optional[Path]:
+    """Testbench pelo nome de arquivo exato."""
+    paths = _paths("tb", filename)
+    return paths[0] if paths else None
+
+def testbench_module(filename: str) -> Optional[str]:
+    """Módulo testado, pelas regras de nome: <m>_tb, tb_<m> ou <m>_tb_<variante>."""
+    stem = os.path.splitext(filename)[0]
+    if stem.endswith("_tb"):
+        return stem[:-len("_tb")] or None
+    if stem.startswith("tb_"):
+        return stem[len("tb_"):] or None
+    if "_tb_" in stem:
+        return stem.split("_tb_", 1)[0] or None
+    return None
+
+def testbenches_for(module_name: str) -> List[Path]:
+    """Testbenches de um módulo (mapa construído uma vez por índice)."""
+    global _testbench_map
+    index = get_index()
+    with _lock:
+        if _testbench_map is None:
+            mapping: Dict[str, List[Path]] = {}
+            for filename, paths in index["files"]["tb"].items():
+                module = testbench_module(filename)
+                if module:
+                    # Nome duplicado: vale o primeiro caminho (ver _report_duplicates)
+                    mapping.setdefault(module, []).append(Path(paths[0]))
+            _testbench_map = {module: sorted(tbs) for module, tbs in mapping.items()}
+        return list(_testbench_map.get(module_name, []))
+
+def sdc_files() -> List[Path]:
+    """Arquivos SDC do diretório SDC (sem subdiretórios)."""
+    sdc_dir = str(config.SDC_DIR)
+    return sorted(
+        Path(path)
+        for paths in get_index()["files"]["sdc"].values()
+        for path in paths if os.path.dirname(path) == sdc_dir
+    )
@@ -0,0 +1,201 @@
+# pipeline.py
+"""
+PIPELINE EM ESTÁGIOS: PREPARAÇÃO → SIMULAÇÃO RTL → QUARTUS
+
+Responsável por:
+- Estágio 1: cópia de arquivos e preparação das variantes (N_variants/N{N})
+- Estágio 2: compilação vlog + simulação vsim (RTL, sem netlist do Quartus)
+- Estágio 3: síntese, fit e potência no Quartus
+- Encadeamento dos estágios por filas, mantendo simulador e Quartus ocupados
+- Propagação de falhas: variantes de dependentes de um módulo com falha são
+  puladas ao chegar a um estágio depois que a falha já é conhecida
+"""
+
+import queue
+import threading
+from typing import List, Dict, Set, Tuple, Optional
+
+import config
+import project_processor
+import scheduler
+
+# Marca de fim de fila
+_STOP = None
+
+class _FailureTracker:
+    """Módulos com falha e registros de falha, compartilhados entre estágios."""
+
+    def __init__(self, projects_info: List[Tuple], graph: Dict[int, Set[int]], bitwidths: List[int]):
+        self.projects_info = projects_info
+        self.graph = graph
+        self.bitwidths = bitwidths
+        self.failed: Set[int] = set()
+        self.records: Dict[Tuple[int, int], Dict] = {}
+        self.lock = threading.Lock()
+
+    def failed_dependency(self, index: int) -> Optional[str]:
+        with self.lock:
+            failed_deps = sorted(self.graph[index] & self.failed)
+        return self.projects_info[failed_deps[0]][0] if failed_deps else None
+
+    def skip(self, key: Tuple[int, int], variant, failed_dependency: str):
+        module_name, N = variant[0][0], variant[2]
+        print(f"⏭️ {module_name} (N={N}): pulado, dependência {failed_dependency} falhou")
+        record = project_processor.failure_record(
+            module_name, N, project_processor.STATUS_SKIPPED_DEP_FAILED,
+            f"dependência {failed_dependency} falhou"
+        )
+        with self.lock:
+            self.failed.add(key[0])
+            self.records[key] = record
+
+    def fail_module(self, index: int, reason: str):
+        project_info = self.projects_info[index]
+        with self.lock:
+            self.failed.add(index)
+            for position, N in enumerate(project_processor.expected_variants(project_info, self.bitwidths)):
+                self.records[(index, position)] = project_processor.failure_record(
+                    project_info[0], N, project_processor.STATUS_FAILED, reason
+                )
+
+    def fail(self, key: Tuple[int, int], variant):
+        record = project_processor.variant_failure(variant[0], variant[2])
+        with self.lock:
+            self.failed.add(key[0])
+            self.records[key] = record
+
+# =============================================================================
+# ESTÁGIOS
+# =============================================================================
+
+def _prepare_stage(projects_info: List[Tuple], dependencies: Dict, order: List[int],
+                   bitwidths: List[int], sim_queue: queue.Queue, sim_workers: int, tracker: _FailureTracker):
+    """Estágio 1: prepara as variantes e as envia para simulação."""
+    for index in order:
+        project_info = projects_info[index]
+        print(f"\n📦 [Estágio 1] Preparando {project_info[0]}")
+        try:
+            variants = project_processor.prepare_variants(project_info, dependencies, bitwidths)
+        except Exception as e:
+            print(f"💥 [Estágio 1] Falha ao preparar {project_info[0]}: {e}")
+            tracker.fail_module(index, f"falha na preparação: {e}")
+            continue
+
+        for position, variant in enumerate(variants):
+            sim_queue.put(((index, position), variant))
+
+    for _ in range(sim_workers):
+        sim_queue.put(_STOP)
+
+def _simulation_stage(sim_queue: queue.Queue, synth_queue: queue.Queue, run_simulations: bool,
+                      tracker: _FailureTracker):
+    """Estágio 2: simulação RTL, reportando testbenches com falha imediatamente."""
+    while True:
+        item = sim_queue.get()
+        if item is _STOP:
+            break
+
+        key, variant = item
+        module_name, N = variant[0][0], variant[2]
+        failed_dependency = tracker.failed_dependency(key[0])
+        if failed_dependency:
+            tracker.skip(key, variant, failed_dependency)
+            continue
+
+        try:
+            sim_results = project_processor.simulate_variant(variant, run_simulations)
+        except Exception as e:
+            print(f"💥 [Estágio 2] Falha na simulação de {module_name} (N={N}): {e}")
+            sim_results = []
+
+        for result in sim_results:
+            status = result.get("Simulation_Status", "UNKNOWN")
+            if status != "ALL_PASSED":
+                print(f"🚨 [Estágio 2] {module_name} (N={N}) {result.get('TB_Name', '')}: {status}")
+
+        synth_queue.put((key, variant, sim_results))
+
+def _synthesis_stage(synth_queue: queue.Queue, dependencies: Dict, results: Dict,
+                     lock: threading.Lock, tracker: _FailureTracker):
+    """Estágio 3: Quartus (síntese, fit e potência)."""
+    while True:
+        item = synth_queue.get()
+        if item is _STOP:
+            break
+
+        key, variant, sim_results = item
+        module_name, N = variant[0][0], variant[2]
+        failed_dependency = tracker.failed_dependency(key[0])
+        if failed_dependency:
+            tracker.skip(key, variant, failed_dependency)
+            continue
+
+        try:
+            success = project_processor.synthesize_variant(variant, dependencies)
+        except Exception as e:
+            print(f"💥 [Estágio 3] Falha no Quartus para {module_name} (N={N}): {e}")
+            success = False
+
+        if success:
+            with lock:
+                results[key] = project_processor.finalize_variant(variant, sim_results)
+        else:
+            print(f"❌ [Estágio 3] Falha na compilação de {module_name} (N={N})")
+            tracker.fail(key, variant)
+
+# =============================================================================
+# EXECUÇÃO
+# =============================================================================
+
+def run_pipeline(projects_info: List[Tuple], dependencies: Dict, bitwidths: List[int],
+                 run_simulations: bool, sim_workers: int = None, synth_workers: int = None
+                 ) -> Tuple[List[project_processor.CompiledProject], List[project_processor.FailedProject]]:
+    """Executa todos os projetos no pipeline de três estágios.
+
+    Enquanto o Quartus compila uma variante, o ModelSim já simula as
+    próximas. Retorna (compilados, falhas) na ordem de projects_info/bitwidths.
+    """
+    sim_workers = max(1, sim_workers or config.PIPELINE_SIM_WORKERS)
+    synth_workers = max(1, synth_workers or config.PIPELINE_SYNTH_WORKERS)
+    print(f"🔀 Pipeline: {sim_workers} simulador(es), {synth_workers} compilação(ões) Quartus")
+
+    graph = scheduler.build_project_graph(projects_info, dependencies)
+    order = scheduler.topological_order(graph)
+    tracker = _FailureTracker(projects_info, graph, bitwidths)
+    sim_queue = queue.Queue()
+    synth_queue = queue.Queue()
+    results = {}
+    lock = threading.Lock()
+
+    preparer = threading.Thread(
+        target=_prepare_stage,
+        args=(projects_info, dependencies, order, bitwidths, sim_queue, sim_workers, tracker),
+        name="pipeline-prepare"
+    )
+    simulators = [
+        threading.Thread(target=_simulation_stage, args=(sim_queue, synth_queue, run_simulations, tracker),
+                         name=f"pipeline-sim-{i}")
+        for i in range(sim_workers)
+    ]
+    synthesizers = [
+        threading.Thread(target=_synthesis_stage, args=(synth_queue, dependencies, results, lock, tracker),
+                         name=f"pipeline-quartus-{i}")
+        for i in range(synth_workers)
+    ]
+
+    for thread in [preparer] + simulators + synthesizers:
+        thread.start()
+
+    preparer.join()
+    for thread in simulators:
+        thread.join()
+
+    # Simuladores encerrados: libera os estágios de Quartus
+    for _ in synthesizers:
+        synth_queue.put(_STOP)
+    for thread in synthesizers:
+        thread.join()
+
+    compiled_projects = [results[key] for key in sorted(results)]
+    failed_projects = [tracker.records[key] for key in sorted(tracker.records)]
+    return compiled_projects, failed_projects
@@ -0,0 +1,101 @@
+# power_analysis.py
+"""
+ANÁLISE DE POTÊNCIA FORA DO CAMINHO CRÍTICO
+
+Responsável por:
+- Enfileirar o quartus_pow em background logo após o fit/timing
+- Permitir que a próxima compilação comece sem esperar a potência
+- Espera seletiva pelo .pow.rpt de cada projeto na geração de relatórios
+
+Modos (config.POWER_MODE):
+- "async":  potência em background (padrão)
+- "inline": potência logo após o timing, no mesmo job
+- "off":    sem análise de potência (--no-power)
+"""
+
+import concurrent.futures
+import threading
+from pathlib import Path
+from typing import Any, Callable, Dict, Optional
+
+import config
+import compile
+
+_executor = None
+_tasks: Dict[str, concurrent.futures.Future] = {}
+_lock = threading.Lock()
+
+# =============================================================================
+# AGENDAMENTO
+# =============================================================================
+
+def is_enabled() -> bool:
+    """Indica se a análise de potência faz parte do fluxo."""
+    return config.POWER_MODE != "off"
+
+def _get_executor() -> concurrent.futures.ThreadPoolExecutor:
+    global _executor
+    with _lock:
+        if _executor is None:
+            _executor = concurrent.futures.ThreadPoolExecutor(
+                max_workers=max(1, config.POWER_WORKERS), thread_name_prefix="quartus-pow"
+            )
+        return _executor
+
+def _pow_report(project_name: str, project_path: Path) -> Path:
+    return project_path / "output_files" / f"{project_name}.pow.rpt"
+
+def _run_and_notify(project_name: str, project_path: Path, N: Any,
+                    on_done: Optional[Callable[[], Any]]) -> bool:
+    """Executa o quartus_pow e chama on_done ao final."""
+    try:
+        success = compile.run_power_analysis(project_name, project_path, N)
+    except Exception as e:
+        print(f"💥 Falha na análise de potência de {project_name} (N={N}): {e}")
+        success = False
+
+    if on_done is not None:
+        on_done()
+    return success
+
+def schedule_power_analysis(project_name: str, project_path: Path, N: Any = "default",
+                            on_done: Callable[[], Any] = None):
+    """Agenda (ou executa, conforme o modo) a análise de potência de um projeto."""
+    if not is_enabled():
+        if on_done is not None:
+            on_done()
+        return
+
+    if config.POWER_MODE == "inline":
+        _run_and_notify(project_name, project_path, N, on_done)
+        return
+
+    print(f"🕒 Potência de {project_name} (N={N}) enfileirada em background")
+    future = _get_executor().submit(_run_and_notify, project_name, project_path, N, on_done)
+    with _lock:
+        _tasks[str(_pow_report(project_name, project_path))] = future
+
+# =============================================================================
+# ESPERA
+# =============================================================================
+
+def wait_for_power(project_name: str, out_dir: Path, N: Any = "default") -> bool:
+    """Espera somente pela tarefa de potência deste projeto, se houver.
+
+    Retorna True se o .pow.rpt existe ao final.
+    """
+    pow_report = out_dir / f"{project_name}.pow.rpt"
+    with _lock:
+        future = _tasks.get(str(pow_report))
+
+    if future is not None and not future.done():
+        print(f"⏳ Aguardando potência de {project_name} (N={N})...")
+        future.result()
+
+    return pow_report.exists()
+
+def wait_all():
+    """Espera todas as tarefas de potência pendentes."""
+    with _lock:
+        futures = list(_tasks.values())
+    concurrent.futures.wait(futures)
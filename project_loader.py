@@ -1,31 +1,303 @@
 # project_loader.py
 """
 CARREGAMENTO E CONFIGURAÇÃO DE PROJETOS
+
+Responsável por:
+- Leitura do dependencies.json (estrutura plana ou hierárquica)
+- Grafo de dependências achatado (adjacência + reverso), calculado uma vez
+  e guardado em disco pelo hash do dependencies.json
+- Ordem topológica, fechos transitivos, ciclos e referências pendentes
+- Preparação do ambiente de cada projeto (fontes e testbenches)
 """
 
+import hashlib
 import json
+import os
 from pathlib import Path
-from typing import Dict, List, Tuple
+from typing import Dict, List, Optional, Set, Tuple
 
 import config
 import compile
+import module_index
+import project_processor
 import simulation
+import verilog_index
 
 # Definir o tipo ProjectInfo explicitamente
 ProjectInfo = Tuple[str, Path, List[Path], List[Path], List[Path]]
 
+# Chaves com este prefixo são configuração, não módulos nem pastas
+RESERVED_KEY_PREFIX = "__"
+TESTBENCHES_KEY = "__testbenches__"  # {"módulo": ["arquivo_tb.v", ...]} (opcional)
+
+def module_tree(dependencies: Dict) -> Dict:
+    """Árvore de módulos/pastas sem as chaves reservadas."""
+    return {
+        key: module_tree(value) if isinstance(value, dict) else value
+        for key, value in dependencies.items()
+        if not key.startswith(RESERVED_KEY_PREFIX)
+    }
+
+def explicit_testbenches(dependencies: Dict, module_name: str) -> Optional[List[str]]:
+    """Testbenches declarados em "__testbenches__" para o módulo (None se ausente)."""
+    tbs = dependencies.get(TESTBENCHES_KEY, {}).get(module_name)
+    if tbs is None:
+        return None
+    return [tbs] if isinstance(tbs, str) else list(tbs)
+
 def is_hierarchical(json_obj: Dict) -> bool:
     """Detecta se o JSON tem estrutura hierárquica."""
-    return any(isinstance(v, dict) for v in json_obj.values())
+    return any(isinstance(v, dict) for v in module_tree(json_obj).values())
 
 def load_dependencies() -> Dict:
-    """Carrega dependências do arquivo JSON."""
+    """Carrega dependências do arquivo JSON e valida o grafo."""
     if not config.DEPENDENCIES_FILE.exists():
         print("❌ Arquivo dependencies.json não encontrado.")
         exit(1)
     
     with open(config.DEPENDENCIES_FILE, "r") as f:
-        return json.load(f)
+        dependencies = json.load(f)
+    
+    graph = dependency_graph(dependencies)
+    graph.report_problems()
+    audit_dependencies(graph)
+    return dependencies
+
+def audit_dependencies(graph: "DependencyGraph"):
+    """Avisa sobre submódulos instanciados no RTL e ausentes do dependencies.json."""
+    for module in graph.modules:
+        rtl_file = module_index.find_rtl(module)
+        if rtl_file is None:
+            continue
+        declared = graph.dependencies(module)
+        missing = [
+            instance for instance in verilog_index.instantiated_modules(rtl_file, module)
+            if instance != module and instance not in declared
+            and module_index.find_rtl(instance) is not None
+        ]
+        if missing:
+            print(f"⚠️ {module} instancia módulo(s) fora do dependencies.json: {', '.join(missing)}")
+    verilog_index.save()
+
+# =============================================================================
+# GRAFO DE DEPENDÊNCIAS
+# =============================================================================
+
+GRAPH_VERSION = 1
+
+class DependencyGraph:
+    """Grafo achatado de módulos do dependencies.json.
+
+    Chaves com lista são módulos (a lista são suas dependências diretas);
+    chaves com dicionário são pastas da hierarquia e não entram no grafo.
+    """
+
+    def __init__(self, data: Dict):
+        self.adjacency: Dict[str, List[str]] = data["adjacency"]
+        self.reverse: Dict[str, List[str]] = data["reverse"]
+        self.order: List[str] = data["order"]        # Dependências antes dos dependentes
+        self.cycles: List[List[str]] = data["cycles"]
+        self.dangling: Dict[str, List[str]] = data["dangling"]  # módulo → refs não declaradas
+        self._closures: Dict[str, List[str]] = data["closures"]
+        self._dependents: Dict[str, Set[str]] = {}
+
+    @property
+    def modules(self) -> List[str]:
+        return list(self.adjacency)
+
+    def dependencies(self, module: str) -> Set[str]:
+        """Fecho transitivo das dependências de um módulo."""
+        return set(self._closures.get(module, ()))
+
+    def dependents(self, module: str) -> Set[str]:
+        """Fecho transitivo dos módulos que dependem de `module` (memoizado)."""
+        if module not in self._dependents:
+            self._dependents[module] = _reachable(module, self.reverse)
+        return set(self._dependents[module])
+
+    def report_problems(self):
+        for cycle in self.cycles:
+            print(f"❌ Ciclo de dependências entre: {', '.join(cycle)}")
+        for module, refs in self.dangling.items():
+            print(f"⚠️ {module} depende de módulo(s) não declarado(s) no JSON: {', '.join(refs)}")
+
+def _flatten(tree: Dict, adjacency: Dict[str, List[str]]):
+    """Percorre a árvore uma única vez coletando módulo → dependências diretas."""
+    for key, value in tree.items():
+        if isinstance(value, dict):
+            _flatten(value, adjacency)
+        elif isinstance(value, list):
+            deps = adjacency.setdefault(key, [])
+            for dep in value:
+                if isinstance(dep, str) and dep not in deps:
+                    deps.append(dep)
+
+def _reachable(module: str, edges: Dict[str, List[str]]) -> Set[str]:
+    """Nós alcançáveis a partir de `module` (sem incluí-lo, salvo em ciclo)."""
+    found = set()
+    stack = list(edges.get(module, ()))
+    while stack:
+        node = stack.pop()
+        if node not in found:
+            found.add(node)
+            stack.extend(edges.get(node, ()))
+    return found
+
+def _strongly_connected(adjacency: Dict[str, List[str]]) -> List[List[str]]:
+    """Componentes fortemente conexas (Tarjan iterativo) com mais de um nó ou laço."""
+    index, lowlink, on_stack = {}, {}, set()
+    stack, cycles = [], []
+    counter = 0
+
+    for root in adjacency:
+        if root in index:
+            continue
+        work = [(root, iter(adjacency.get(root, ())))]
+        index[root] = lowlink[root] = counter
+        counter += 1
+        stack.append(root)
+        on_stack.add(root)
+        while work:
+            node, children = work[-1]
+            child = next(children, None)
+            if child is not None:
+                if child not in index:
+                    index[child] = lowlink[child] = counter
+                    counter += 1
+                    stack.append(child)
+                    on_stack.add(child)
+                    work.append((child, iter(adjacency.get(child, ()))))
+                elif child in on_stack:
+                    lowlink[node] = min(lowlink[node], index[child])
+                continue
+            work.pop()
+            if work:
+                parent = work[-1][0]
+                lowlink[parent] = min(lowlink[parent], lowlink[node])
+            if lowlink[node] == index[node]:
+                component = []
+                while True:
+                    member = stack.pop()
+                    on_stack.discard(member)
+                    component.append(member)
+                    if member == node:
+                        break
+                if len(component) > 1 or node in adjacency.get(node, ()):
+                    cycles.append(sorted(component))
+    return cycles
+
+def _build_graph(tree: Dict) -> Dict:
+    """Calcula adjacência, reverso, ordem topológica, fechos e problemas."""
+    adjacency: Dict[str, List[str]] = {}
+    _flatten(tree, adjacency)
+
+    dangling = {
+        module: [dep for dep in deps if dep not in adjacency]
+        for module, deps in adjacency.items()
+        if any(dep not in adjacency for dep in deps)
+    }
+    for refs in dangling.values():
+        for dep in refs:
+            adjacency.setdefault(dep, [])
+
+    reverse: Dict[str, List[str]] = {module: [] for module in adjacency}
+    for module, deps in adjacency.items():
+        for dep in deps:
+            reverse[dep].append(module)
+
+    # Kahn: dependências antes dos dependentes; nós em ciclo vão para o fim
+    remaining = {module: len(set(deps)) for module, deps in adjacency.items()}
+    ready = sorted(module for module, count in remaining.items() if count == 0)
+    order = []
+    while ready:
+        module = ready.pop(0)
+        order.append(module)
+        for dependent in sorted(set(reverse[module])):
+            remaining[dependent] -= 1
+            if remaining[dependent] == 0:
+                ready.append(dependent)
+    cyclic = sorted(module for module in adjacency if module not in set(order))
+    order.extend(cyclic)
+
+    # Fechos em ordem topológica: o de cada dependência já está pronto
+    closures: Dict[str, Set[str]] = {}
+    cyclic_set = set(cyclic)
+    for module in order:
+        if module in cyclic_set:
+            closures[module] = _reachable(module, adjacency)
+        else:
+            closure = set(adjacency[module])
+            for dep in adjacency[module]:
+                closure |= closures[dep]
+            closures[module] = closure
+
+    return {
+        "adjacency": adjacency,
+        "reverse": reverse,
+        "order": order,
+        "cycles": _strongly_connected(adjacency),
+        "dangling": dangling,
+        "closures": {module: sorted(closure) for module, closure in closures.items()},
+    }
+
+def _tree_digest(tree: Dict) -> str:
+    return hashlib.sha256(json.dumps(tree, sort_keys=True).encode()).hexdigest()
+
+_graphs: Dict[str, DependencyGraph] = {}
+_last_graph: Tuple[Optional[Dict], Optional[DependencyGraph]] = (None, None)
+
+def dependency_graph(dependencies: Dict) -> DependencyGraph:
+    """Grafo da árvore (memória → disco pelo hash do JSON → cálculo)."""
+    global _last_graph
+    if _last_graph[0] is dependencies:
+        return _last_graph[1]
+
+    digest = _tree_digest(module_tree(dependencies))
+    graph = _graphs.get(digest)
+    if graph is None:
+        data = None
+        try:
+            with open(config.DEPENDENCY_GRAPH_FILE, "r", encoding="utf-8") as f:
+                stored = json.load(f)
+            if stored.get("version") == GRAPH_VERSION and stored.get("digest") == digest:
+                data = stored
+        except (OSError, ValueError):
+            pass
+
+        if data is None:
+            data = _build_graph(module_tree(dependencies))
+            data.update(version=GRAPH_VERSION, digest=digest)
+            config.DEPENDENCY_GRAPH_FILE.parent.mkdir(parents=True, exist_ok=True)
+            tmp_path = config.DEPENDENCY_GRAPH_FILE.with_name(
+                f"{config.DEPENDENCY_GRAPH_FILE.name}.{os.getpid()}.tmp")
+            with open(tmp_path, "w", encoding="utf-8") as f:
+                json.dump(data, f)
+            os.replace(tmp_path, config.DEPENDENCY_GRAPH_FILE)
+
+        graph = DependencyGraph(data)
+        _graphs[digest] = graph
+
+    _last_graph = (dependencies, graph)
+    return graph
+
+def load_projects(dependencies: Dict) -> List[ProjectInfo]:
+    """Copia os arquivos e devolve os projetos normalizados (5 campos)."""
+    if is_hierarchical(dependencies):
+        print("🌲 Estrutura hierárquica detectada")
+        projects_info = load_hierarchical_projects(dependencies)
+    else:
+        print("📜 Estrutura plana detectada") 
+        projects_info = load_flat_projects(dependencies)
+
+    valid_projects = []
+    for project_info in projects_info:
+        # Handle diferentes formatos de retorno
+        normalized = project_processor.normalize_project_info(project_info)
+        if normalized is None:
+            print(f"❌ Formato inválido de project_info: {project_info}")
+            continue
+        valid_projects.append(normalized)
+    return valid_projects
 
 def load_hierarchical_projects(dependencies: Dict) -> List[ProjectInfo]:
     """Carrega projetos da estrutura hierárquica."""
@@ -39,7 +311,8 @@ def load_hierarchical_projects(dependencies: Dict) -> List[ProjectInfo]:
     projects_info = []
     for module_name, project_path, rtl_files, sdc_files in raw_projects:
         # Encontra testbenches para este módulo
-        tb_files = simulation.find_testbenches(module_name)
+        tb_files = simulation.find_testbenches(
+            module_name, explicit_testbenches(dependencies, module_name))
         copied_tbs = []
         if tb_files:
             print(f"🎯 Testbenches para {module_name}: {[tb.name for tb in tb_files]}")
@@ -54,7 +327,7 @@ def load_flat_projects(dependencies: Dict) -> List[ProjectInfo]:
     print("📜 Carregando projetos planos...")
     projects_info = []
     
-    for module_name in dependencies.keys():
+    for module_name in module_tree(dependencies).keys():
         project_info = setup_project_environment(module_name, dependencies)
         projects_info.append(project_info)
     
@@ -68,7 +341,8 @@ def setup_project_environment(module_name: str, dependencies: Dict) -> ProjectIn
     )
     
     # Encontra e copia testbenches
-    tb_files = simulation.find_testbenches(module_name)
+    tb_files = simulation.find_testbenches(
+        module_name, explicit_testbenches(dependencies, module_name))
     copied_tbs = []
     if tb_files:
         print(f"🎯 Testbenches encontrados: {[tb.name for tb in tb_files]}")
@@ -4,15 +4,26 @@ PROCESSAMENTO DE PROJETOS
 """
 
 import time
-import shutil
+import concurrent.futures
 from pathlib import Path
-from typing import List, Dict, Any, Tuple
+from typing import List, Dict, Any, Optional, Tuple
 
 import config
+import artifact_store
+import build_cache
 import compile
+import power_analysis
 import simulation
+import staging
+import verilog_index
 
 CompiledProject = Tuple[str, Path, Any, Path, List[Path], List[Dict]]
+BuildVariant = Tuple[Tuple, Path, Any]  # (project_info, diretório de trabalho, N)
+FailedProject = Dict[str, Any]  # {"Project", "N", "Status", "Classification", "Reason"}
+
+# Status de variantes que não foram compiladas
+STATUS_FAILED = "FAILED"
+STATUS_SKIPPED_DEP_FAILED = "SKIPPED_DEP_FAILED"
 
 def verify_simulation_environment() -> bool:
     """Verifica se o ModelSim está disponível."""
@@ -38,108 +49,315 @@ def check_has_parameter_n(project_path: Path, module_name: str) -> bool:
     if not top_file.exists():
         return False
     
-    with open(top_file, "r") as f:
-        content = f.read()
-        return "parameter N" in content or "parameter.*N" in content
+    return verilog_index.has_parameter(top_file, module_name, "N")
 
-def compile_single_project(project_info: Tuple, run_simulations: bool) -> CompiledProject:
-    """Compila projeto único (sem parâmetro N)."""
+def normalize_project_info(project_info: Tuple) -> Tuple:
+    """Normaliza project_info para o formato com testbenches (5 campos)."""
+    if len(project_info) == 4:
+        module_name, project_path, rtl_files, sdc_files = project_info
+        return (module_name, project_path, rtl_files, sdc_files, [])
+    if len(project_info) == 5:
+        return tuple(project_info)
+    return None
+
+def process_project(project_info: Tuple, dependencies: Dict, bitwidths: List[int], 
+                    run_simulations: bool) -> List[CompiledProject]:
+    """Processa um módulo completo (com ou sem parâmetro N)."""
     module_name, project_path, rtl_files, sdc_files, copied_tbs = project_info
     
+    print(f"\n🔧 Processando módulo: {module_name}")
+    
+    # Verifica se tem parâmetro N
+    if check_has_parameter_n(project_path, module_name):
+        # Projeto com parâmetro N - múltiplas compilações com organização
+        return compile_parametrized_project(project_info, dependencies, bitwidths, run_simulations)
+    
+    # Projeto único - uma compilação
+    project = compile_single_project(project_info, dependencies, run_simulations)
+    return [project] if project else []
+
+def compile_single_project(project_info: Tuple, dependencies: Dict,
+                           run_simulations: bool) -> CompiledProject:
+    """Compila projeto único (sem parâmetro N)."""
+    module_name = project_info[0]
+    
     print(f"⚙️ Compilando {module_name} (sem parâmetro N)...")
     
-    # Gera arquivos de projeto
-    compile.generate_optimized_qsf(project_path, module_name, rtl_files, sdc_files)
-    compile.create_qpf(project_path, module_name)
+    variant = prepare_single_variant(project_info)
     
     # Executa compilação
-    if compile.compile_project(module_name, project_path):
-        out_dir = project_path / "output_files"
-        sim_results = run_simulations_for_project(project_info, out_dir, "default", run_simulations)
-        return (module_name, project_path, "default", out_dir, copied_tbs, sim_results)
+    if synthesize_variant(variant, dependencies):
+        sim_results = simulate_variant(variant, run_simulations)
+        return finalize_variant(variant, sim_results)
     
     return None
 
-def compile_parametrized_project(project_info: Tuple, bitwidths: List[int], 
-                               run_simulations: bool) -> List[CompiledProject]:
-    """Compila projeto com parâmetro N para diferentes bitwidths."""
+def compile_parametrized_project(project_info: Tuple, dependencies: Dict, bitwidths: List[int], 
+                               run_simulations: bool, max_workers: int = None) -> List[CompiledProject]:
+    """Compila projeto com parâmetro N para diferentes bitwidths.
+
+    Cada variante vive em N_variants/N{N}, isolada das demais, então o sweep
+    pode rodar em até `max_workers` variantes simultâneas (config.SWEEP_JOBS).
+    Os resultados seguem a ordem de `bitwidths`.
+    """
     module_name, project_path, rtl_files, sdc_files, copied_tbs = project_info
-    results = []
     
     # Cria diretório base para N se não existir
     n_base_dir = project_path / "N_variants"
     n_base_dir.mkdir(exist_ok=True)
     
-    for N in bitwidths:
-        print(f"\n{'='*50}")
-        print(f"🧩 {module_name} | N={N}")
-        print(f"{'='*50}")
-        
-        # Cria diretório específico para este N
-        n_dir = n_base_dir / f"N{N}"
-        if n_dir.exists():
-            shutil.rmtree(n_dir)
-        n_dir.mkdir(parents=True)
-        
-        # Copia todos os arquivos para o diretório N
-        _copy_project_files_to_n_dir(project_path, n_dir, rtl_files, sdc_files, copied_tbs)
-        
-        # Define parâmetro N nos arquivos copiados
-        compile.set_parameter_in_verilog(module_name, n_dir, "N", N)
-        for tb_file in n_dir.glob("*_tb.v"):
-            simulation.set_parameter_in_tb(tb_file, "N", N)
-        
-        # Compila no diretório N
-        if compile.compile_project_with_n(module_name, n_dir, N):
-            out_dir = n_dir / "output_files"
-            sim_results = run_simulations_for_n_project(project_info, n_dir, out_dir, N, run_simulations)
-            results.append((module_name, n_dir, N, out_dir, list(n_dir.glob("*_tb.v")), sim_results))
-        else:
-            print(f"❌ Falha na compilação para N={N}")
-    
-    return results
-
-def _copy_project_files_to_n_dir(project_path: Path, n_dir: Path, 
-                               rtl_files: List[Path], sdc_files: List[Path], 
-                               tb_files: List[Path]):
-    """Copia todos os arquivos do projeto para diretório N específico."""
-    # Garante que o diretório N está dentro da estrutura organizada
-    n_dir.mkdir(parents=True, exist_ok=True)
-    
-    # Copia arquivos RTL
-    for rtl_file in rtl_files:
-        if rtl_file.exists():
-            shutil.copy2(rtl_file, n_dir / rtl_file.name)
-    
-    # Copia arquivos SDC
-    for sdc_file in sdc_files:
-        if sdc_file.exists():
-            shutil.copy2(sdc_file, n_dir / sdc_file.name)
-    
-    # Copia testbenches
-    for tb_file in tb_files:
-        if tb_file.exists():
-            shutil.copy2(tb_file, n_dir / tb_file.name)
-    
-    print(f"   📁 Arquivos copiados para: {n_dir.relative_to(project_path.parent)}")
-
-def compile_project_with_n(project_info: Tuple, N: int, run_simulations: bool) -> CompiledProject:
-    """Compila uma variante específica de N para projeto parametrizado."""
+    if max_workers is None:
+        max_workers = config.SWEEP_JOBS
+    max_workers = max(1, min(max_workers, len(bitwidths)))
+    
+    if max_workers == 1:
+        variants = [
+            _compile_n_variant(project_info, dependencies, n_base_dir, N, run_simulations)
+            for N in bitwidths
+        ]
+    else:
+        print(f"⚡ Sweep paralelo de {module_name}: {len(bitwidths)} variantes, até {max_workers} simultâneas")
+        with concurrent.futures.ThreadPoolExecutor(max_workers=max_workers) as executor:
+            variants = list(executor.map(
+                lambda N: _compile_n_variant(project_info, dependencies, n_base_dir, N, run_simulations),
+                bitwidths
+            ))
+    
+    return [variant for variant in variants if variant]
+
+def _compile_n_variant(project_info: Tuple, dependencies: Dict, n_base_dir: Path, N: int,
+                       run_simulations: bool) -> CompiledProject:
+    """Prepara, compila e simula uma variante N em seu próprio diretório."""
+    module_name = project_info[0]
+    
+    print(f"\n{'='*50}")
+    print(f"🧩 {module_name} | N={N}")
+    print(f"{'='*50}")
+    
+    variant = prepare_n_variant(project_info, dependencies, n_base_dir, N)
+    
+    # Compila no diretório N
+    if synthesize_variant(variant, dependencies):
+        sim_results = simulate_variant(variant, run_simulations)
+        return finalize_variant(variant, sim_results)
+    
+    print(f"❌ Falha na compilação para N={N}")
+    return None
+
+# =============================================================================
+# FALHAS E PROPAGAÇÃO PELO DAG
+# =============================================================================
+
+def expected_variants(project_info: Tuple, bitwidths: List[int]) -> List[Any]:
+    """Valores de N que um módulo deve produzir ("default" se não tem parâmetro N)."""
+    module_name, project_path = project_info[0], project_info[1]
+    if check_has_parameter_n(project_path, module_name):
+        return list(bitwidths)
+    return ["default"]
+
+def variant_work_dir(project_info: Tuple, N: Any) -> Path:
+    """Diretório de trabalho de uma variante."""
+    if N == "default":
+        return project_info[1]
+    return project_info[1] / "N_variants" / f"N{N}"
+
+def failure_record(module_name: str, N: Any, status: str, reason: str = "",
+                   classification: str = "") -> FailedProject:
+    """Registro de uma variante que não produziu resultados."""
+    return {
+        "Project": module_name,
+        "N": N,
+        "Status": status,
+        "Classification": classification,
+        "Reason": reason,
+    }
+
+def variant_failure(project_info: Tuple, N: Any) -> FailedProject:
+    """Registro de falha de uma variante a partir do compile_status.json."""
+    status = compile.read_compile_status(variant_work_dir(project_info, N))
+    if status.get("status") in (None, "OK"):
+        # Falha antes do Quartus (ou exceção): não há status atualizado
+        return failure_record(project_info[0], N, STATUS_FAILED, "falha fora do Quartus")
+    return failure_record(
+        project_info[0], N, status["status"],
+        status.get("reason") or f"falha em {status.get('stage')}",
+        status.get("classification", "")
+    )
+
+def power_failure(module_name: str, work_dir: Path, N: Any) -> Optional[FailedProject]:
+    """Registro de falha da análise de potência (None se o .pow.rpt existe)."""
+    if (work_dir / "output_files" / f"{module_name}.pow.rpt").exists():
+        return None
+    status = compile.read_compile_status(work_dir)
+    if status.get("stage") == "pow" and status.get("status") not in (None, "OK"):
+        return failure_record(
+            module_name, N, status["status"], status.get("reason") or "falha em pow",
+            status.get("classification", "")
+        )
+    return failure_record(module_name, N, STATUS_FAILED, "relatório de potência ausente")
+
+def collect_failures(project_info: Tuple, bitwidths: List[int],
+                     compiled: List[CompiledProject]) -> List[FailedProject]:
+    """Variantes esperadas de um módulo que não aparecem entre as compiladas."""
+    compiled_ns = {project[2] for project in compiled}
+    return [
+        variant_failure(project_info, N)
+        for N in expected_variants(project_info, bitwidths)
+        if N not in compiled_ns
+    ]
+
+def skip_for_failed_dependency(project_info: Tuple, bitwidths: List[int],
+                               failed_dependency: str) -> List[FailedProject]:
+    """Marca todas as variantes de um módulo como puladas por dependência com falha."""
+    print(f"⏭️ {project_info[0]}: pulado, dependência {failed_dependency} falhou")
+    return [
+        failure_record(project_info[0], N, STATUS_SKIPPED_DEP_FAILED,
+                       f"dependência {failed_dependency} falhou")
+        for N in expected_variants(project_info, bitwidths)
+    ]
+
+# =============================================================================
+# ESTÁGIOS DE UMA VARIANTE (preparação → simulação RTL → Quartus)
+# =============================================================================
+
+def prepare_variants(project_info: Tuple, dependencies: Dict, bitwidths: List[int]) -> List[BuildVariant]:
+    """Estágio 1: prepara os diretórios de todas as variantes de um módulo."""
     module_name, project_path, rtl_files, sdc_files, copied_tbs = project_info
     
-    # Cria diretório para este N
-    n_dir = project_path / f"N{N}"
-    if n_dir.exists():
-        shutil.rmtree(n_dir)
-    n_dir.mkdir()
+    if not check_has_parameter_n(project_path, module_name):
+        return [prepare_single_variant(project_info)]
+    
+    n_base_dir = project_path / "N_variants"
+    n_base_dir.mkdir(exist_ok=True)
+    return [prepare_n_variant(project_info, dependencies, n_base_dir, N) for N in bitwidths]
+
+def prepare_single_variant(project_info: Tuple) -> BuildVariant:
+    """Variante única: usa o próprio diretório do projeto."""
+    return (project_info, project_info[1], "default")
+
+def prepare_n_variant(project_info: Tuple, dependencies: Dict, n_base_dir: Path, N: int) -> BuildVariant:
+    """Sincroniza N_variants/N{N} com os arquivos do projeto e o parâmetro N aplicado."""
+    n_dir = n_base_dir / f"N{N}"
+    _sync_n_dir(project_info, dependencies, n_dir, N)
+    return (project_info, n_dir, N)
+
+def simulate_variant(variant: BuildVariant, run_simulations: bool) -> List[Dict]:
+    """Estágio 2: simulação RTL (não depende do netlist do Quartus)."""
+    project_info, work_dir, N = variant
+    out_dir = work_dir / "output_files"
+    
+    if N == "default":
+        return run_simulations_for_project(project_info, out_dir, N, run_simulations)
+    return run_simulations_for_n_project(project_info, work_dir, out_dir, N, run_simulations)
+
+def synthesize_variant(variant: BuildVariant, dependencies: Dict) -> bool:
+    """Estágio 3: síntese, fit e potência no Quartus (pulado se a chave de build não mudou)."""
+    project_info, work_dir, N = variant
+    module_name, project_path, rtl_files, sdc_files, copied_tbs = project_info
     
-    # Copia arquivos
-    _copy_project_files_to_n_dir(project_path, n_dir, rtl_files, sdc_files, copied_tbs)
+    # Modo só simulação: usa os dados de síntese já existentes em output_files
+    if config.SIM_ONLY:
+        print(f"⏭️ {module_name} (N={N}): Quartus pulado (modo sim-only)")
+        return True
+    
+    if N == "default":
+        # Top + fecho de dependências: a chave não depende do que foi copiado nesta execução
+        qsf_rtl_files = [
+            rtl_file for rtl_file in compile.project_rtl_files(module_name, work_dir, dependencies)
+            if rtl_file.exists()
+        ]
+        qsf_sdc_files = sdc_files
+    else:
+        qsf_rtl_files, qsf_sdc_files = compile.get_n_project_files(work_dir)
+    
+    # Cache incremental: mesma chave de conteúdo → reaproveita output_files
+    qsf_text = compile.render_optimized_qsf(work_dir, module_name, qsf_rtl_files, qsf_sdc_files)
+    build_key = build_cache.compute_build_key(
+        module_name, work_dir, qsf_sdc_files, qsf_text, N, dependencies
+    )
+    if build_cache.is_up_to_date(work_dir, module_name, build_key):
+        print(f"♻️ {module_name} (N={N}) sem alterações: reutilizando output_files")
+        pow_report = work_dir / "output_files" / f"{module_name}.pow.rpt"
+        if power_analysis.is_enabled() and not pow_report.exists() and (work_dir / "db").exists():
+            power_analysis.schedule_power_analysis(module_name, work_dir, N)
+        return True
+    build_cache.invalidate(work_dir)
+    
+    # Armazém compartilhado: outra máquina/execução já compilou estas entradas
+    if artifact_store.fetch(build_key, work_dir, module_name, N):
+        build_cache.write_manifest(work_dir, module_name, N, build_key)
+        return True
+    
+    # Potência fica fora do caminho crítico (power_analysis)
+    if N == "default":
+        # Gera arquivos de projeto
+        compile.generate_optimized_qsf(work_dir, module_name, qsf_rtl_files, qsf_sdc_files)
+        compile.create_qpf(work_dir, module_name)
+        success = compile.compile_project(module_name, work_dir, include_power=False)
+    else:
+        success = compile.compile_project_with_n(module_name, work_dir, N, include_power=False)
+    
+    if success:
+        build_cache.write_manifest(work_dir, module_name, N, build_key)
+        power_analysis.schedule_power_analysis(
+            module_name, work_dir, N,
+            on_done=lambda: artifact_store.publish(build_key, work_dir, module_name, N)
+        )
+    return success
+
+def finalize_variant(variant: BuildVariant, sim_results: List[Dict]) -> CompiledProject:
+    """Monta o CompiledProject de uma variante compilada."""
+    project_info, work_dir, N = variant
+    module_name, project_path, rtl_files, sdc_files, copied_tbs = project_info
     
-    # Define parâmetro
-    compile.set_parameter_in_verilog(module_name, n_dir, "N", N)
-    for tb_file in n_dir.glob("*_tb.v"):
-        simulation.set_parameter_in_tb(tb_file, "N", N)
+    tb_files = copied_tbs if N == "default" else list(work_dir.glob("*_tb.v"))
+    return (module_name, work_dir, N, work_dir / "output_files", tb_files, sim_results)
+
+def _sync_n_dir(project_info: Tuple, dependencies: Dict, n_dir: Path, N: int):
+    """Sincroniza incrementalmente o diretório de uma variante N.
+
+    Fontes inalteradas ficam linkadas (staging); o top e os testbenches
+    recebem o parâmetro N em memória e só são reescritos se o conteúdo
+    mudou. db/, incremental_db/, output_files/ e manifestos são mantidos.
+    O RTL vem do fecho de dependências do módulo, para que nenhuma
+    dependência seja tratada como obsoleta e removida.
+    """
+    module_name, project_path, rtl_files, sdc_files, copied_tbs = project_info
+    
+    rtl_sources = compile.project_rtl_files(module_name, project_path, dependencies)
+    files = {
+        source_file.name: source_file
+        for source_file in rtl_sources + list(sdc_files) + list(copied_tbs)
+        if source_file.exists()
+    }
+    
+    # Arquivos com o parâmetro N aplicado (comparados em memória)
+    generated = {}
+    top_name = f"{module_name}.v"
+    if top_name in files:
+        content, count = compile.apply_parameter(files.pop(top_name).read_text(), "N", N)
+        if count == 0:
+            print(f"⚠️ Parâmetro 'N' não encontrado em {top_name}")
+        generated[top_name] = content
+    for name in [name for name in files if name.endswith("_tb.v")]:
+        content, count = simulation.apply_tb_parameter(files.pop(name).read_text(), "N", N)
+        if count == 0:
+            print(f"⚠️ Parâmetro 'N' não encontrado em {name}")
+        generated[name] = content
+    
+    stats = staging.sync_directory(n_dir, files, generated)
+    print(f"   📁 {n_dir.relative_to(project_path.parent)}: "
+          f"{stats['updated']} atualizado(s), {stats['unchanged']} inalterado(s), "
+          f"{stats['removed']} removido(s)")
+
+def compile_project_with_n(project_info: Tuple, dependencies: Dict, N: int,
+                           run_simulations: bool) -> CompiledProject:
+    """Compila uma variante específica de N para projeto parametrizado."""
+    module_name, project_path, rtl_files, sdc_files, copied_tbs = project_info
+    
+    # Sincroniza o diretório deste N (mantém as bases do Quartus)
+    n_dir = project_path / f"N{N}"
+    _sync_n_dir(project_info, dependencies, n_dir, N)
     
     # Compila
     if compile.compile_project_with_n(module_name, n_dir, N):
@@ -193,8 +411,8 @@ def run_simulations_for_n_project(project_info: Tuple, n_dir: Path, out_dir: Pat
     print(f"🎯 Iniciando simulações ModelSim para N={N}...")
     
     # Usa arquivos do diretório N
-    n_rtl_files = list(n_dir.glob("*.v"))
     n_tb_files = list(n_dir.glob("*_tb.v"))
+    n_rtl_files = [rtl_file for rtl_file in n_dir.glob("*.v") if rtl_file not in n_tb_files]
     
     # Compila para ModelSim
     if not simulation.compile_modelsim_project(n_dir, module_name, n_rtl_files, n_tb_files):
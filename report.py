@@ -64,6 +64,33 @@ def extract_data_from_reports(project_name: str, project_path: Path,
     print(f"✅ Dados extraídos para {project_name} N={N}")
     return data
 
+def empty_report_data(project_name: str, N: Any = "default") -> ReportData:
+    """Dados mínimos de um projeto sem relatórios de síntese (ex.: modo sim-only)."""
+    return {
+        "Project": project_name,
+        "Top": project_name,
+        "Parameter": str(N) if N != "default" else "",
+        "Clocks": [],
+    }
+
+def failed_report_data(failure: Dict[str, Any]) -> ReportData:
+    """Dados de uma variante não compilada (falha ou dependência com falha)."""
+    N = failure["N"]
+    return {
+        "Project": failure["Project"],
+        "Top": failure["Project"],
+        "Parameter": str(N) if N != "default" else "",
+        "N": N,
+        "Status": failure["Status"],
+        "Status_Reason": failure.get("Reason", ""),
+        "Clocks": [],
+        "Simulation_Results": [{
+            "TB_Name": "",
+            "Simulation_Status": failure["Status"],
+            "Simulated": False,  # Variante sem simulação (falha ou dependência com falha)
+        }],
+    }
+
 def _extract_basic_data(data: ReportData, project_name: str, out_dir: Path):
     """Extrai dados básicos dos relatórios."""
     # Recursos
@@ -201,6 +228,10 @@ def extract_simulation_data(project_name: str, project_path: Path, N: Any = "def
         # Pula arquivos muito grandes (>1MB)
         if text_file.stat().st_size > 1024 * 1024:
             continue
+        
+        # Cópia organizada em <tb>_N<N>/ de um arquivo que ainda está na base
+        if text_file.parent.parent == sim_base_dir and (sim_base_dir / text_file.name).exists():
+            continue
             
         # Tenta extrair dados de cada arquivo
         sim_result = _try_extract_from_file(text_file, project_name, N)
@@ -298,7 +329,7 @@ def _find_tests_failed(content: str) -> int:
 # GERAÇÃO DE RELATÓRIOS
 # =============================================================================
 
-def write_consolidated_report(all_data: List[ReportData]):
+def write_consolidated_report(all_data: List[ReportData], include_power: bool = True):
     """Gera relatório consolidado principal."""
     config.REPORT_DIR.mkdir(parents=True, exist_ok=True)
     
@@ -306,41 +337,53 @@ def write_consolidated_report(all_data: List[ReportData]):
     
     # Relatório consolidado
     csv_file = config.REPORT_DIR / "consolidated_report.csv"
-    _write_consolidated_csv(all_data, csv_file)
+    _write_consolidated_csv(all_data, csv_file, include_power)
     
     # Relatório de simulação
     write_simulation_report(all_data)
     
     print("✅ Todos os relatórios gerados!")
 
-def _write_consolidated_csv(all_data: List[ReportData], csv_file: Path):
+POWER_COLUMNS = [
+    "Total Thermal Power (mW)", "Core Dynamic Power (mW)",
+    "Core Static Power (mW)", "I/O Power (mW)"
+]
+
+def _write_consolidated_csv(all_data: List[ReportData], csv_file: Path, include_power: bool = True):
     """Escreve CSV consolidado."""
     header = [
-        "Parameter", "Project", "Clock", "Fmax(MHz)", "Restricted_Fmax(MHz)",
+        "Parameter", "Project", "Status", "Clock", "Fmax(MHz)", "Restricted_Fmax(MHz)",
         "SetupSlack(ns)", "HoldSlack(ns)",
         "Logic utilization (in ALMs)", "Total registers", "Total pins",
-        "Total Thermal Power (mW)", "Core Dynamic Power (mW)",
-        "Core Static Power (mW)", "I/O Power (mW)"
     ]
+    if include_power:
+        header += POWER_COLUMNS
     
     with open(csv_file, "w", newline="", encoding="utf-8") as f:
         writer = csv.writer(f)
         writer.writerow(header)
         
         for data in all_data:
-            _write_simple_consolidated_rows(writer, data)
+            _write_simple_consolidated_rows(writer, data, include_power)
     
     print(f"✅ Relatório consolidado: {csv_file}")
 
-def _write_simple_consolidated_rows(writer, data: ReportData):
+def _write_simple_consolidated_rows(writer, data: ReportData, include_power: bool = True):
     """Escreve linhas simplificadas do consolidado."""
     power = data.get("Power", {"Total": "", "Dynamic": "", "Static": "", "IO": ""})
+    status = data.get("Status", "OK")
     
-    for clk in data.get("Clocks", []):
+    clocks = data.get("Clocks", [])
+    if not clocks and status != "OK":
+        # Variante não compilada: uma linha só com o status
+        clocks = [{"Clock": ""}]
+    
+    for clk in clocks:
         clk_name = clk["Clock"]
         row = [
             data.get("Parameter", ""),
             data.get("Project", ""),
+            status,
             clk_name,
             clk.get("Fmax", ""),
             clk.get("Restricted_Fmax", ""),
@@ -349,11 +392,14 @@ def _write_simple_consolidated_rows(writer, data: ReportData):
             clean_resource_value(data.get("Logic utilization (in ALMs)", "")),
             clean_resource_value(data.get("Total registers", "")),
             clean_resource_value(data.get("Total pins", "")),
-            power.get("Total", ""),
-            power.get("Dynamic", ""),
-            power.get("Static", ""),
-            power.get("IO", ""),
         ]
+        if include_power:
+            row += [
+                power.get("Total", ""),
+                power.get("Dynamic", ""),
+                power.get("Static", ""),
+                power.get("IO", ""),
+            ]
         writer.writerow(row)
 
 def write_simulation_report(all_data: List[ReportData]):
@@ -384,6 +430,7 @@ def write_simulation_report(all_data: List[ReportData]):
                 "Errors": sim_result.get("Errors", 0),
                 "Simulation_Time": sim_result.get("Simulation_Time", ""),
                 "Simulation_Directory": sim_result.get("Simulation_Directory", ""),
+                "Simulated": sim_result.get("Simulated", True),
             }
             simulation_data.append(sim_row)
     
@@ -425,7 +472,12 @@ def write_simulation_report(all_data: List[ReportData]):
     write_simulation_executive_summary(simulation_data)
 
 def write_simulation_executive_summary(simulation_data: List[Dict]):
-    """Gera resumo executivo SIMPLES."""
+    """Gera resumo executivo SIMPLES.
+
+    Só linhas que de fato simularam entram nos totais; qualquer status
+    diferente de ALL_PASSED conta como falha. Variantes sem simulação
+    (compilação com falha ou dependência com falha) são contadas à parte.
+    """
     summary_file = config.REPORT_DIR / "simulation_executive_summary.txt"
     
     with open(summary_file, "w", encoding="utf-8") as f:
@@ -434,17 +486,23 @@ def write_simulation_executive_summary(simulation_data: List[Dict]):
         f.write("=" * 60 + "\n\n")
         
         # Estatísticas
-        total_simulations = len(simulation_data)
-        passed_simulations = sum(1 for s in simulation_data if s["Status"] == "ALL_PASSED")
-        failed_simulations = sum(1 for s in simulation_data if s["Status"] in ["SOME_FAILED", "FAILED"])
-        unknown_simulations = sum(1 for s in simulation_data if s["Status"] == "UNKNOWN")
+        executed = [s for s in simulation_data if s.get("Simulated", True)]
+        not_executed = [s for s in simulation_data if not s.get("Simulated", True)]
+        total_simulations = len(executed)
+        passed_simulations = sum(1 for s in executed if s["Status"] == "ALL_PASSED")
+        failed_simulations = total_simulations - passed_simulations
+        unknown_simulations = sum(1 for s in executed if s["Status"] == "UNKNOWN")
+        skipped_simulations = sum(1 for s in not_executed if s["Status"] == "SKIPPED_DEP_FAILED")
+        not_compiled = len(not_executed) - skipped_simulations
         
         success_rate = (passed_simulations / total_simulations * 100) if total_simulations > 0 else 0
         
         f.write(f"Total de simulações executadas: {total_simulations}\n")
         f.write(f"Simulações com sucesso total: {passed_simulations}\n")
         f.write(f"Simulações com falhas: {failed_simulations}\n")
-        f.write(f"Simulações com status desconhecido: {unknown_simulations}\n")
+        f.write(f"   (das quais com status desconhecido: {unknown_simulations})\n")
+        f.write(f"Variantes não simuladas (falha de compilação): {not_compiled}\n")
+        f.write(f"Variantes puladas (dependência com falha): {skipped_simulations}\n")
         f.write(f"Taxa de sucesso geral: {success_rate:.1f}%\n\n")
         
         # Detalhes
@@ -463,6 +521,10 @@ def write_simulation_executive_summary(simulation_data: List[Dict]):
         for project, sims in projects.items():
             f.write(f"\n[PROJETO] {project}:\n")
             for sim in sims:
+                if not sim.get("Simulated", True):
+                    status_icon = "[SKIP]" if sim["Status"] == "SKIPPED_DEP_FAILED" else "[NSIM]"
+                    f.write(f"   {status_icon} (N={sim['N']}): não simulado ({sim['Status']})\n")
+                    continue
                 if sim["Status"] == "ALL_PASSED":
                     status_icon = "[PASS]"
                 elif sim["Status"] == "UNKNOWN":
@@ -13,18 +13,37 @@ from pathlib import Path
 from typing import List, Dict, Tuple
 
 import config
+import power_analysis
+import project_processor
 import report
 
 CompiledProject = Tuple[str, Path, any, Path, List[Path], List[Dict]]
 
-def generate_all_reports(compiled_projects: List[CompiledProject]):
-    """Gera todos os relatórios finais."""
+def generate_all_reports(compiled_projects: List[CompiledProject],
+                         failed_projects: List[Dict] = None) -> List[Dict]:
+    """Gera todos os relatórios finais.
+
+    `failed_projects` (project_processor.FailedProject) entram nos relatórios
+    com o status da falha (FAILED, ABORTED, SKIPPED_DEP_FAILED).
+    Retorna as linhas escritas (reaproveitadas pelo modo --watch).
+    """
     print("\n📊 Gerando relatórios...")
     
+    all_reports = collect_report_rows(compiled_projects, failed_projects)
+    write_reports(all_reports)
+    return all_reports
+
+def collect_report_rows(compiled_projects: List[CompiledProject],
+                        failed_projects: List[Dict] = None) -> List[Dict]:
+    """Linhas de relatório de projetos compilados e de variantes com falha."""
     all_reports = collect_reports_from_projects(compiled_projects)
-    
+    all_reports += [report.failed_report_data(failure) for failure in failed_projects or []]
+    return all_reports
+
+def write_reports(all_reports: List[Dict]):
+    """Escreve os relatórios consolidados a partir das linhas já coletadas."""
     if all_reports:
-        report.write_consolidated_report(all_reports)
+        report.write_consolidated_report(all_reports, include_power=power_analysis.is_enabled())
     else:
         print("❌ Nenhum dado para gerar relatórios")
 
@@ -35,10 +54,25 @@ def collect_reports_from_projects(compiled_projects: List[CompiledProject]) -> L
     for project in compiled_projects:
         module_name, project_path, N, out_dir, copied_tbs, sim_results = project
         
+        # Espera apenas pela potência deste projeto (se ainda em background)
+        if power_analysis.is_enabled():
+            power_analysis.wait_for_power(module_name, out_dir, N)
+            power_failure = None if config.SIM_ONLY else project_processor.power_failure(
+                module_name, project_path, N
+            )
+            if power_failure:
+                # Sem .pow.rpt: falha da variante, não valores de potência padrão
+                print(f"   ❌ Potência de {module_name} (N={N}) indisponível: {power_failure['Reason']}")
+                all_reports.append(report.failed_report_data(power_failure))
+                continue
+        
         # Extrai dados de compilação
         data = report.extract_data_from_reports(module_name, project_path, out_dir, N)
         if not data:
-            continue
+            if not config.SIM_ONLY:
+                continue
+            # Sem síntese anterior: mantém apenas os resultados de simulação
+            data = report.empty_report_data(module_name, N)
         
         data["N"] = N
         
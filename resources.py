@@ -0,0 +1,356 @@
+# resources.py
+"""
+GOVERNANÇA DE RECURSOS DA MÁQUINA
+
+Responsável por:
+- Tokens de núcleos compartilhados por todos os processos da máquina
+- Admissão de jobs apenas quando há núcleos livres
+- Orçamento de núcleos por job (escrito no QSF como NUM_PARALLEL_PROCESSORS)
+- Amostragem de RSS da árvore de processos de cada ferramenta
+- Histórico de pico de memória por módulo/N e admissão por teto de memória
+"""
+
+import contextlib
+import json
+import os
+import threading
+import time
+import uuid
+from pathlib import Path
+from typing import List, IO, Dict, Optional
+
+import config
+
+try:
+    import psutil
+except ImportError:  # Opcional: sem psutil usa /proc (Linux) ou desativa a amostragem
+    psutil = None
+
+try:
+    import fcntl
+except ImportError:  # Windows
+    fcntl = None
+
+try:
+    import msvcrt
+except ImportError:  # POSIX
+    msvcrt = None
+
+# =============================================================================
+# LOCKS DE ARQUIVO (liberados pelo SO se o processo morrer)
+# =============================================================================
+
+def _try_lock(handle: IO) -> bool:
+    """Tenta obter lock exclusivo sem bloquear."""
+    try:
+        if fcntl is not None:
+            fcntl.flock(handle.fileno(), fcntl.LOCK_EX | fcntl.LOCK_NB)
+        elif msvcrt is not None:
+            handle.seek(0)
+            msvcrt.locking(handle.fileno(), msvcrt.LK_NBLCK, 1)
+        return True
+    except OSError:
+        return False
+
+def _unlock(handle: IO):
+    """Libera lock obtido por _try_lock e fecha o arquivo."""
+    try:
+        if fcntl is not None:
+            fcntl.flock(handle.fileno(), fcntl.LOCK_UN)
+        elif msvcrt is not None:
+            handle.seek(0)
+            msvcrt.locking(handle.fileno(), msvcrt.LK_UNLCK, 1)
+    except OSError:
+        pass
+    finally:
+        handle.close()
+
+# =============================================================================
+# TOKENS DE NÚCLEOS
+# =============================================================================
+
+def _core_slot_paths() -> List[Path]:
+    """Arquivos que representam cada token de núcleo da máquina."""
+    slot_dir = config.LOCK_DIR / "cores"
+    slot_dir.mkdir(parents=True, exist_ok=True)
+    return [slot_dir / f"core_{i:03d}.lock" for i in range(max(1, config.CORE_TOKENS))]
+
+def _grab_core_slots(max_cores: int) -> List[IO]:
+    """Obtém até max_cores tokens livres."""
+    handles = []
+    for slot_path in _core_slot_paths():
+        if len(handles) >= max_cores:
+            break
+        handle = open(slot_path, "a+")
+        if _try_lock(handle):
+            handles.append(handle)
+        else:
+            handle.close()
+    return handles
+
+@contextlib.contextmanager
+def core_budget(max_cores: int, min_cores: int = 1, label: str = ""):
+    """Reserva entre min_cores e max_cores tokens de núcleo para um job.
+
+    Bloqueia até que ao menos min_cores tokens estejam livres e devolve
+    quantos foram concedidos. Tokens são locks de arquivo em config.LOCK_DIR,
+    compartilhados entre todos os processos da máquina.
+    """
+    max_cores = max(1, min(max_cores, config.CORE_TOKENS))
+    min_cores = max(1, min(min_cores, max_cores))
+    waiting_reported = False
+
+    while True:
+        handles = _grab_core_slots(max_cores)
+        if len(handles) >= min_cores:
+            break
+        for handle in handles:
+            _unlock(handle)
+        if not waiting_reported:
+            print(f"⏳ Aguardando núcleos livres{f' para {label}' if label else ''}...")
+            waiting_reported = True
+        time.sleep(config.TOKEN_POLL_INTERVAL)
+
+    if label:
+        print(f"🎟️ {label}: {len(handles)} núcleo(s) concedido(s)")
+    try:
+        yield len(handles)
+    finally:
+        for handle in handles:
+            _unlock(handle)
+
+# =============================================================================
+# AMOSTRAGEM DE MEMÓRIA (RSS DA ÁRVORE DE PROCESSOS)
+# =============================================================================
+
+def _proc_children_map() -> Dict[int, List[int]]:
+    """Mapeia ppid -> pids lendo /proc (Linux)."""
+    children = {}
+    for stat_file in Path("/proc").glob("[0-9]*/stat"):
+        try:
+            stat = stat_file.read_text()
+        except OSError:
+            continue
+        # O nome do processo pode conter espaços: campos vêm após o último ')'
+        fields = stat[stat.rfind(")") + 2:].split()
+        children.setdefault(int(fields[1]), []).append(int(stat_file.parent.name))
+    return children
+
+def _proc_rss(pid: int) -> int:
+    """RSS de um processo em bytes via /proc/<pid>/statm."""
+    try:
+        resident_pages = int(Path(f"/proc/{pid}/statm").read_text().split()[1])
+    except (OSError, IndexError, ValueError):
+        return 0
+    return resident_pages * os.sysconf("SC_PAGE_SIZE")
+
+def process_tree_pids(pid: int) -> List[int]:
+    """Pids de um processo e de todos os seus descendentes."""
+    if psutil is not None:
+        try:
+            root = psutil.Process(pid)
+            return [pid] + [child.pid for child in root.children(recursive=True)]
+        except psutil.Error:
+            return [pid]
+
+    if not Path("/proc").is_dir():
+        return [pid]
+
+    children = _proc_children_map()
+    pids = []
+    stack = [pid]
+    while stack:
+        current = stack.pop()
+        pids.append(current)
+        stack.extend(children.get(current, []))
+    return pids
+
+def process_tree_rss(pid: int) -> int:
+    """Soma o RSS (bytes) de um processo e de todos os seus descendentes."""
+    if psutil is not None:
+        try:
+            root = psutil.Process(pid)
+            processes = [root] + root.children(recursive=True)
+        except psutil.Error:
+            return 0
+        total = 0
+        for process in processes:
+            try:
+                total += process.memory_info().rss
+            except psutil.Error:
+                pass
+        return total
+
+    if not Path("/proc").is_dir():
+        return 0
+
+    return sum(_proc_rss(current) for current in process_tree_pids(pid))
+
+def start_rss_sampler(pid: int):
+    """Inicia amostragem do RSS em background; retorna função que para e devolve o pico (MB)."""
+    stop_event = threading.Event()
+    peak = {"bytes": 0}
+
+    def sample():
+        while not stop_event.is_set():
+            peak["bytes"] = max(peak["bytes"], process_tree_rss(pid))
+            stop_event.wait(config.MEMORY_SAMPLE_INTERVAL)
+
+    sampler = threading.Thread(target=sample, name=f"rss-{pid}", daemon=True)
+    sampler.start()
+
+    def stop() -> float:
+        stop_event.set()
+        sampler.join()
+        return peak["bytes"] / (1024 * 1024)
+
+    return stop
+
+# =============================================================================
+# HISTÓRICO DE PICO DE MEMÓRIA
+# =============================================================================
+
+def job_key(module_name: str, N, tool: str) -> str:
+    """Chave do histórico de recursos: módulo, N e ferramenta."""
+    return f"{module_name}|N={N}|{tool}"
+
+@contextlib.contextmanager
+def file_lock(lock_path: Path):
+    """Lock exclusivo bloqueante baseado em arquivo."""
+    lock_path.parent.mkdir(parents=True, exist_ok=True)
+    handle = open(lock_path, "a+")
+    while not _try_lock(handle):
+        time.sleep(0.05)
+    try:
+        yield
+    finally:
+        _unlock(handle)
+
+def read_json(json_path: Path) -> Dict:
+    """Lê JSON tolerando arquivo ausente ou corrompido."""
+    try:
+        with open(json_path, "r", encoding="utf-8") as f:
+            return json.load(f)
+    except (OSError, ValueError):
+        return {}
+
+def write_json_atomic(json_path: Path, data: Dict):
+    """Escreve JSON via arquivo temporário + os.replace."""
+    json_path.parent.mkdir(parents=True, exist_ok=True)
+    tmp_path = json_path.with_name(f"{json_path.name}.{os.getpid()}.{threading.get_ident()}.tmp")
+    with open(tmp_path, "w", encoding="utf-8") as f:
+        json.dump(data, f, indent=2, sort_keys=True)
+    os.replace(tmp_path, json_path)
+
+def load_resource_history() -> Dict[str, Dict]:
+    """Carrega o histórico de recursos por job."""
+    return read_json(config.RESOURCE_HISTORY_FILE)
+
+def record_peak_memory(key: str, peak_mb: float):
+    """Registra o pico de memória observado para um job."""
+    if peak_mb <= 0:
+        return
+    lock_path = config.RESOURCE_HISTORY_FILE.with_suffix(".lock")
+    with file_lock(lock_path):
+        history = load_resource_history()
+        entry = history.setdefault(key, {})
+        entry["peak_mb"] = round(max(entry.get("peak_mb", 0.0), peak_mb), 1)
+        entry["last_mb"] = round(peak_mb, 1)
+        entry["runs"] = entry.get("runs", 0) + 1
+        write_json_atomic(config.RESOURCE_HISTORY_FILE, history)
+    print(f"📈 Pico de memória {key}: {peak_mb:.0f} MB")
+
+def record_duration(key: str, seconds: float):
+    """Registra a duração de uma execução bem-sucedida de um job."""
+    lock_path = config.RESOURCE_HISTORY_FILE.with_suffix(".lock")
+    with file_lock(lock_path):
+        history = load_resource_history()
+        entry = history.setdefault(key, {})
+        entry["max_s"] = round(max(entry.get("max_s", 0.0), seconds), 1)
+        entry["last_s"] = round(seconds, 1)
+        write_json_atomic(config.RESOURCE_HISTORY_FILE, history)
+
+def _predict_from_history(key: str, field: str) -> Optional[float]:
+    """Valor do histórico para o job ou, sem histórico exato, o maior do
+    mesmo módulo/ferramenta em outro N."""
+    history = load_resource_history()
+    if history.get(key, {}).get(field) is not None:
+        return history[key][field]
+
+    module_name, _, tool = key.split("|")
+    similar = [
+        entry[field] for other_key, entry in history.items()
+        if other_key.startswith(f"{module_name}|") and other_key.endswith(f"|{tool}")
+        and entry.get(field) is not None
+    ]
+    return max(similar) if similar else None
+
+def predict_memory_mb(key: str) -> float:
+    """Estimativa de memória de um job a partir do histórico."""
+    predicted = _predict_from_history(key, "peak_mb")
+    return predicted if predicted is not None else config.DEFAULT_JOB_MEMORY_MB
+
+def predict_duration_s(key: str) -> Optional[float]:
+    """Maior duração conhecida de um job (None sem histórico)."""
+    return _predict_from_history(key, "max_s")
+
+# =============================================================================
+# ADMISSÃO POR TETO DE MEMÓRIA
+# =============================================================================
+
+def _reserved_memory_mb(reservation_dir: Path) -> float:
+    """Soma as reservas ativas; reservas de processos mortos são removidas."""
+    total = 0.0
+    for reservation in reservation_dir.glob("*.lock"):
+        handle = open(reservation, "a+")
+        if _try_lock(handle):
+            # Ninguém segura o lock: reserva órfã
+            _unlock(handle)
+            try:
+                reservation.unlink()
+            except OSError:
+                pass
+            continue
+        handle.close()
+        total += float(reservation.stem.rsplit("_", 1)[1])
+    return total
+
+@contextlib.contextmanager
+def memory_admission(key: Optional[str], label: str = ""):
+    """Segura o job até que a memória prevista caiba em config.MEMORY_CEILING_MB.
+
+    Cada job admitido mantém um arquivo de reserva com lock (o valor previsto
+    fica no nome do arquivo), visível para todos os processos da máquina.
+    Um job é sempre admitido quando não há nenhum outro reservado.
+    """
+    if key is None or not config.MEMORY_CEILING_MB:
+        yield
+        return
+
+    predicted = predict_memory_mb(key)
+    reservation_dir = config.LOCK_DIR / "memory"
+    reservation_dir.mkdir(parents=True, exist_ok=True)
+    waiting_reported = False
+
+    while True:
+        with file_lock(config.LOCK_DIR / "memory_admission.lock"):
+            reserved = _reserved_memory_mb(reservation_dir)
+            if reserved == 0 or reserved + predicted <= config.MEMORY_CEILING_MB:
+                reservation = reservation_dir / f"{uuid.uuid4().hex}_{predicted:.1f}.lock"
+                handle = open(reservation, "a+")
+                _try_lock(handle)
+                break
+        if not waiting_reported:
+            print(f"⏳ Memória: {label or key} prevê {predicted:.0f} MB, "
+                  f"{reserved:.0f}/{config.MEMORY_CEILING_MB} MB reservados. Aguardando...")
+            waiting_reported = True
+        time.sleep(config.TOKEN_POLL_INTERVAL)
+
+    try:
+        yield
+    finally:
+        _unlock(handle)
+        try:
+            reservation.unlink()
+        except OSError:
+            pass
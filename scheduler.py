@@ -0,0 +1,179 @@
+# scheduler.py
+"""
+ESCALONADOR PARALELO DE PROJETOS
+
+Responsável por:
+- Construção do DAG de módulos a partir da árvore de dependências
+- Execução concorrente de módulos independentes (pool de processos limitado)
+- Propagação de falhas: dependentes de um módulo com falha não são executados
+- Preservação da ordem original dos resultados (CompiledProject)
+"""
+
+import concurrent.futures
+from typing import List, Dict, Set, Tuple, Any, Optional
+
+import config
+import project_loader
+import project_processor
+
+# =============================================================================
+# TIPOS DE DADOS
+# =============================================================================
+
+ProjectGraph = Dict[int, Set[int]]  # índice do projeto -> índices dos quais depende
+
+# =============================================================================
+# CONSTRUÇÃO DO DAG
+# =============================================================================
+
+def build_project_graph(projects_info: List[Tuple], dependencies: Dict) -> ProjectGraph:
+    """Constrói o DAG de projetos a partir da árvore de dependências."""
+    index_by_module = {}
+    for index, project_info in enumerate(projects_info):
+        index_by_module.setdefault(project_info[0], index)
+
+    dependency_graph = project_loader.dependency_graph(dependencies)
+    graph = {}
+    for index, project_info in enumerate(projects_info):
+        module_name = project_info[0]
+        deps = dependency_graph.dependencies(module_name)
+        graph[index] = {
+            index_by_module[dep] for dep in deps
+            if dep in index_by_module and index_by_module[dep] != index
+        }
+
+    return graph
+
+def _ready_projects(graph: ProjectGraph, pending: Set[int], finished: Set[int]) -> List[int]:
+    """Retorna projetos pendentes cujas dependências já terminaram."""
+    return sorted(i for i in pending if graph[i] <= finished)
+
+def topological_order(graph: ProjectGraph) -> List[int]:
+    """Ordena projetos de forma que dependências venham antes dos dependentes."""
+    pending = set(graph)
+    finished = set()
+    order = []
+    
+    while pending:
+        # Em caso de ciclo, libera o primeiro pendente para não travar
+        index = (_ready_projects(graph, pending, finished) or [min(pending)])[0]
+        order.append(index)
+        pending.discard(index)
+        finished.add(index)
+    
+    return order
+
+# =============================================================================
+# EXECUÇÃO
+# =============================================================================
+
+def apply_overrides(overrides: Dict[str, Any]):
+    """Aplica em config as configurações definidas em tempo de execução."""
+    for name, value in overrides.items():
+        setattr(config, name, value)
+
+def _run_project(project_info: Tuple, dependencies: Dict, bitwidths: List[int],
+                 run_simulations: bool) -> List[project_processor.CompiledProject]:
+    """Executa um projeto isolando falhas inesperadas."""
+    try:
+        return project_processor.process_project(project_info, dependencies, bitwidths, run_simulations)
+    except Exception as e:
+        print(f"💥 ERRO inesperado em {project_info[0]}: {e}")
+        return []
+
+def _failed_dependency(graph: ProjectGraph, index: int, failed: Set[int]) -> Optional[int]:
+    """Primeira dependência com falha de um projeto (ou None)."""
+    failed_deps = sorted(graph[index] & failed)
+    return failed_deps[0] if failed_deps else None
+
+def run_projects(projects_info: List[Tuple], dependencies: Dict, bitwidths: List[int],
+                 run_simulations: bool, jobs: int = 1, overrides: Dict[str, Any] = None
+                 ) -> Tuple[List[project_processor.CompiledProject], List[project_processor.FailedProject]]:
+    """Executa todos os projetos respeitando o DAG de dependências.
+
+    Módulos independentes rodam em paralelo em até `jobs` processos; cada
+    ferramenta externa recebe o diretório do próprio projeto como cwd.
+    Um módulo com alguma variante falha faz seus dependentes serem marcados
+    SKIPPED_DEP_FAILED sem executar Quartus nem ModelSim.
+    Retorna (compilados, falhas), ambos na ordem original de projects_info.
+    """
+    graph = build_project_graph(projects_info, dependencies)
+    results = {}
+    failures = {}
+    failed = set()
+    pending = set(range(len(projects_info)))
+    finished = set()
+
+    def record(index: int, compiled: List[project_processor.CompiledProject]):
+        results[index] = compiled
+        failures[index] = project_processor.collect_failures(projects_info[index], bitwidths, compiled)
+        if failures[index]:
+            failed.add(index)
+        finished.add(index)
+
+    def skip_if_dependency_failed(index: int) -> bool:
+        failed_dep = _failed_dependency(graph, index, failed)
+        if failed_dep is None:
+            return False
+        failures[index] = project_processor.skip_for_failed_dependency(
+            projects_info[index], bitwidths, projects_info[failed_dep][0]
+        )
+        failed.add(index)
+        finished.add(index)
+        return True
+
+    if jobs <= 1:
+        # Execução sequencial no próprio processo, em ordem topológica
+        for index in topological_order(graph):
+            if not skip_if_dependency_failed(index):
+                record(index, _run_project(projects_info[index], dependencies, bitwidths, run_simulations))
+    else:
+        print(f"⚡ Executando até {jobs} módulos em paralelo")
+        # Tarefas de potência em background morreriam com o processo do pool:
+        # cada worker roda o quartus_pow no próprio job (modo inline)
+        worker_overrides = dict(overrides or {})
+        if worker_overrides.get("POWER_MODE", config.POWER_MODE) == "async":
+            worker_overrides["POWER_MODE"] = "inline"
+        with concurrent.futures.ProcessPoolExecutor(
+            max_workers=jobs, initializer=apply_overrides, initargs=(worker_overrides,)
+        ) as executor:
+            running = {}
+            while pending or running:
+                ready = _ready_projects(graph, pending, finished)
+                if not ready and not running:
+                    # Ciclo no grafo: libera o primeiro pendente para não travar
+                    print(f"⚠️ Ciclo de dependências detectado; ignorando ordem para {projects_info[min(pending)][0]}")
+                    ready = [min(pending)]
+
+                for index in ready:
+                    pending.discard(index)
+                    if skip_if_dependency_failed(index):
+                        continue
+                    future = executor.submit(
+                        _run_project, projects_info[index], dependencies, bitwidths, run_simulations
+                    )
+                    running[future] = index
+
+                if not running:
+                    # Só houve projetos pulados nesta rodada
+                    continue
+
+                done, _ = concurrent.futures.wait(
+                    running, return_when=concurrent.futures.FIRST_COMPLETED
+                )
+                for future in done:
+                    index = running.pop(future)
+                    try:
+                        compiled = future.result()
+                    except Exception as e:
+                        print(f"💥 Worker falhou em {projects_info[index][0]}: {e}")
+                        compiled = []
+                    record(index, compiled)
+
+    compiled_projects = []
+    failed_projects = []
+    for index in range(len(projects_info)):
+        compiled_projects.extend(results.get(index, []))
+        failed_projects.extend(failures.get(index, []))
+
+    return compiled_projects, failed_projects
@@ -4,7 +4,6 @@ SIMULAÇÃO MODELSIM E GERENCIAMENTO DE TESTBENCHES
 """
 
 import os
-import subprocess
 import time
 import shutil
 import re
@@ -13,6 +12,13 @@ from typing import List, Dict, Optional, Tuple
 import sys
 
 import config
+import modelsim_libs
+import module_index
+import resources
+import staging
+import tool_policy
+import tool_runner
+import verilog_index
 
 # =============================================================================
 # TIPOS DE DADOS
@@ -20,6 +26,18 @@ import config
 
 SimulationResult = Dict[str, any]
 
+# Bibliotecas compartilhadas (-L) do projeto, dentro de simulation/modelsim
+LIBRARIES_FILE_NAME = "shared_libraries.json"
+
+# Carimbo (versão do vlog + opções) que mantém a library work entre execuções
+WORK_STAMP_NAME = "work_stamp.json"
+
+# Referência à library work em cada diretório de resultado (modo "manifest")
+WORK_MANIFEST_NAME = "work_manifest.json"
+
+# Logs das ferramentas de compilação (não são artefatos de uma simulação)
+_TOOL_LOG_NAMES = {"vlib.log", "vdir.log"}
+
 # =============================================================================
 # CONFIGURAÇÃO DE DIRETÓRIOS DE SIMULAÇÃO
 # =============================================================================
@@ -63,23 +81,22 @@ def verify_simulation_environment() -> bool:
 # GERENCIAMENTO DE TESTBENCHES
 # =============================================================================
 
-def find_testbenches(module_name: str) -> List[Path]:
-    """Encontra todos os testbenches para um módulo específico."""
-    patterns = [
-        f"*{module_name}*_tb.v",
-        f"*{module_name}*_tb.sv", 
-        f"*{module_name}*tb.v",
-        f"*{module_name}*tb.sv",
-        f"*tb_{module_name}*.v",
-        f"*tb_{module_name}*.sv",
-    ]
-    
-    tb_files = []
-    for pattern in patterns:
-        tb_files.extend(list(config.TB_DIR.rglob(pattern)))
-    
-    # Remove duplicatas e filtra apenas arquivos
-    tb_files = list(set([f for f in tb_files if f.is_file()]))
+def find_testbenches(module_name: str, explicit: List[str] = None) -> List[Path]:
+    """Encontra todos os testbenches para um módulo específico.
+
+    `explicit` (chave "__testbenches__" do dependencies.json) substitui as
+    regras de nome: nomes de arquivo ou caminhos relativos a src/tb.
+    """
+    if explicit is None:
+        tb_files = module_index.testbenches_for(module_name)
+    else:
+        tb_files = []
+        for entry in explicit:
+            tb_file = (config.TB_DIR / entry) if "/" in entry else module_index.find_testbench(entry)
+            if tb_file is None or not tb_file.exists():
+                print(f"⚠️ Testbench declarado para {module_name} não encontrado: {entry}")
+                continue
+            tb_files.append(tb_file)
     
     print(f"🔍 Testbenches para {module_name}: {[f.name for f in tb_files]}")
     return tb_files
@@ -89,22 +106,17 @@ def copy_tb_to_project(module_name: str, project_path: Path, tb_files: List[Path
     copied_tbs = []
     for tb_file in tb_files:
         dst_file = project_path / tb_file.name
-        shutil.copy(tb_file, dst_file)
+        mode = staging.stage_file(tb_file, dst_file)
         copied_tbs.append(dst_file)
-        print(f"📄 Testbench copiado: {tb_file.name}")
+        print(f"📄 Testbench no projeto ({mode}): {tb_file.name}")
     
     return copied_tbs
 
-def set_parameter_in_tb(tb_file: Path, param_name: str, value: int) -> bool:
-    """Define parâmetro em testbench."""
-    if not tb_file.exists():
-        print(f"❌ Testbench {tb_file} não encontrado.")
-        return False
+def apply_tb_parameter(content: str, param_name: str, value: int) -> Tuple[str, int]:
+    """Aplica o parâmetro ao conteúdo de um testbench (sem tocar em disco).
 
-    with open(tb_file, "r") as f:
-        content = f.read()
-
-    # Padrões para encontrar parâmetros
+    Usa o primeiro padrão que casar: parameter, localparam ou atribuição.
+    """
     patterns = [
         rf"(parameter\s+{param_name}\s*=\s*)(\d+)",
         rf"(localparam\s+{param_name}\s*=\s*)(\d+)",
@@ -114,10 +126,24 @@ def set_parameter_in_tb(tb_file: Path, param_name: str, value: int) -> bool:
     for pattern in patterns:
         new_content, count = re.subn(pattern, r"\g<1>" + str(value), content)
         if count > 0:
-            with open(tb_file, "w") as f:
-                f.write(new_content)
-            print(f"🔧 Parâmetro {param_name} = {value} em {tb_file.name}")
-            return True
+            return new_content, count
+    return content, 0
+
+def set_parameter_in_tb(tb_file: Path, param_name: str, value: int) -> bool:
+    """Define parâmetro em testbench."""
+    if not tb_file.exists():
+        print(f"❌ Testbench {tb_file} não encontrado.")
+        return False
+
+    with open(tb_file, "r") as f:
+        content = f.read()
+
+    new_content, count = apply_tb_parameter(content, param_name, value)
+    if count > 0:
+        # Substituição atômica: quebra o link com a fonte original (staging)
+        staging.write_text_atomic(tb_file, new_content)
+        print(f"🔧 Parâmetro {param_name} = {value} em {tb_file.name}")
+        return True
 
     print(f"⚠️ Parâmetro '{param_name}' não encontrado")
     return False
@@ -127,22 +153,10 @@ def set_parameter_in_tb(tb_file: Path, param_name: str, value: int) -> bool:
 # =============================================================================
 
 def get_file_extension_type(file_path: Path) -> str:
-    """Determina se arquivo é Verilog ou SystemVerilog."""
-    ext = file_path.suffix.lower()
-    
-    with open(file_path, 'r') as f:
-        content = f.read()
-    
-    # Análise heurística do conteúdo
-    sv_keywords = ['logic', 'bit', 'always_ff', 'always_comb', 'assert',
-                   'typedef', 'struct', 'enum', 'interface']
-    
-    is_systemverilog = any(keyword in content for keyword in sv_keywords)
-    
-    if ext == '.sv' or is_systemverilog:
+    """Determina se arquivo é Verilog ou SystemVerilog (índice de metadados)."""
+    if file_path.suffix.lower() == '.sv' or verilog_index.uses_systemverilog(file_path):
         return 'systemverilog'
-    else:
-        return 'verilog'
+    return 'verilog'
 
 # =============================================================================
 # COMPILAÇÃO MODELSIM (ATUALIZADA)
@@ -158,100 +172,222 @@ def compile_modelsim_project(project_path: Path, module_name: str,
         print(f"❌ vlog.exe não encontrado")
         return False
     
-    # Prepara ambiente com estrutura organizada
-    _prepare_modelsim_environment(project_path)
-    
-    # Compila todos os arquivos
-    all_files = rtl_files + tb_files
-    compile_success = _compile_files(project_path, all_files)
-    
-    if compile_success:
-        _list_compiled_modules(project_path)
+    # ModelSim é single-core: consome um token do orçamento da máquina
+    with resources.core_budget(1):
+        # Prepara ambiente com estrutura organizada
+        _prepare_modelsim_environment(project_path)
+        
+        # Dependências vêm de bibliotecas compartilhadas (-L); no work só top e testbenches
+        local_files = list(rtl_files)
+        libraries = []
+        if config.MODELSIM_SHARED_LIBS:
+            tb_names = {tb_file.name for tb_file in tb_files}
+            dep_files = [
+                rtl_file for rtl_file in rtl_files
+                if rtl_file.stem != module_name and rtl_file.name not in tb_names
+            ]
+            libraries = modelsim_libs.ensure_libraries(dep_files)
+            if libraries is None:
+                return False
+            local_files = [rtl_file for rtl_file in rtl_files if rtl_file not in dep_files]
+        _write_library_list(project_path, libraries)
+        
+        # Compila os arquivos locais
+        all_files = local_files + tb_files
+        compile_success = _compile_files(project_path, all_files)
+        
+        if compile_success:
+            _list_compiled_modules(project_path)
     
     return compile_success
 
+def _write_library_list(project_path: Path, libraries: List[Path]):
+    """Registra as bibliotecas -L usadas pelas simulações deste projeto."""
+    resources.write_json_atomic(
+        get_simulation_directory(project_path) / LIBRARIES_FILE_NAME,
+        {"libraries": [str(library) for library in libraries]}
+    )
+
+def _read_library_list(sim_dir: Path) -> List[Path]:
+    return [Path(library) for library in resources.read_json(sim_dir / LIBRARIES_FILE_NAME).get("libraries", [])]
+
+def _vlog_options() -> List[str]:
+    """Opções comuns do vlog (entram no carimbo da library work)."""
+    return ["-incr", *config.VLOG_EXTRA_ARGS]
+
+_vlog_version: Optional[str] = None
+
+def _tool_version(modelsim_dir: Path) -> str:
+    """Versão do vlog (`vlog -version`), consultada uma vez por processo."""
+    global _vlog_version
+    if _vlog_version is None:
+        lines = []
+        
+        def collect_version(stream: str, line: str):
+            if stream == "stdout" and line.strip():
+                lines.append(line.strip())
+        
+        tool_runner.run_tool([str(config.MODELSIM_DIR / "vlog.exe"), "-version"],
+                             modelsim_dir / "vlog_version.log", cwd=modelsim_dir,
+                             line_hook=collect_version)
+        _vlog_version = lines[0] if lines else "unknown"
+    return _vlog_version
+
+def _work_stamp(modelsim_dir: Path) -> Dict:
+    return {
+        "vlog": _tool_version(modelsim_dir),
+        "options": _vlog_options(),
+        "shared_libs": config.MODELSIM_SHARED_LIBS,
+    }
+
 def _prepare_modelsim_environment(project_path: Path):
-    """Prepara ambiente ModelSim com estrutura organizada."""
+    """Prepara ambiente ModelSim com estrutura organizada.
+
+    A library work é persistente (compilação incremental com -incr); só é
+    recriada quando a versão do vlog ou as opções mudam (WORK_STAMP_NAME).
+    """
     modelsim_dir = get_simulation_directory(project_path)
     work_dir = get_modelsim_work_dir(project_path)
+    modelsim_dir.mkdir(parents=True, exist_ok=True)
     
-    # Limpa diretório de simulação anterior
-    if modelsim_dir.exists():
-        shutil.rmtree(modelsim_dir)
+    stamp = _work_stamp(modelsim_dir)
+    keep_work = resources.read_json(modelsim_dir / WORK_STAMP_NAME) == stamp
+    if not keep_work and work_dir.exists():
+        print("🔄 Versão do vlog ou opções mudaram: recriando library work")
     
-    # Cria estrutura de diretórios
-    modelsim_dir.mkdir(parents=True, exist_ok=True)
-    work_dir.mkdir(parents=True, exist_ok=True)
+    # Limpa resultados anteriores (mantém a library work se o carimbo confere)
+    for item in modelsim_dir.iterdir():
+        if item.name == "vlog_version.log":
+            continue
+        if keep_work and item.name in (work_dir.name, WORK_STAMP_NAME):
+            continue
+        if item.is_dir():
+            shutil.rmtree(item)
+        else:
+            item.unlink()
     
-    print(f"📁 Estrutura de simulação criada: {modelsim_dir.relative_to(project_path)}")
+    print(f"📁 Estrutura de simulação pronta: {modelsim_dir.relative_to(project_path)}")
+    if keep_work and (work_dir / "_info").exists():
+        print("♻️ Library 'work' reaproveitada (compilação incremental)")
+        return
     
     # Cria library work no diretório correto
     cmd_lib = [str(config.MODELSIM_DIR / "vlib"), "work"]
-    result = subprocess.run(cmd_lib, capture_output=True, text=True, cwd=modelsim_dir)
+    result = tool_runner.run_tool(cmd_lib, modelsim_dir / "vlib.log", cwd=modelsim_dir)
     
-    if result.returncode == 0:
+    if result.ok:
+        resources.write_json_atomic(modelsim_dir / WORK_STAMP_NAME, stamp)
         print("✅ Library 'work' criada em simulation/modelsim/")
     else:
-        print(f"❌ Falha ao criar library: {result.stderr}")
+        print(f"❌ Falha ao criar library: {' '.join(result.stderr_tail)}")
+
+def _report_vlog_failure(label: str, result: tool_runner.ToolResult):
+    print(f"   ❌ Falha: {label}")
+    # Mostra primeiros erros
+    for err in result.stderr_tail[:3]:
+        if err.strip():
+            print(f"      {err}")
 
 def _compile_files(project_path: Path, files: List[Path]) -> bool:
-    """Compila lista de arquivos no ModelSim."""
+    """Compila lista de arquivos no ModelSim (modo config.MODELSIM_COMPILE_MODE)."""
+    existing = []
+    for file_path in files:
+        if file_path.exists():
+            existing.append(file_path)
+        else:
+            print(f"   ⚠️ Arquivo não encontrado: {file_path}")
+    
+    if config.MODELSIM_COMPILE_MODE == "batch":
+        success = _compile_files_batched(project_path, existing)
+    else:
+        success = _compile_files_one_by_one(project_path, existing)
+    
+    if success:
+        print("✅ Todos os arquivos compilados")
+    return success
+
+def _compile_files_batched(project_path: Path, files: List[Path]) -> bool:
+    """Uma chamada de vlog para os arquivos Verilog e outra para os SystemVerilog."""
     vlog_path = config.MODELSIM_DIR / "vlog.exe"
     modelsim_dir = get_simulation_directory(project_path)
     
+    groups = {"verilog": [], "systemverilog": []}
     for file_path in files:
-        if not file_path.exists():
-            print(f"   ⚠️ Arquivo não encontrado: {file_path}")
+        groups[get_file_extension_type(file_path)].append(file_path)
+    
+    for file_type, group in groups.items():
+        if not group:
             continue
-            
+        sv_args = ["-sv"] if file_type == "systemverilog" else []
+        cmd = [str(vlog_path), "-work", "work", *_vlog_options(), *sv_args,
+               *[str(file_path) for file_path in group]]
+        
+        print(f"   🔄 Compilando {len(group)} arquivo(s) {file_type}: {', '.join(f.name for f in group)}")
+        result = tool_runner.run_tool(cmd, modelsim_dir / f"vlog_{file_type}.log", cwd=modelsim_dir)
+        
+        if not result.ok:
+            _report_vlog_failure(f"{file_type} ({len(group)} arquivo(s))", result)
+            return False
+        print(f"   ✅ {file_type}")
+    
+    return True
+
+def _compile_files_one_by_one(project_path: Path, files: List[Path]) -> bool:
+    """Uma chamada de vlog por arquivo (diagnóstico isolado por fonte)."""
+    vlog_path = config.MODELSIM_DIR / "vlog.exe"
+    modelsim_dir = get_simulation_directory(project_path)
+    
+    for file_path in files:
         # Determina comando de compilação
         file_type = get_file_extension_type(file_path)
         if file_type == 'systemverilog':
-            cmd = [str(vlog_path), "-work", "work", "-sv", str(file_path)]
+            cmd = [str(vlog_path), "-work", "work", *_vlog_options(), "-sv", str(file_path)]
             type_label = " (SystemVerilog)"
         else:
-            cmd = [str(vlog_path), "-work", "work", str(file_path)]
+            cmd = [str(vlog_path), "-work", "work", *_vlog_options(), str(file_path)]
             type_label = " (Verilog)"
         
         print(f"   🔄 Compilando: {file_path.name}{type_label}")
         
         # Compila no diretório de simulação
-        result = subprocess.run(cmd, capture_output=True, text=True, cwd=modelsim_dir)
+        result = tool_runner.run_tool(cmd, modelsim_dir / f"vlog_{file_path.stem}.log", cwd=modelsim_dir)
         
-        if result.returncode == 0:
+        if result.ok:
             print(f"   ✅ {file_path.name}")
         else:
-            print(f"   ❌ Falha: {file_path.name}")
-            # Mostra primeiros erros
-            errors = result.stderr.split('\n')[:3]
-            for err in errors:
-                if err.strip():
-                    print(f"      {err}")
+            _report_vlog_failure(file_path.name, result)
             return False
     
-    print("✅ Todos os arquivos compilados")
     return True
 
 def _list_compiled_modules(project_path: Path):
     """Lista módulos compilados na library work."""
     modelsim_dir = get_simulation_directory(project_path)
     cmd_list = [str(config.MODELSIM_DIR / "vdir"), "-lib", "work"]
+    modules = []
     
-    result = subprocess.run(cmd_list, capture_output=True, text=True, cwd=modelsim_dir)
+    def collect_module(stream: str, line: str):
+        if stream == "stdout" and line.strip():
+            modules.append(line.strip())
     
-    if result.returncode == 0 and result.stdout.strip():
+    tool_runner.run_tool(cmd_list, modelsim_dir / "vdir.log", cwd=modelsim_dir, line_hook=collect_module)
+    
+    if modules:
         print("📋 Módulos compilados:")
-        for line in result.stdout.split('\n'):
-            if line.strip():
-                print(f"   📄 {line.strip()}")
+        for module in modules:
+            print(f"   📄 {module}")
 
 # =============================================================================
 # EXECUÇÃO DE SIMULAÇÕES (ATUALIZADA)
 # =============================================================================
 
 def run_modelsim_simulation(project_path: Path, tb_name: str, 
-                          timeout: int = 60) -> Optional[SimulationResult]:
-    """Executa simulação no ModelSim com estrutura organizada."""
+                          timeout: int = None, N: any = "default") -> Optional[SimulationResult]:
+    """Executa simulação no ModelSim com estrutura organizada.
+
+    Sem `timeout`, usa o limite aprendido das simulações anteriores deste
+    testbench/N (tool_policy).
+    """
     vsim_path = config.MODELSIM_DIR / "vsim.exe"
     if not vsim_path.exists():
         print(f"❌ vsim.exe não encontrado")
@@ -266,7 +402,10 @@ def run_modelsim_simulation(project_path: Path, tb_name: str,
     
     # Executa simulação no diretório de simulação
     cmd = [str(vsim_path), "-c", "-do", "do simulate.do; exit"]
-    result = _execute_simulation_command(cmd, modelsim_dir, tb_name, timeout)
+    with resources.core_budget(1):
+        result = _execute_simulation_command(
+            cmd, modelsim_dir, tb_name, timeout, key=resources.job_key(tb_name, N, "vsim")
+        )
     
     return result
 
@@ -274,7 +413,7 @@ def run_modelsim_simulation_with_organization(project_path: Path, tb_name: str,
                                             out_dir: Path, N: any = "default") -> Optional[SimulationResult]:
     """Executa simulação e organiza arquivos na estrutura Quartus."""
     # Executa simulação
-    sim_results = run_modelsim_simulation(project_path, tb_name)
+    sim_results = run_modelsim_simulation(project_path, tb_name, N=N)
     
     # Organiza arquivos na estrutura simulation/modelsim/
     sim_dir = organize_simulation_files(project_path, out_dir, tb_name, N)
@@ -287,12 +426,13 @@ def run_modelsim_simulation_with_organization(project_path: Path, tb_name: str,
 
 def _create_simulation_script(sim_dir: Path, tb_name: str) -> Path:
     do_file = sim_dir / "simulate.do"
+    library_args = "".join(f" -L {{{library.as_posix()}}}" for library in _read_library_list(sim_dir))
     
     with open(do_file, "w") as f:
         f.write("# Script de simulação ModelSim\n")
         f.write("onbreak {exit -code 1}\n")
         f.write("onerror {exit -code 1}\n")
-        f.write(f"vsim -c -voptargs=+acc {tb_name}\n")  # ← -c para batch mode
+        f.write(f"vsim -c -voptargs=+acc{library_args} {tb_name}\n")  # ← -c para batch mode
         f.write("run -all\n")
         f.write("echo \"Simulation finished successfully\"\n")
         f.write("quit -force\n")  # ← Force quit
@@ -300,31 +440,42 @@ def _create_simulation_script(sim_dir: Path, tb_name: str) -> Path:
     return do_file
 
 def _execute_simulation_command(cmd: List[str], sim_dir: Path, 
-                              tb_name: str, timeout: int) -> Optional[SimulationResult]:
+                              tb_name: str, timeout: int, key: str = None) -> Optional[SimulationResult]:
     """Executa comando de simulação e processa resultados."""
     try:
-        result = subprocess.run(
+        # Log transmitido linha a linha no diretório de simulação
+        log_file = sim_dir / f"simulation_{tb_name}.log"
+        outcome = tool_policy.run(
             cmd, 
-            capture_output=True, 
-            text=True, 
+            log_file,
             cwd=sim_dir,  # Agora no diretório de simulação
-            timeout=timeout
+            timeout=timeout,
+            key=key,
+            ok_returncodes=(0, 1)  # vsim sai com 1 após $stop
         )
+        result = outcome.result
+        print(f"📄 Log salvo: {log_file.relative_to(sim_dir.parent.parent)}")
         
-        # Salva log no diretório de simulação
-        log_file = _save_simulation_log(sim_dir, tb_name, result)
+        if outcome.classification == tool_policy.TIMEOUT:
+            print(f"⏰ TIMEOUT: Simulação excedeu {outcome.timeout:.0f}s")
+            return {
+                "TB_Name": tb_name,
+                "Simulation_Status": "TIMEOUT",
+                "Warnings": 0,
+                "Errors": 1
+            }
+        if outcome.classification == tool_policy.INFRASTRUCTURE:
+            print(f"🧯 Falha de infraestrutura na simulação: {outcome.infra_line or result.returncode}")
+            return {
+                "TB_Name": tb_name,
+                "Simulation_Status": "INFRASTRUCTURE_ERROR",
+                "Warnings": 0,
+                "Errors": 1
+            }
         
         # Processa resultado
         return _process_simulation_result(log_file, tb_name, result.returncode)
         
-    except subprocess.TimeoutExpired:
-        print(f"⏰ TIMEOUT: Simulação excedeu {timeout}s")
-        return {
-            "TB_Name": tb_name,
-            "Simulation_Status": "TIMEOUT",
-            "Warnings": 0,
-            "Errors": 1
-        }
     except Exception as e:
         print(f"💥 ERRO inesperado: {e}")
         return {
@@ -334,21 +485,6 @@ def _execute_simulation_command(cmd: List[str], sim_dir: Path,
             "Errors": 1
         }
 
-def _save_simulation_log(sim_dir: Path, tb_name: str, 
-                        result: subprocess.CompletedProcess) -> Path:
-    """Salva log detalhado da simulação no diretório de simulação."""
-    log_file = sim_dir / f"simulation_{tb_name}.log"
-    
-    with open(log_file, "w", encoding='utf-8') as f:
-        f.write("=== STDOUT ===\n")
-        f.write(result.stdout)
-        f.write("\n=== STDERR ===\n")
-        f.write(result.stderr)
-        f.write(f"\n=== RETURN CODE: {result.returncode} ===\n")
-    
-    print(f"📄 Log salvo: {log_file.relative_to(sim_dir.parent.parent)}")
-    return log_file
-
 def _process_simulation_result(log_file: Path, tb_name: str, 
                              return_code: int) -> Optional[SimulationResult]:
     """Processa resultado da simulação - IGNORA return_code do ModelSim."""
@@ -470,7 +606,12 @@ def _determine_simulation_status(content: str, results: SimulationResult):
 
 def organize_simulation_files(project_path: Path, out_dir: Path, 
                             tb_name: str, N: any = "default") -> Path:
-    """Organiza arquivos de simulação em estrutura Quartus."""
+    """Organiza arquivos de simulação em estrutura Quartus.
+
+    A library work não é mais copiada por testbench: conforme
+    config.SIM_RESULTS_WORK_MODE, o resultado a referencia por manifesto,
+    por uma árvore de hard links, ou guarda só logs, resumos e VCD.
+    """
     # Diretório específico para esta simulação
     sim_results_dir = get_simulation_results_dir(project_path, tb_name, N)
     sim_results_dir.mkdir(parents=True, exist_ok=True)
@@ -478,24 +619,30 @@ def organize_simulation_files(project_path: Path, out_dir: Path,
     # Diretório base de simulação
     modelsim_dir = get_simulation_directory(project_path)
     
-    # Padrões de arquivos a serem organizados
+    # Artefatos da execução: log da simulação, script, resumos e VCD
     simulation_files = [
         f"simulation_{tb_name}.log",
-        f"{tb_name}.vcd",
         "simulate.do",
+        *config.SIM_RESULT_PATTERNS,
     ]
     
     # Move arquivos específicos da simulação
     moved_files = _move_simulation_files(modelsim_dir, sim_results_dir, simulation_files)
     
-    # Copia todo o diretório work (library compilada)
+    # Library compilada: referência em vez de cópia
     work_dir = get_modelsim_work_dir(project_path)
+    work_dest = sim_results_dir / "work"
+    if work_dest.exists():
+        shutil.rmtree(work_dest)
+    (sim_results_dir / WORK_MANIFEST_NAME).unlink(missing_ok=True)
     if work_dir.exists():
-        work_dest = sim_results_dir / "work"
-        if work_dest.exists():
-            shutil.rmtree(work_dest)
-        shutil.copytree(work_dir, work_dest)
-        moved_files.append("work/")
+        mode = config.SIM_RESULTS_WORK_MODE
+        if mode == "hardlink":
+            count = staging.link_tree(work_dir, work_dest)
+            moved_files.append(f"work/ ({count} links)")
+        elif mode == "manifest":
+            _write_work_manifest(modelsim_dir, work_dir, sim_results_dir / WORK_MANIFEST_NAME)
+            moved_files.append(WORK_MANIFEST_NAME)
     
     if moved_files:
         rel_path = sim_results_dir.relative_to(project_path)
@@ -504,17 +651,43 @@ def organize_simulation_files(project_path: Path, out_dir: Path,
     
     return sim_results_dir
 
+def _write_work_manifest(modelsim_dir: Path, work_dir: Path, manifest_path: Path):
+    """Registra a library usada pela simulação (caminho, carimbo e arquivos)."""
+    files = {}
+    for file_path in sorted(work_dir.rglob("*")):
+        if file_path.is_file():
+            stat = file_path.stat()
+            files[file_path.relative_to(work_dir).as_posix()] = [stat.st_size, stat.st_mtime_ns]
+    
+    resources.write_json_atomic(manifest_path, {
+        "work_dir": str(work_dir),
+        "stamp": resources.read_json(modelsim_dir / WORK_STAMP_NAME),
+        "shared_libraries": [str(library) for library in _read_library_list(modelsim_dir)],
+        "files": files,
+    })
+
 def _move_simulation_files(source_dir: Path, dest_dir: Path, 
                           patterns: List[str]) -> List[str]:
-    """Move arquivos de simulação para diretório organizado."""
+    """Move arquivos de simulação para diretório organizado.
+
+    Só entram arquivos gravados a partir do simulate.do desta execução
+    (resumos/VCD de testbenches anteriores ficam de fora).
+    """
     moved_files = []
+    do_file = source_dir / "simulate.do"
+    run_start = do_file.stat().st_mtime if do_file.exists() else 0
     
     for pattern in patterns:
         for file_path in source_dir.glob(pattern):
-            if file_path.exists() and file_path.is_file():
-                dest_path = dest_dir / file_path.name
-                shutil.copy2(file_path, dest_path)
-                moved_files.append(file_path.name)
+            if not file_path.is_file() or file_path.name in moved_files:
+                continue
+            if file_path.name in _TOOL_LOG_NAMES or file_path.name.startswith("vlog_"):
+                continue
+            if file_path.stat().st_mtime < run_start:
+                continue
+            dest_path = dest_dir / file_path.name
+            shutil.copy2(file_path, dest_path)
+            moved_files.append(file_path.name)
     
     return moved_files
 
@@ -543,7 +716,14 @@ def debug_simulation_issue(project_path: Path, tb_name: str):
     
     # Lista módulos na library
     cmd_list = [str(config.MODELSIM_DIR / "vdir"), "-lib", "work"]
-    result = subprocess.run(cmd_list, capture_output=True, text=True, cwd=modelsim_dir)
-    
     print("📋 Módulos na library 'work':")
-    print(result.stdout if result.stdout else "   (vazia)")
\ No newline at end of file
+    lines = []
+    
+    def show_line(stream: str, line: str):
+        if stream == "stdout":
+            lines.append(line)
+            print(line)
+    
+    tool_runner.run_tool(cmd_list, modelsim_dir / "vdir.log", cwd=modelsim_dir, line_hook=show_line)
+    if not lines:
+        print("   (vazia)")
\ No newline at end of file
@@ -0,0 +1,245 @@
+# staging.py
+"""
+STAGING DE FONTES NOS DIRETÓRIOS DE BUILD
+
+Responsável por:
+- Colocar fontes inalteradas nos diretórios de build sem duplicar bytes
+  (hard link → reflink → symlink, conforme config.STAGING_LINK_MODES)
+- Cópia real apenas como último recurso
+- Escrita atômica (arquivo temporário + os.replace) para arquivos
+  reescritos, como o top e os testbenches com o parâmetro N aplicado:
+  a substituição quebra o link e nunca altera o arquivo original em src/
+- Sincronização incremental de diretórios (estilo rsync): só atualiza o
+  que mudou, remove fontes obsoletas e não toca em db/, incremental_db/
+  e demais saídas das ferramentas
+"""
+
+import hashlib
+import json
+import os
+import shutil
+import threading
+from pathlib import Path
+from typing import Dict
+
+import config
+
+try:
+    import fcntl
+except ImportError:  # Windows
+    fcntl = None
+
+# ioctl FICLONE do Linux (btrfs, XFS com reflink=1)
+_FICLONE = 0x40049409
+
+# =============================================================================
+# ESTRATÉGIAS DE LINK
+# =============================================================================
+
+def _hardlink(src: Path, dst: Path):
+    os.link(src, dst)
+
+def _reflink(src: Path, dst: Path):
+    if fcntl is None:
+        raise OSError("reflink indisponível nesta plataforma")
+    with open(src, "rb") as source, open(dst, "wb") as target:
+        try:
+            fcntl.ioctl(target.fileno(), _FICLONE, source.fileno())
+        except OSError:
+            target.close()
+            os.unlink(dst)
+            raise
+    shutil.copystat(src, dst)
+
+def _symlink(src: Path, dst: Path):
+    os.symlink(os.path.abspath(src), dst)
+
+_LINKERS = {
+    "hardlink": _hardlink,
+    "reflink": _reflink,
+    "symlink": _symlink,
+}
+
+# =============================================================================
+# STAGING
+# =============================================================================
+
+def _already_staged(src: Path, dst: Path) -> bool:
+    """True se dst já aponta para o mesmo arquivo que src."""
+    try:
+        return os.path.samefile(src, dst)
+    except OSError:
+        return False
+
+def stage_file(src: Path, dst: Path) -> str:
+    """Coloca src em dst sem copiar bytes quando possível.
+
+    Retorna o modo usado ("linked" se já estava no lugar, "hardlink",
+    "reflink", "symlink" ou "copy").
+    """
+    src, dst = Path(src), Path(dst)
+    if _already_staged(src, dst):
+        return "linked"
+
+    if dst.is_symlink() or dst.exists():
+        dst.unlink()
+
+    for mode in config.STAGING_LINK_MODES:
+        try:
+            _LINKERS[mode](src, dst)
+            return mode
+        except (OSError, NotImplementedError):
+            continue
+
+    shutil.copy2(src, dst)
+    return "copy"
+
+def write_text_atomic(path: Path, content: str):
+    """Reescreve um arquivo via temporário + os.replace.
+
+    Um hard link/symlink em `path` é substituído por um arquivo novo, então
+    a fonte original compartilhada nunca é alterada.
+    """
+    path = Path(path)
+    tmp_path = path.with_name(f".{path.name}.{os.getpid()}.{threading.get_ident()}.tmp")
+    with open(tmp_path, "w") as f:
+        f.write(content)
+    os.replace(tmp_path, path)
+
+def link_tree(src_dir: Path, dst_dir: Path) -> int:
+    """Espelha src_dir em dst_dir com hard links (cópia se o FS não suportar).
+
+    Symlinks/reflinks não são usados: a árvore precisa sobreviver à próxima
+    recompilação da origem. Retorna o número de arquivos espelhados.
+    """
+    src_dir, dst_dir = Path(src_dir), Path(dst_dir)
+    if dst_dir.exists():
+        shutil.rmtree(dst_dir)
+    count = 0
+    for dirpath, _, filenames in os.walk(src_dir):
+        target = dst_dir / Path(dirpath).relative_to(src_dir)
+        target.mkdir(parents=True, exist_ok=True)
+        for filename in filenames:
+            try:
+                os.link(os.path.join(dirpath, filename), target / filename)
+            except OSError:
+                shutil.copy2(os.path.join(dirpath, filename), target / filename)
+            count += 1
+    return count
+
+# =============================================================================
+# SINCRONIZAÇÃO INCREMENTAL
+# =============================================================================
+
+SYNC_MANIFEST_NAME = ".staged_manifest.json"
+
+# Sem manifesto (diretório criado antes da sincronização incremental), só
+# arquivos com estas extensões são tratados como fontes obsoletas
+_SOURCE_SUFFIXES = (".v", ".sv", ".sdc")
+
+def _file_sha256(path: Path) -> str:
+    hasher = hashlib.sha256()
+    with open(path, "rb") as f:
+        for chunk in iter(lambda: f.read(1024 * 1024), b""):
+            hasher.update(chunk)
+    return hasher.hexdigest()
+
+def _stat_signature(path: Path) -> list:
+    stat = os.stat(path)
+    return [stat.st_size, stat.st_mtime_ns]
+
+def _read_sync_manifest(target_dir: Path) -> Dict[str, Dict]:
+    try:
+        with open(target_dir / SYNC_MANIFEST_NAME, "r", encoding="utf-8") as f:
+            return json.load(f)
+    except (OSError, ValueError):
+        return {}
+
+def _file_unchanged(src: Path, dst: Path, entry: Dict) -> bool:
+    """Compara tamanho/mtime com o manifesto; se divergirem, compara o hash."""
+    if not dst.exists():
+        return False
+    if _already_staged(src, dst):
+        return True
+    if (entry.get("source") == str(src)
+            and entry.get("src_stat") == _stat_signature(src)
+            and entry.get("dst_stat") == _stat_signature(dst)):
+        return True
+    if os.path.getsize(src) != os.path.getsize(dst):
+        return False
+    return _file_sha256(src) == _file_sha256(dst)
+
+def _content_unchanged(content: str, dst: Path, entry: Dict) -> bool:
+    """Compara o conteúdo gerado (em memória) com o que está em disco."""
+    if not dst.exists() or dst.is_symlink():
+        return False
+    digest = hashlib.sha256(content.encode()).hexdigest()
+    if entry.get("sha256") == digest and entry.get("dst_stat") == _stat_signature(dst):
+        return True
+    with open(dst, "r") as f:
+        return f.read() == content
+
+def sync_directory(target_dir: Path, files: Dict[str, Path],
+                   generated: Dict[str, str] = None) -> Dict[str, int]:
+    """Sincroniza target_dir com as fontes desejadas, estilo rsync.
+
+    - files: nome no destino → fonte (via stage_file)
+    - generated: nome no destino → conteúdo gerado em memória (ex.: top com N
+      aplicado), escrito atomicamente só se diferente do que está em disco
+    Arquivos sincronizados numa execução anterior (.staged_manifest.json) que
+    não são mais desejados são removidos; todo o resto (db/, incremental_db/,
+    output_files/, logs, QSF) fica intacto. Retorna contadores da operação.
+    """
+    generated = generated or {}
+    target_dir.mkdir(parents=True, exist_ok=True)
+    previous = _read_sync_manifest(target_dir)
+    manifest = {}
+    stats = {"unchanged": 0, "updated": 0, "removed": 0}
+
+    for name, src in files.items():
+        dst = target_dir / name
+        entry = previous.get(name, {})
+        if _file_unchanged(src, dst, entry):
+            stats["unchanged"] += 1
+        else:
+            stage_file(src, dst)
+            stats["updated"] += 1
+        manifest[name] = {
+            "source": str(src),
+            "src_stat": _stat_signature(src),
+            "dst_stat": _stat_signature(dst),
+        }
+
+    for name, content in generated.items():
+        dst = target_dir / name
+        entry = previous.get(name, {})
+        if _content_unchanged(content, dst, entry):
+            stats["unchanged"] += 1
+        else:
+            write_text_atomic(dst, content)
+            stats["updated"] += 1
+        manifest[name] = {
+            "sha256": hashlib.sha256(content.encode()).hexdigest(),
+            "dst_stat": _stat_signature(dst),
+        }
+
+    # Fontes obsoletas: sincronizadas antes, não desejadas agora
+    if previous:
+        stale_names = previous.keys() - manifest.keys()
+    else:
+        stale_names = {
+            item.name for item in target_dir.iterdir()
+            if item.suffix in _SOURCE_SUFFIXES and item.name not in manifest
+        }
+    for name in stale_names:
+        stale = target_dir / name
+        if stale.is_symlink() or stale.is_file():
+            stale.unlink()
+            stats["removed"] += 1
+
+    tmp_path = target_dir / f"{SYNC_MANIFEST_NAME}.{os.getpid()}.{threading.get_ident()}.tmp"
+    with open(tmp_path, "w", encoding="utf-8") as f:
+        json.dump(manifest, f, indent=2)
+    os.replace(tmp_path, target_dir / SYNC_MANIFEST_NAME)
+
+    return stats
@@ -0,0 +1,27 @@
+# tests/conftest.py
+"""Configuração comum dos testes: módulos na raiz e caches em tmp_path."""
+
+import sys
+from pathlib import Path
+
+import pytest
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+import config
+import project_loader
+
+
+@pytest.fixture(autouse=True)
+def isolated_build_files(tmp_path, monkeypatch):
+    """Índices, grafo (e sua memoização), histórico e locks no diretório do teste."""
+    build_dir = tmp_path / "build"
+    monkeypatch.setattr(config, "BUILD_DIR", build_dir)
+    monkeypatch.setattr(config, "LOCK_DIR", tmp_path / "locks")
+    monkeypatch.setattr(config, "RESOURCE_HISTORY_FILE", build_dir / ".resource_history.json")
+    monkeypatch.setattr(config, "MODULE_INDEX_FILE", build_dir / ".module_index.json")
+    monkeypatch.setattr(config, "DEPENDENCY_GRAPH_FILE", build_dir / ".dependency_graph.json")
+    monkeypatch.setattr(config, "VERILOG_INDEX_FILE", build_dir / ".verilog_index.json")
+    monkeypatch.setattr(project_loader, "_graphs", {})
+    monkeypatch.setattr(project_loader, "_last_graph", (None, None))
+    return build_dir
@@ -0,0 +1,44 @@
+# tests/test_artifact_store.py
+import pytest
+
+import artifact_store
+import compile
+import config
+
+
+@pytest.fixture
+def store(tmp_path, monkeypatch):
+    monkeypatch.setattr(config, "ARTIFACT_STORE_ENABLED", True)
+    monkeypatch.setattr(config, "ARTIFACT_STORE_DIR", tmp_path / "store")
+    return tmp_path / "store"
+
+
+def _work_dir(path, with_power=True):
+    out_dir = path / "output_files"
+    out_dir.mkdir(parents=True)
+    (out_dir / "rca.fit.summary").write_text("Total registers : 8")
+    if with_power:
+        (out_dir / "rca.pow.rpt").write_text("Total Thermal Power Dissipation : 1.0 mW")
+    (path / "quartus_map.log").write_text("Info: done")
+    return path
+
+
+def test_publish_requires_power_report(store, tmp_path):
+    work_dir = _work_dir(tmp_path / "no_power", with_power=False)
+
+    assert not artifact_store.publish("ab" * 32, work_dir, "rca", 4)
+    assert not artifact_store.fetch("ab" * 32, tmp_path / "other", "rca", 4)
+
+
+def test_fetch_restores_reports_and_drops_stage_manifest(store, tmp_path):
+    key = "cd" * 32
+    assert artifact_store.publish(key, _work_dir(tmp_path / "built"), "rca", 4)
+
+    target = tmp_path / "target"
+    target.mkdir()
+    (target / compile.STAGE_MANIFEST_NAME).write_text('{"map": "old", "fit": "old"}')
+
+    assert artifact_store.fetch(key, target, "rca", 4)
+    assert (target / "output_files" / "rca.pow.rpt").exists()
+    assert (target / "quartus_map.log").exists()
+    assert not (target / compile.STAGE_MANIFEST_NAME).exists()
@@ -0,0 +1,44 @@
+# tests/test_compile.py
+import os
+
+import compile
+import module_index
+
+DEPENDENCIES = {"arith": {"half_adder": [], "full_adder": ["half_adder"], "rca": ["full_adder"]}}
+
+
+def _rtl_dir(tmp_path, monkeypatch):
+    rtl_dir = tmp_path / "src" / "rtl"
+    rtl_dir.mkdir(parents=True)
+    for name in ("half_adder", "full_adder", "rca"):
+        (rtl_dir / f"{name}.v").write_text(f"module {name}; endmodule\n")
+    monkeypatch.setattr(module_index, "find_rtl", lambda name: rtl_dir / f"{name}.v")
+    return rtl_dir
+
+
+def test_copy_dependencies_returns_every_dependency_on_rerun(tmp_path, monkeypatch):
+    _rtl_dir(tmp_path, monkeypatch)
+    project_path = tmp_path / "build" / "rca"
+    project_path.mkdir(parents=True)
+
+    first = compile.copy_dependencies("rca", project_path, DEPENDENCIES)
+    second = compile.copy_dependencies("rca", project_path, DEPENDENCIES)
+
+    expected = [project_path / "full_adder.v", project_path / "half_adder.v"]
+    assert first == expected
+    assert second == expected
+
+
+def test_copy_dependencies_restages_after_atomic_save(tmp_path, monkeypatch):
+    rtl_dir = _rtl_dir(tmp_path, monkeypatch)
+    project_path = tmp_path / "build" / "rca"
+    project_path.mkdir(parents=True)
+    compile.copy_dependencies("rca", project_path, DEPENDENCIES)
+
+    # Editor grava em temporário e renomeia: o link antigo aponta para o conteúdo velho
+    tmp = rtl_dir / "full_adder.v.tmp"
+    tmp.write_text("module full_adder(input a); endmodule\n")
+    os.replace(tmp, rtl_dir / "full_adder.v")
+    compile.copy_dependencies("rca", project_path, DEPENDENCIES)
+
+    assert (project_path / "full_adder.v").read_text() == "module full_adder(input a); endmodule\n"
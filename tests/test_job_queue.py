@@ -0,0 +1,93 @@
+# tests/test_job_queue.py
+import threading
+from contextlib import closing
+
+import config
+import job_queue
+
+DEPENDENCIES = {"arith": {"half_adder": [], "full_adder": ["half_adder"]}}
+
+
+def _project(tmp_path, module_name):
+    # Sem <módulo>.v com parâmetro N: um único job "default" por módulo
+    project_path = tmp_path / "build" / module_name
+    project_path.mkdir(parents=True, exist_ok=True)
+    return (module_name, project_path, [], [], [])
+
+
+def _submit(tmp_path, *modules):
+    queue_dir = tmp_path / "queue"
+    projects = [_project(tmp_path, module) for module in modules]
+    job_queue.submit_projects(queue_dir, projects, DEPENDENCIES, [4, 8])
+    return queue_dir
+
+
+def _state(queue_dir, module):
+    with closing(job_queue._connect(queue_dir)) as conn:
+        return conn.execute("SELECT * FROM jobs WHERE module = ?", (module,)).fetchone()
+
+
+def test_concurrent_workers_never_claim_the_same_job(tmp_path):
+    queue_dir = _submit(tmp_path, "half_adder")
+    workers = 8
+    barrier = threading.Barrier(workers)
+    claimed = []
+
+    def worker(owner):
+        barrier.wait()
+        job = job_queue.claim_job(queue_dir, owner)
+        if job is not None:
+            claimed.append((owner, job["id"]))
+
+    threads = [threading.Thread(target=worker, args=(f"w{i}",)) for i in range(workers)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+
+    assert len(claimed) == 1
+    owner, job_id = claimed[0]
+    row = _state(queue_dir, "half_adder")
+    assert row["id"] == job_id
+    assert row["state"] == job_queue.RUNNING
+    assert row["lease_owner"] == owner
+    assert row["attempts"] == 1
+
+
+def test_second_worker_gets_the_next_job(tmp_path):
+    queue_dir = _submit(tmp_path, "half_adder", "full_adder")
+
+    first = job_queue.claim_job(queue_dir, "w1")
+    # full_adder depende de half_adder, ainda em execução
+    assert job_queue.claim_job(queue_dir, "w2") is None
+
+    job_queue.complete_job(queue_dir, first["id"], "w1",
+                           [("half_adder", tmp_path, "default", tmp_path, [], [])])
+    second = job_queue.claim_job(queue_dir, "w2")
+
+    assert first["module"] == "half_adder"
+    assert second["module"] == "full_adder"
+
+
+def test_expired_lease_is_reclaimed_by_another_worker(tmp_path, monkeypatch):
+    queue_dir = _submit(tmp_path, "half_adder")
+    monkeypatch.setattr(config, "JOB_LEASE_SECONDS", -1.0)
+
+    first = job_queue.claim_job(queue_dir, "w1")
+    second = job_queue.claim_job(queue_dir, "w2")
+
+    assert first["id"] == second["id"]
+    assert _state(queue_dir, "half_adder")["lease_owner"] == "w2"
+    # O dono antigo não sobrescreve o resultado de quem tem o lease
+    job_queue.complete_job(queue_dir, first["id"], "w1", [], "falha tardia")
+    assert _state(queue_dir, "half_adder")["state"] == job_queue.RUNNING
+
+
+def test_dependent_job_is_skipped_when_dependency_fails(tmp_path):
+    queue_dir = _submit(tmp_path, "half_adder", "full_adder")
+
+    first = job_queue.claim_job(queue_dir, "w1")
+    job_queue.complete_job(queue_dir, first["id"], "w1", [], "erro de síntese")
+
+    assert job_queue.claim_job(queue_dir, "w2") is None
+    assert _state(queue_dir, "full_adder")["state"] == job_queue.SKIPPED
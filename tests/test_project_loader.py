@@ -0,0 +1,68 @@
+# tests/test_project_loader.py
+import json
+
+import config
+import project_loader
+
+# Pasta "arith" com uma cadeia de somadores e "misc" com um ciclo a → b → c → a
+TREE = {
+    "arith": {
+        "half_adder": [],
+        "full_adder": ["half_adder"],
+        "rca": ["full_adder"],
+    },
+    "misc": {
+        "a": ["b", "missing"],
+        "b": ["c"],
+        "c": ["a"],
+        "d": ["a"],
+    },
+    "__testbenches__": {"rca": ["rca_tb"]},
+}
+
+
+def test_closures_follow_transitive_dependencies():
+    graph = project_loader.dependency_graph(TREE)
+
+    assert graph.dependencies("rca") == {"full_adder", "half_adder"}
+    assert graph.dependencies("half_adder") == set()
+    assert graph.dependents("half_adder") == {"full_adder", "rca"}
+    assert graph.dependents("rca") == set()
+
+
+def test_order_puts_dependencies_first():
+    order = project_loader.dependency_graph(TREE).order
+
+    assert order.index("half_adder") < order.index("full_adder") < order.index("rca")
+
+
+def test_cycle_and_dangling_reference_are_detected():
+    graph = project_loader.dependency_graph(TREE)
+
+    assert [sorted(cycle) for cycle in graph.cycles] == [["a", "b", "c"]]
+    assert graph.dangling == {"a": ["missing"]}
+    # Módulos no ciclo e seus dependentes ainda recebem o fecho completo
+    assert graph.dependencies("d") == {"a", "b", "c", "missing"}
+    assert graph.dependents("c") == {"a", "b", "c", "d"}
+
+
+def test_folders_and_reserved_keys_are_not_modules():
+    modules = set(project_loader.dependency_graph(TREE).modules)
+
+    assert not modules & {"arith", "misc", "__testbenches__"}
+
+
+def test_graph_is_cached_on_disk_by_tree_digest(monkeypatch):
+    built = project_loader.dependency_graph(TREE)
+    with open(config.DEPENDENCY_GRAPH_FILE, "r", encoding="utf-8") as f:
+        stored = json.load(f)
+    assert stored["digest"] == project_loader._tree_digest(project_loader.module_tree(TREE))
+
+    # Sem memória, o grafo vem do disco sem recalcular
+    monkeypatch.setattr(project_loader, "_graphs", {})
+    monkeypatch.setattr(project_loader, "_last_graph", (None, None))
+    monkeypatch.setattr(project_loader, "_build_graph", lambda tree: None)
+    loaded = project_loader.dependency_graph(dict(TREE))
+    assert loaded is not built
+    assert loaded.dependencies("rca") == built.dependencies("rca")
+    assert loaded.cycles == built.cycles
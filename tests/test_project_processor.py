@@ -0,0 +1,74 @@
+# tests/test_project_processor.py
+import build_cache
+import compile
+import config
+import project_processor
+
+
+def test_power_failure_none_when_report_exists(tmp_path):
+    (tmp_path / "output_files").mkdir()
+    (tmp_path / "output_files" / "rca.pow.rpt").write_text("Total Thermal Power Dissipation : 1.0 mW")
+
+    assert project_processor.power_failure("rca", tmp_path, 4) is None
+
+
+def test_power_failure_uses_pow_stage_status(tmp_path):
+    compile.write_compile_status(tmp_path, "FAILED", "pow", "Error: license checkout failed",
+                                 classification="INFRASTRUCTURE")
+
+    failure = project_processor.power_failure("rca", tmp_path, 4)
+
+    assert failure["Status"] == "FAILED"
+    assert failure["Reason"] == "Error: license checkout failed"
+    assert failure["Classification"] == "INFRASTRUCTURE"
+
+
+def test_power_failure_when_report_missing_without_status(tmp_path):
+    compile.write_compile_status(tmp_path, "OK")
+
+    failure = project_processor.power_failure("rca", tmp_path, "default")
+
+    assert failure["Status"] == project_processor.STATUS_FAILED
+    assert failure["Reason"] == "relatório de potência ausente"
+
+
+def test_n_dir_keeps_dependencies_missing_from_project_info(tmp_path):
+    dependencies = {"arith": {"half_adder": [], "full_adder": ["half_adder"], "rca": ["full_adder"]}}
+    project_path = tmp_path / "rca"
+    project_path.mkdir()
+    (project_path / "rca.v").write_text("module rca #(parameter N = 4); endmodule\n")
+    for name in ("half_adder", "full_adder"):
+        (project_path / f"{name}.v").write_text(f"module {name}; endmodule\n")
+    n_base_dir = project_path / "N_variants"
+
+    full_info = ("rca", project_path, sorted(project_path.glob("*.v")), [], [])
+    project_processor.prepare_n_variant(full_info, dependencies, n_base_dir, 8)
+    # Segunda execução: as dependências já existiam e não constam em rtl_files
+    rerun_info = ("rca", project_path, [project_path / "rca.v"], [], [])
+    project_processor.prepare_n_variant(rerun_info, dependencies, n_base_dir, 8)
+
+    n_dir = n_base_dir / "N8"
+    assert (n_dir / "full_adder.v").exists()
+    assert (n_dir / "half_adder.v").exists()
+    assert "parameter N = 8" in (n_dir / "rca.v").read_text()
+
+
+def test_build_key_ignores_which_dependencies_were_copied(tmp_path, monkeypatch):
+    dependencies = {"arith": {"half_adder": [], "full_adder": ["half_adder"]}}
+    project_path = tmp_path / "full_adder"
+    project_path.mkdir()
+    for name in ("half_adder", "full_adder"):
+        (project_path / f"{name}.v").write_text(f"module {name}; endmodule\n")
+    keys = []
+    monkeypatch.setattr(config, "SIM_ONLY", False)
+    monkeypatch.setattr(config, "POWER_MODE", "off")
+    monkeypatch.setattr(build_cache, "is_up_to_date", lambda work_dir, module, key: keys.append(key) or True)
+
+    # Build limpo copia a dependência; na reexecução ela já existia
+    clean = ("full_adder", project_path, [project_path / "half_adder.v", project_path / "full_adder.v"], [], [])
+    rerun = ("full_adder", project_path, [project_path / "full_adder.v"], [], [])
+    for project_info in (clean, rerun):
+        variant = project_processor.prepare_single_variant(project_info)
+        assert project_processor.synthesize_variant(variant, dependencies)
+
+    assert keys[0] == keys[1]
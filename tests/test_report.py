@@ -0,0 +1,43 @@
+# tests/test_report.py
+import config
+import report
+
+
+def _sim_row(project, status, simulated=True, passed=0, total=0):
+    return {
+        "Project": project, "N": 4, "Testbench": f"{project}_tb" if simulated else "",
+        "Total_Tests": total, "Tests_Passed": passed, "Tests_Failed": total - passed,
+        "Success_Rate": (passed / total * 100) if total else 0, "Status": status,
+        "Simulated": simulated,
+    }
+
+
+def test_executive_summary_counts_only_executed_simulations(tmp_path, monkeypatch):
+    monkeypatch.setattr(config, "REPORT_DIR", tmp_path)
+    rows = [
+        _sim_row("half_adder", "ALL_PASSED", passed=4, total=4),
+        _sim_row("full_adder", "SOME_FAILED", passed=6, total=8),
+        _sim_row("mux", "ABORTED"),
+        _sim_row("alu", "UNKNOWN"),
+        _sim_row("rca", "FAILED", simulated=False),
+        _sim_row("csa", "SKIPPED_DEP_FAILED", simulated=False),
+    ]
+
+    report.write_simulation_executive_summary(rows)
+    text = (tmp_path / "simulation_executive_summary.txt").read_text(encoding="utf-8")
+
+    assert "Total de simulações executadas: 4\n" in text
+    assert "Simulações com sucesso total: 1\n" in text
+    assert "Simulações com falhas: 3\n" in text
+    assert "(das quais com status desconhecido: 1)" in text
+    assert "Variantes não simuladas (falha de compilação): 1\n" in text
+    assert "Variantes puladas (dependência com falha): 1\n" in text
+    assert "Taxa de sucesso geral: 25.0%" in text
+    assert "[SKIP] (N=4): não simulado (SKIPPED_DEP_FAILED)" in text
+    assert "[NSIM] (N=4): não simulado (FAILED)" in text
+
+
+def test_failed_report_rows_are_marked_as_not_simulated():
+    data = report.failed_report_data({"Project": "rca", "N": 8, "Status": "FAILED", "Reason": "map"})
+
+    assert data["Simulation_Results"][0]["Simulated"] is False
@@ -0,0 +1,87 @@
+# tests/test_staging.py
+import os
+
+import staging
+
+
+def _source(path, text):
+    path.parent.mkdir(parents=True, exist_ok=True)
+    path.write_text(text)
+    return path
+
+
+def _replace(path, text):
+    # Como um editor que regrava o arquivo: novo inode, link antigo quebrado
+    tmp = path.with_suffix(".tmp")
+    tmp.write_text(text)
+    os.replace(tmp, path)
+
+
+def test_first_sync_stages_everything(tmp_path):
+    src = _source(tmp_path / "src" / "adder.v", "module adder; endmodule\n")
+    target = tmp_path / "N4"
+
+    stats = staging.sync_directory(target, {"adder.v": src}, {"top.v": "module top; endmodule\n"})
+
+    assert stats == {"unchanged": 0, "updated": 2, "removed": 0}
+    assert (target / "adder.v").read_text() == src.read_text()
+    assert (target / "top.v").read_text() == "module top; endmodule\n"
+    assert (target / staging.SYNC_MANIFEST_NAME).exists()
+
+
+def test_resync_only_updates_changed_files(tmp_path):
+    adder = _source(tmp_path / "src" / "adder.v", "module adder; endmodule\n")
+    mux = _source(tmp_path / "src" / "mux.v", "module mux; endmodule\n")
+    target = tmp_path / "N4"
+    staging.sync_directory(target, {"adder.v": adder, "mux.v": mux}, {"top.v": "// N=4\n"})
+
+    _replace(adder, "module adder(input a); endmodule\n")
+    stats = staging.sync_directory(target, {"adder.v": adder, "mux.v": mux}, {"top.v": "// N=8\n"})
+
+    assert stats == {"unchanged": 1, "updated": 2, "removed": 0}
+    assert (target / "adder.v").read_text() == "module adder(input a); endmodule\n"
+    assert (target / "top.v").read_text() == "// N=8\n"
+
+
+def test_generated_file_never_touches_source(tmp_path):
+    top = _source(tmp_path / "src" / "top.v", "parameter N = 4;\n")
+    target = tmp_path / "N8"
+    staging.sync_directory(target, {"top.v": top})
+
+    staging.sync_directory(target, {}, {"top.v": "parameter N = 8;\n"})
+
+    assert top.read_text() == "parameter N = 4;\n"
+    assert (target / "top.v").read_text() == "parameter N = 8;\n"
+
+
+def test_removes_stale_sources_and_keeps_tool_outputs(tmp_path):
+    adder = _source(tmp_path / "src" / "adder.v", "module adder; endmodule\n")
+    mux = _source(tmp_path / "src" / "mux.v", "module mux; endmodule\n")
+    target = tmp_path / "N4"
+    staging.sync_directory(target, {"adder.v": adder, "mux.v": mux})
+    (target / "db").mkdir()
+    (target / "db" / "top.db_info").write_text("quartus")
+    (target / "quartus_map.log").write_text("log")
+
+    stats = staging.sync_directory(target, {"adder.v": adder})
+
+    assert stats["removed"] == 1
+    assert not (target / "mux.v").exists()
+    assert (target / "adder.v").exists()
+    assert (target / "db" / "top.db_info").exists()
+    assert (target / "quartus_map.log").exists()
+
+
+def test_without_manifest_only_removes_unwanted_sources(tmp_path):
+    adder = _source(tmp_path / "src" / "adder.v", "module adder; endmodule\n")
+    target = tmp_path / "N4"
+    _source(target / "old.v", "module old; endmodule\n")
+    _source(target / "old.sdc", "create_clock -period 10 clk\n")
+    _source(target / "top.qsf", "set_global_assignment -name TOP_LEVEL_ENTITY top\n")
+
+    stats = staging.sync_directory(target, {"adder.v": adder})
+
+    assert stats["removed"] == 2
+    assert sorted(p.name for p in target.iterdir() if p.name != staging.SYNC_MANIFEST_NAME) == [
+        "adder.v", "top.qsf"
+    ]
@@ -0,0 +1,85 @@
+# tests/test_tool_policy.py
+import pytest
+
+import config
+import tool_policy
+import tool_runner
+
+
+def _result(returncode, timed_out=False, abort_reason=None):
+    return tool_runner.ToolResult(returncode, 1.0, timed_out, 0.0, [], abort_reason)
+
+
+@pytest.fixture
+def scripted_runs(monkeypatch):
+    """Substitui run_tool por uma sequência de resultados (e linhas de saída)."""
+    calls = []
+
+    def install(*runs):
+        runs = list(runs)
+
+        def fake_run_tool(cmd, logfile, cwd=None, timeout=None, key=None, line_hook=None):
+            result, lines = runs.pop(0)
+            for line in lines:
+                line_hook("stdout", line)
+            calls.append(cmd)
+            return result
+
+        monkeypatch.setattr(tool_runner, "run_tool", fake_run_tool)
+        monkeypatch.setattr(config, "TOOL_MAX_RETRIES", 2)
+        monkeypatch.setattr(config, "TOOL_RETRY_BACKOFF_S", 0)
+        return calls
+
+    return install
+
+
+def test_classify_success_and_design_error():
+    assert tool_policy.classify(_result(0), None) == tool_policy.OK
+    assert tool_policy.classify(_result(2), None) == tool_policy.DESIGN_ERROR
+    assert tool_policy.classify(_result(1), None, ok_returncodes=(0, 1)) == tool_policy.OK
+
+
+def test_classify_timeout():
+    assert tool_policy.classify(_result(None, timed_out=True), None) == tool_policy.TIMEOUT
+
+
+def test_classify_crash_and_infrastructure_line():
+    assert tool_policy.classify(_result(-11), None) == tool_policy.INFRASTRUCTURE
+    assert tool_policy.classify(_result(3), "Error: license checkout failed") == tool_policy.INFRASTRUCTURE
+
+
+def test_classify_abort_is_design_error_despite_kill_code():
+    # O LogWatcher mata o processo (SIGKILL → -9), que não é falha de infraestrutura
+    aborted = _result(-9, abort_reason="Error (12006): Node instance ... not found")
+    assert tool_policy.classify(aborted, None) == tool_policy.DESIGN_ERROR
+    assert tool_policy.classify(aborted, "Segmentation fault") == tool_policy.DESIGN_ERROR
+
+
+def test_run_retries_infrastructure_failures(scripted_runs, tmp_path):
+    calls = scripted_runs(
+        (_result(1), ["Error: FLEXlm license checkout failed"]),
+        (_result(0), []),
+    )
+    outcome = tool_policy.run(["quartus_map", "top"], tmp_path / "map.log")
+    assert outcome.ok
+    assert outcome.attempts == 2
+    assert len(calls) == 2
+
+
+def test_run_never_retries_aborts(scripted_runs, tmp_path):
+    calls = scripted_runs(
+        (_result(-9, abort_reason="Error (10161): object not declared"), ["Segmentation fault"]),
+        (_result(0), []),
+    )
+    outcome = tool_policy.run(["quartus_map", "top"], tmp_path / "map.log")
+    assert outcome.classification == tool_policy.DESIGN_ERROR
+    assert outcome.attempts == 1
+    assert len(calls) == 1
+
+
+def test_run_gives_up_after_max_retries(scripted_runs, tmp_path):
+    calls = scripted_runs(*[(_result(-11), [])] * 3)
+    outcome = tool_policy.run(["quartus_fit", "top"], tmp_path / "fit.log")
+    assert outcome.classification == tool_policy.INFRASTRUCTURE
+    assert outcome.attempts == 3
+    assert len(calls) == 3
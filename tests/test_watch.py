@@ -0,0 +1,63 @@
+# tests/test_watch.py
+import pytest
+
+import build_cache
+import config
+import watch
+
+DEPENDENCIES = {
+    "arith": {"half_adder": [], "full_adder": ["half_adder"], "alu": []},
+    "__testbenches__": {"alu": ["regression/alu_smoke.v"]},
+}
+
+
+@pytest.fixture
+def source_dirs(tmp_path, monkeypatch):
+    monkeypatch.setattr(config, "RTL_DIR", tmp_path / "src" / "rtl")
+    monkeypatch.setattr(config, "TB_DIR", tmp_path / "src" / "tb")
+    monkeypatch.setattr(config, "SDC_DIR", tmp_path / "src" / "sdc")
+    return tmp_path / "src"
+
+
+@pytest.mark.parametrize("name, module", [
+    ("full_adder_tb.v", "full_adder"),
+    ("tb_full_adder.v", "full_adder"),
+    ("full_adder_tb_exhaustive.sv", "full_adder"),
+])
+def test_testbench_naming_rules(source_dirs, name, module):
+    path = config.TB_DIR / "arith" / name
+
+    assert watch.changed_modules({path}, DEPENDENCIES) == {module}
+
+
+def test_declared_testbench_maps_to_its_module(source_dirs):
+    path = config.TB_DIR / "regression" / "alu_smoke.v"
+
+    assert watch.changed_modules({path}, DEPENDENCIES) == {"alu"}
+
+
+def test_declared_module_ignores_naming_rules(source_dirs):
+    # alu declara seus testbenches: alu_tb.v não é dele, vale como arquivo auxiliar
+    path = config.TB_DIR / "alu_tb.v"
+
+    assert watch.changed_modules({path}, DEPENDENCIES) == {"alu_tb"}
+
+
+def test_rtl_and_global_changes(source_dirs):
+    assert watch.changed_modules({config.RTL_DIR / "half_adder.v"}, DEPENDENCIES) == {"half_adder"}
+    assert watch.changed_modules({config.SDC_DIR / "clocks.sdc"}, DEPENDENCIES) is None
+    assert watch.changed_modules({config.DEPENDENCIES_FILE}, DEPENDENCIES) is None
+
+
+def test_sim_only_is_reevaluated_per_batch(source_dirs, monkeypatch):
+    snapshots = iter([{"design": "a", "testbench": "t2"}, {"design": "b", "testbench": "t2"}])
+    monkeypatch.setattr(build_cache, "compute_source_snapshot", lambda: next(snapshots))
+    monkeypatch.setattr(build_cache, "load_source_snapshot", lambda: {"design": "a", "testbench": "t1"})
+    monkeypatch.setattr(config, "SIM_ONLY", True)
+
+    overrides, _ = watch._refresh_sim_only({"SIM_ONLY": True})
+    assert overrides["SIM_ONLY"] is True
+
+    overrides, _ = watch._refresh_sim_only(overrides)
+    assert overrides["SIM_ONLY"] is False
+    assert config.SIM_ONLY is False
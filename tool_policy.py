@@ -0,0 +1,145 @@
+# tool_policy.py
+"""
+POLÍTICA DE EXECUÇÃO DE FERRAMENTAS
+
+Responsável por:
+- Timeouts por ferramenta e por módulo/N aprendidos das durações anteriores
+- Nova tentativa com backoff para falhas transitórias (licença, segfault)
+- Classificação das falhas: erro de projeto, timeout ou infraestrutura
+
+Uma varredura noturna sem supervisão não fica parada num processo travado:
+o timeout vem do histórico (resources) e só falhas de infraestrutura são
+repetidas.
+"""
+
+import re
+import time
+from pathlib import Path
+from typing import List, NamedTuple, Optional, Tuple
+
+import config
+import resources
+import tool_runner
+
+# Classificação do resultado de uma execução
+OK = "OK"
+DESIGN_ERROR = "DESIGN_ERROR"
+TIMEOUT = "TIMEOUT"
+INFRASTRUCTURE = "INFRASTRUCTURE"
+
+# Linhas que indicam problema de infraestrutura (licença, crash da ferramenta)
+INFRASTRUCTURE_PATTERNS = [
+    re.compile(pattern, re.IGNORECASE) for pattern in (
+        r"licen[sc]e.*(checkout|not available|unable|expired|server|could not)",
+        r"(unable|failed) to (check ?out|obtain|get) .*licen[sc]e",
+        r"can't find valid feature line",
+        r"FLEXlm|lmgrd",
+        r"segmentation fault|access violation|stack dump",
+        r"internal error: sub-system",
+        r"out of memory|cannot allocate memory",
+    )
+]
+
+# Códigos de saída de crash: SIGSEGV/SIGABRT/SIGKILL (POSIX) e exceções do Windows
+CRASH_RETURN_CODES = {-11, -6, -9, 134, 137, 139, 0xC0000005, 0xC00000FD}
+
+# =============================================================================
+# TIPOS DE DADOS
+# =============================================================================
+
+class ToolOutcome(NamedTuple):
+    result: tool_runner.ToolResult   # Última tentativa
+    classification: str              # OK, DESIGN_ERROR, TIMEOUT ou INFRASTRUCTURE
+    attempts: int
+    timeout: Optional[float]
+    infra_line: Optional[str] = None
+
+    @property
+    def ok(self) -> bool:
+        return self.classification == OK
+
+# =============================================================================
+# TIMEOUTS APRENDIDOS
+# =============================================================================
+
+def learned_timeout(cmd: List[str], key: str = None) -> Optional[float]:
+    """Timeout de uma execução a partir do histórico de durações.
+
+    Com histórico do job (ou do mesmo módulo/ferramenta em outro N), usa
+    TOOL_TIMEOUT_FACTOR x a maior duração, nunca abaixo de TOOL_TIMEOUT_MIN_S.
+    Sem histórico, usa o padrão da ferramenta em config.TOOL_TIMEOUTS.
+    """
+    default = tool_runner.tool_timeout(cmd)
+    if key is None:
+        return default
+
+    longest = resources.predict_duration_s(key)
+    if longest is None:
+        return default
+    return max(config.TOOL_TIMEOUT_MIN_S, longest * config.TOOL_TIMEOUT_FACTOR)
+
+# =============================================================================
+# CLASSIFICAÇÃO
+# =============================================================================
+
+def _infrastructure_line(line: str) -> bool:
+    return any(pattern.search(line) for pattern in INFRASTRUCTURE_PATTERNS)
+
+def classify(result: tool_runner.ToolResult, infra_line: Optional[str],
+             ok_returncodes: Tuple[int, ...] = (0,)) -> str:
+    """Classifica o resultado de uma execução.
+
+    Uma parada pedida pelo hook de linha (LogWatcher) é erro de projeto:
+    o processo morto pelo kill sai com código de crash, mas não deve ser
+    tratado como infraestrutura nem repetido.
+    """
+    if result.abort_reason:
+        return DESIGN_ERROR
+    if result.timed_out:
+        return TIMEOUT
+    if result.returncode in ok_returncodes:
+        return OK
+    if infra_line is not None or result.returncode in CRASH_RETURN_CODES:
+        return INFRASTRUCTURE
+    return DESIGN_ERROR
+
+# =============================================================================
+# EXECUÇÃO COM POLÍTICA
+# =============================================================================
+
+def run(cmd: List[str], logfile: Path, cwd: Path = None, key: str = None,
+        line_hook: tool_runner.LineHook = None, timeout: float = None,
+        ok_returncodes: Tuple[int, ...] = (0,)) -> ToolOutcome:
+    """Executa uma ferramenta com timeout aprendido e novas tentativas.
+
+    Só falhas de infraestrutura são repetidas (até TOOL_MAX_RETRIES vezes,
+    com espera TOOL_RETRY_BACKOFF_S dobrando a cada tentativa). Execuções
+    bem-sucedidas alimentam o histórico de durações. `ok_returncodes`
+    cobre ferramentas que saem com código != 0 sem erro (ex.: vsim após $stop).
+    """
+    if timeout is None:
+        timeout = learned_timeout(cmd, key)
+
+    attempt = 0
+    while True:
+        attempt += 1
+        infra = {}
+
+        def hook(stream: str, line: str) -> Optional[str]:
+            if "line" not in infra and _infrastructure_line(line):
+                infra["line"] = line.strip()
+            return line_hook(stream, line) if line_hook else None
+
+        result = tool_runner.run_tool(cmd, logfile, cwd=cwd, timeout=timeout, key=key, line_hook=hook)
+        classification = classify(result, infra.get("line"), ok_returncodes)
+
+        if classification == OK and key:
+            resources.record_duration(key, result.elapsed)
+
+        if classification != INFRASTRUCTURE or attempt > config.TOOL_MAX_RETRIES:
+            return ToolOutcome(result, classification, attempt, timeout, infra.get("line"))
+
+        delay = config.TOOL_RETRY_BACKOFF_S * 2 ** (attempt - 1)
+        print(f"🔁 Falha de infraestrutura ({infra.get('line') or f'código {result.returncode}'}); "
+              f"nova tentativa {attempt + 1}/{config.TOOL_MAX_RETRIES + 1} em {delay:.0f}s")
+        time.sleep(delay)
@@ -0,0 +1,165 @@
+# tool_runner.py
+"""
+EXECUÇÃO ASSÍNCRONA DE FERRAMENTAS EXTERNAS
+
+Responsável por:
+- Subprocessos asyncio com stdout/stderr gravados no log linha a linha
+- Timeout por ferramenta (config.TOOL_TIMEOUTS) ou por chamada
+- Hook de linha em tempo real para parsers (memória constante, mesmo com logs enormes)
+- Encerramento antecipado quando o hook de linha devolve um motivo de parada
+- Várias ferramentas simultâneas a partir de um único event loop (run_tools)
+- Admissão por teto de memória e amostragem de RSS (resources)
+"""
+
+import asyncio
+import collections
+import contextlib
+import os
+import signal
+import time
+from pathlib import Path
+from typing import Callable, Dict, List, NamedTuple, Optional
+
+import config
+import resources
+
+# Linhas finais de stderr mantidas para mensagens de erro
+STDERR_TAIL_LINES = 20
+
+# Tamanho máximo de uma linha lida do processo (o padrão do asyncio é 64 KB)
+STREAM_LINE_LIMIT = 1024 * 1024
+
+# Hook chamado para cada linha: (nome do stream, linha sem quebra).
+# Se devolver uma string, o processo é encerrado e ela vira o abort_reason.
+LineHook = Callable[[str, str], Optional[str]]
+
+# =============================================================================
+# TIPOS DE DADOS
+# =============================================================================
+
+class ToolResult(NamedTuple):
+    returncode: Optional[int]   # None se o processo foi encerrado por timeout
+    elapsed: float
+    timed_out: bool
+    peak_mb: float
+    stderr_tail: List[str]
+    abort_reason: Optional[str] = None  # Motivo da parada pedida pelo hook de linha
+
+    @property
+    def ok(self) -> bool:
+        return self.returncode == 0 and not self.timed_out and self.abort_reason is None
+
+class ToolInvocation(NamedTuple):
+    cmd: List[str]
+    logfile: Path
+    cwd: Optional[Path] = None
+    timeout: Optional[float] = None
+    key: Optional[str] = None
+    line_hook: Optional[LineHook] = None
+
+def tool_timeout(cmd: List[str]) -> Optional[float]:
+    """Timeout configurado para a ferramenta (pelo nome do executável)."""
+    tool = Path(cmd[0]).stem.lower()
+    return config.TOOL_TIMEOUTS.get(tool)
+
+# =============================================================================
+# EXECUÇÃO
+# =============================================================================
+
+def _kill_tree(process: asyncio.subprocess.Process):
+    """Encerra o processo e seus descendentes (que manteriam os pipes abertos)."""
+    kill_signal = getattr(signal, "SIGKILL", signal.SIGTERM)
+    # Filhos primeiro: o pai morto deixaria os netos órfãos e fora da árvore
+    for pid in reversed(resources.process_tree_pids(process.pid)):
+        try:
+            os.kill(pid, kill_signal)
+        except OSError:
+            pass
+
+async def _pump(stream: asyncio.StreamReader, name: str, log, line_hook: Optional[LineHook],
+                tail: Optional[collections.deque], process: asyncio.subprocess.Process,
+                abort: Dict[str, str]):
+    """Copia um stream para o log linha a linha."""
+    while True:
+        raw = await stream.readline()
+        if not raw:
+            break
+        line = raw.decode(errors="replace")
+        log.write(line)
+        text = line.rstrip("\r\n")
+        if tail is not None:
+            tail.append(text)
+        if line_hook is None or "reason" in abort:
+            continue
+        reason = line_hook(name, text)
+        if reason:
+            # Parada antecipada: o restante da saída ainda vai para o log
+            abort["reason"] = reason
+            print(f"🛑 Ferramenta encerrada antecipadamente: {reason}")
+            _kill_tree(process)
+
+async def run_tool_async(cmd: List[str], logfile: Path, cwd: Path = None,
+                         timeout: float = None, key: str = None,
+                         line_hook: LineHook = None) -> ToolResult:
+    """Executa uma ferramenta transmitindo a saída para `logfile`.
+
+    Sem `timeout`, usa config.TOOL_TIMEOUTS. Com `key` (resources.job_key),
+    o job passa pela admissão de memória e o pico de RSS vai para o histórico.
+    """
+    if timeout is None:
+        timeout = tool_timeout(cmd)
+    tail = collections.deque(maxlen=STDERR_TAIL_LINES)
+
+    with contextlib.ExitStack() as stack:
+        # A admissão pode bloquear aguardando memória: fora do event loop
+        await asyncio.to_thread(stack.enter_context, resources.memory_admission(key))
+
+        start = time.time()
+        process = await asyncio.create_subprocess_exec(
+            *[str(part) for part in cmd], cwd=cwd,
+            stdout=asyncio.subprocess.PIPE, stderr=asyncio.subprocess.PIPE,
+            limit=STREAM_LINE_LIMIT
+        )
+        stop_sampler = resources.start_rss_sampler(process.pid)
+        timed_out = False
+        abort = {}
+
+        with open(logfile, "w", encoding="utf-8") as log:
+            pumps = asyncio.gather(
+                _pump(process.stdout, "stdout", log, line_hook, None, process, abort),
+                _pump(process.stderr, "stderr", log, line_hook, tail, process, abort),
+            )
+            try:
+                await asyncio.wait_for(asyncio.shield(pumps), timeout)
+            except asyncio.TimeoutError:
+                timed_out = True
+                _kill_tree(process)
+                await pumps
+            await process.wait()
+
+        peak_mb = stop_sampler()
+        if key:
+            resources.record_peak_memory(key, peak_mb)
+
+    return ToolResult(
+        returncode=None if timed_out else process.returncode,
+        elapsed=time.time() - start,
+        timed_out=timed_out,
+        peak_mb=peak_mb,
+        stderr_tail=list(tail),
+        abort_reason=abort.get("reason"),
+    )
+
+def run_tool(cmd: List[str], logfile: Path, cwd: Path = None, timeout: float = None,
+             key: str = None, line_hook: LineHook = None) -> ToolResult:
+    """Versão síncrona de run_tool_async (um event loop por chamada/thread)."""
+    return asyncio.run(run_tool_async(cmd, logfile, cwd, timeout, key, line_hook))
+
+def run_tools(invocations: List[ToolInvocation]) -> List[ToolResult]:
+    """Executa várias ferramentas simultaneamente em um único event loop."""
+    async def run_all():
+        return await asyncio.gather(*(
+            run_tool_async(inv.cmd, inv.logfile, inv.cwd, inv.timeout, inv.key, inv.line_hook)
+            for inv in invocations
+        ))
+    return list(asyncio.run(run_all()))
@@ -0,0 +1,253 @@
+# verilog_index.py
+"""
+ÍNDICE DE METADADOS VERILOG
+
+Responsável por:
+- Varredura leve dos cabeçalhos Verilog/SystemVerilog: módulos, parâmetros
+  (com valor padrão), portas, submódulos instanciados e uso de SystemVerilog
+- Cache em disco por hash do conteúdo (o mesmo arquivo linkado em vários
+  diretórios de build é analisado uma única vez)
+- Consultas usadas no lugar de reler/grepar arquivos inteiros
+
+Não é um parser completo: comentários e strings são removidos e o restante
+é lido por expressões regulares e casamento de parênteses, o suficiente
+para o estilo de RTL deste repositório.
+"""
+
+import atexit
+import hashlib
+import json
+import os
+import re
+import threading
+from pathlib import Path
+from typing import Dict, List, Optional
+
+import config
+
+INDEX_VERSION = 1
+
+# Palavras-chave exclusivas de SystemVerilog (casadas como palavras inteiras)
+SV_KEYWORDS = ("logic", "bit", "always_ff", "always_comb", "always_latch", "assert",
+               "typedef", "struct", "enum", "interface", "unique", "priority")
+
+# Palavras que podem abrir uma linha do corpo e não são instanciações
+_NON_INSTANCE_WORDS = {
+    "module", "endmodule", "input", "output", "inout", "wire", "reg", "logic", "bit",
+    "integer", "real", "time", "genvar", "parameter", "localparam", "assign", "always",
+    "always_ff", "always_comb", "always_latch", "initial", "final", "if", "else", "for",
+    "while", "repeat", "forever", "case", "casez", "casex", "endcase", "begin", "end",
+    "generate", "endgenerate", "function", "endfunction", "task", "endtask", "typedef",
+    "struct", "enum", "signed", "unsigned", "posedge", "negedge", "or", "and", "not",
+    "nand", "nor", "xor", "xnor", "buf", "return", "default", "defparam", "specify",
+    "endspecify", "supply0", "supply1", "tri", "wand", "wor", "int", "assert", "property",
+    "automatic", "static", "void",
+}
+
+_COMMENTS = re.compile(r"//[^\n]*|/\*.*?\*/|\"(?:\\.|[^\"\\])*\"", re.DOTALL)
+_MODULE_START = re.compile(r"\b(?:module|macromodule)\s+(\w+)")
+_MODULE_END = re.compile(r"\bendmodule\b")
+_PARAMETER = re.compile(r"\bparameter\b(?:\s+(?:integer|real|signed|unsigned|\[[^\]]*\]))*"
+                        r"\s+(\w+)\s*=\s*([^,;)]+)")
+_PORT_DIRECTION = re.compile(r"\b(input|output|inout)\b([^;]*)")
+_IDENTIFIER = re.compile(r"[A-Za-z_]\w*")
+_INSTANCE = re.compile(r"\b([A-Za-z_]\w*)\s+([A-Za-z_]\w*)\s*(?:\[[^\]]*\]\s*)?\(")
+_PARAM_INSTANCE = re.compile(r"\b([A-Za-z_]\w*)\s*#\s*\(")
+_INSTANCE_TAIL = re.compile(r"\s*([A-Za-z_]\w*)\s*(?:\[[^\]]*\]\s*)?\(")
+_SV_USAGE = re.compile(r"\b(" + "|".join(SV_KEYWORDS) + r")\b")
+
+_index: Optional[Dict] = None
+_dirty = False
+_lock = threading.Lock()
+
+# =============================================================================
+# VARREDURA
+# =============================================================================
+
+def _strip_comments(text: str) -> str:
+    return _COMMENTS.sub(lambda m: " " if m.group(0).startswith("/") else '""', text)
+
+def _matching_paren(text: str, start: int) -> int:
+    """Índice logo após o ')' que fecha o '(' em `start` (ou len(text))."""
+    depth = 0
+    for pos in range(start, len(text)):
+        char = text[pos]
+        if char == "(":
+            depth += 1
+        elif char == ")":
+            depth -= 1
+            if depth == 0:
+                return pos + 1
+    return len(text)
+
+def _port_names(header: str) -> List[str]:
+    """Portas do cabeçalho (ANSI ou lista simples) na ordem declarada."""
+    ports = []
+    for piece in header.split(","):
+        piece = re.sub(r"\[[^\]]*\]", " ", piece).split("=")[0]
+        names = _IDENTIFIER.findall(piece)
+        if names:
+            ports.append(names[-1])
+    return ports
+
+def _instances(body: str) -> List[str]:
+    """Tipos de módulo instanciados no corpo: `tipo [#(...)] nome [vetor] (`."""
+    found = []
+
+    def add(module: str, instance: str, start: int):
+        if (module in _NON_INSTANCE_WORDS or instance in _NON_INSTANCE_WORDS
+                or body[start - 1:start] in (".", "$", "`")):
+            return
+        if module not in found:
+            found.append(module)
+
+    for match in _INSTANCE.finditer(body):
+        add(match.group(1), match.group(2), match.start())
+
+    for match in _PARAM_INSTANCE.finditer(body):
+        close = _matching_paren(body, match.end() - 1)
+        tail = _INSTANCE_TAIL.match(body, close)
+        if tail:
+            add(match.group(1), tail.group(1), match.start())
+
+    return found
+
+def scan_text(text: str) -> Dict:
+    """Extrai metadados de um fonte Verilog/SystemVerilog."""
+    text = _strip_comments(text)
+    modules = []
+
+    for match in _MODULE_START.finditer(text):
+        end_match = _MODULE_END.search(text, match.end())
+        module_end = end_match.start() if end_match else len(text)
+        pos = match.end()
+        while pos < module_end and text[pos].isspace():
+            pos += 1
+
+        # Parâmetros do cabeçalho: #( ... )
+        header_params = ""
+        if text.startswith("#", pos):
+            paren = text.find("(", pos)
+            close = _matching_paren(text, paren)
+            header_params = text[paren + 1:close - 1]
+            pos = close
+            while pos < module_end and text[pos].isspace():
+                pos += 1
+
+        # Lista de portas: ( ... );
+        header_ports = ""
+        if text.startswith("(", pos):
+            close = _matching_paren(text, pos)
+            header_ports = text[pos + 1:close - 1]
+            pos = close
+        body = text[pos:module_end]
+
+        parameters = {}
+        for source in (header_params, body):
+            for name, default in _PARAMETER.findall(source):
+                parameters.setdefault(name, default.strip())
+
+        ports = _port_names(header_ports)
+        if not _PORT_DIRECTION.search(header_ports):
+            # Estilo Verilog-1995: direções declaradas no corpo
+            declared = [
+                name for _, names in _PORT_DIRECTION.findall(body)
+                for name in _IDENTIFIER.findall(re.sub(r"\[[^\]]*\]", " ", names))
+            ]
+            ports = [port for port in ports if port in declared] or ports
+
+        modules.append({
+            "name": match.group(1),
+            "parameters": parameters,
+            "ports": ports,
+            "instances": _instances(body),
+        })
+
+    return {
+        "modules": modules,
+        "systemverilog": bool(_SV_USAGE.search(text)),
+    }
+
+# =============================================================================
+# CACHE POR HASH
+# =============================================================================
+
+def _load() -> Dict:
+    try:
+        with open(config.VERILOG_INDEX_FILE, "r", encoding="utf-8") as f:
+            stored = json.load(f)
+        if stored.get("version") == INDEX_VERSION:
+            return stored
+    except (OSError, ValueError):
+        pass
+    return {"version": INDEX_VERSION, "stats": {}, "files": {}}
+
+def save():
+    """Grava o índice em disco se houve novas entradas."""
+    global _dirty
+    with _lock:
+        if _index is None or not _dirty:
+            return
+        config.VERILOG_INDEX_FILE.parent.mkdir(parents=True, exist_ok=True)
+        tmp_path = config.VERILOG_INDEX_FILE.with_name(
+            f"{config.VERILOG_INDEX_FILE.name}.{os.getpid()}.{threading.get_ident()}.tmp")
+        with open(tmp_path, "w", encoding="utf-8") as f:
+            json.dump(_index, f)
+        os.replace(tmp_path, config.VERILOG_INDEX_FILE)
+        _dirty = False
+
+atexit.register(save)
+
+def file_metadata(file_path: Path) -> Dict:
+    """Metadados de um arquivo (stat → hash → varredura, com cache)."""
+    global _index, _dirty
+    file_path = Path(file_path)
+    stat = os.stat(file_path)
+    signature = [stat.st_size, stat.st_mtime_ns]
+    real_path = os.path.realpath(file_path)
+
+    with _lock:
+        if _index is None:
+            _index = _load()
+        known = _index["stats"].get(real_path)
+        if known and known[:2] == signature and known[2] in _index["files"]:
+            return _index["files"][known[2]]
+
+    content = file_path.read_bytes()
+    digest = hashlib.sha256(content).hexdigest()
+
+    with _lock:
+        metadata = _index["files"].get(digest)
+        if metadata is None:
+            metadata = scan_text(content.decode(errors="replace"))
+            _index["files"][digest] = metadata
+        _index["stats"][real_path] = signature + [digest]
+        _dirty = True
+
+    return metadata
+
+# =============================================================================
+# CONSULTAS
+# =============================================================================
+
+def module_info(file_path: Path, module_name: str = None) -> Optional[Dict]:
+    """Módulo `module_name` do arquivo (ou o primeiro, se não informado)."""
+    modules = file_metadata(file_path)["modules"]
+    for module in modules:
+        if module_name is None or module["name"] == module_name:
+            return module
+    return None
+
+def has_parameter(file_path: Path, module_name: str, param_name: str) -> bool:
+    """True se o módulo declara `parameter <param_name>`."""
+    module = module_info(file_path, module_name)
+    return module is not None and param_name in module["parameters"]
+
+def uses_systemverilog(file_path: Path) -> bool:
+    """True se o arquivo usa construções exclusivas de SystemVerilog."""
+    return file_metadata(file_path)["systemverilog"]
+
+def instantiated_modules(file_path: Path, module_name: str = None) -> List[str]:
+    """Tipos de submódulos instanciados pelo módulo."""
+    module = module_info(file_path, module_name)
+    return list(module["instances"]) if module else []
@@ -0,0 +1,259 @@
+# watch.py
+"""
+MODO WATCH (--watch)
+
+Responsável por:
+- Monitorar src/rtl, src/tb, src/sdc e o dependencies.json
+  (inotify via watchdog, se instalado; varredura periódica como fallback)
+- Agrupar edições em rajada (debounce)
+- Reconstruir e ressimular só os módulos alterados e seus dependentes,
+  usando o grafo reverso do dependencies.json
+- Com --detect-changes, decidir a cada rajada se basta ressimular
+  (só testbenches mudaram) ou se o Quartus precisa rodar
+- Atualizar nos relatórios apenas as linhas desses projetos
+"""
+
+import os
+import threading
+import time
+from pathlib import Path
+from typing import Callable, Dict, List, Optional, Set, Tuple
+
+import build_cache
+import config
+import module_index
+import project_loader
+import report_generator
+import scheduler
+
+try:
+    from watchdog.events import FileSystemEventHandler
+    from watchdog.observers import Observer
+except ImportError:  # watchdog é opcional
+    FileSystemEventHandler = object
+    Observer = None
+
+# =============================================================================
+# COLETA DE ALTERAÇÕES
+# =============================================================================
+
+def _watched_roots() -> List[Path]:
+    return [root for root in (config.RTL_DIR, config.TB_DIR, config.SDC_DIR) if root.exists()]
+
+class _ChangeQueue:
+    """Caminhos alterados, com espera até a rajada de edições terminar."""
+
+    def __init__(self):
+        self._paths: Set[Path] = set()
+        self._last_change = 0.0
+        self._condition = threading.Condition()
+
+    def add(self, path: Path):
+        with self._condition:
+            self._paths.add(Path(path))
+            self._last_change = time.monotonic()
+            self._condition.notify()
+
+    def drain(self, debounce: float) -> Set[Path]:
+        """Bloqueia até haver alterações e `debounce` segundos sem novas."""
+        with self._condition:
+            while not self._paths:
+                self._condition.wait()
+            while True:
+                quiet = time.monotonic() - self._last_change
+                if quiet >= debounce:
+                    break
+                self._condition.wait(debounce - quiet)
+            paths, self._paths = self._paths, set()
+            return paths
+
+class _EventHandler(FileSystemEventHandler):
+    def __init__(self, changes: _ChangeQueue):
+        self.changes = changes
+
+    def on_any_event(self, event):
+        if event.is_directory:
+            return
+        self.changes.add(event.src_path)
+        if getattr(event, "dest_path", None):
+            self.changes.add(event.dest_path)
+
+def _snapshot() -> Dict[str, tuple]:
+    """Tamanho e mtime de cada arquivo monitorado (fallback por varredura)."""
+    files = {}
+    paths = [str(config.DEPENDENCIES_FILE)]
+    for root in _watched_roots():
+        for dirpath, _, filenames in os.walk(root):
+            paths.extend(os.path.join(dirpath, filename) for filename in filenames)
+    for path in paths:
+        try:
+            stat = os.stat(path)
+        except OSError:
+            continue
+        files[path] = (stat.st_size, stat.st_mtime_ns)
+    return files
+
+def _poll(changes: _ChangeQueue, stop: threading.Event):
+    previous = _snapshot()
+    while not stop.wait(config.WATCH_POLL_INTERVAL):
+        current = _snapshot()
+        for path in previous.keys() | current.keys():
+            if previous.get(path) != current.get(path):
+                changes.add(path)
+        previous = current
+
+def _start_monitor(changes: _ChangeQueue) -> Callable[[], None]:
+    """Inicia o monitor de arquivos; retorna a função que o encerra."""
+    if Observer is not None:
+        observer = Observer()
+        handler = _EventHandler(changes)
+        for root in _watched_roots():
+            observer.schedule(handler, str(root), recursive=True)
+        observer.schedule(handler, str(config.DEPENDENCIES_FILE.parent), recursive=False)
+        observer.start()
+        print("👀 Monitorando alterações (inotify/watchdog)")
+
+        def stop_observer():
+            observer.stop()
+            observer.join()
+        return stop_observer
+
+    stop = threading.Event()
+    threading.Thread(target=_poll, args=(changes, stop), daemon=True).start()
+    print(f"👀 Monitorando alterações (varredura a cada {config.WATCH_POLL_INTERVAL:g}s; "
+          f"instale watchdog para inotify)")
+    return stop.set
+
+# =============================================================================
+# MÓDULOS AFETADOS
+# =============================================================================
+
+def _is_within(path: Path, root: Path) -> bool:
+    try:
+        path.relative_to(root)
+        return True
+    except ValueError:
+        return False
+
+def testbench_modules(path: Path, dependencies: Dict) -> Set[str]:
+    """Módulos que usam o testbench: "__testbenches__" ou regras de nome.
+
+    Módulos com testbenches declarados não seguem as regras de nome
+    (mesma precedência de simulation.find_testbenches).
+    """
+    relative = path.relative_to(config.TB_DIR).as_posix()
+    declared = dependencies.get(project_loader.TESTBENCHES_KEY, {})
+    modules = {
+        module for module in declared
+        if any(entry in (path.name, relative)
+               for entry in project_loader.explicit_testbenches(dependencies, module))
+    }
+    named = module_index.testbench_module(path.name)
+    if named and named not in declared:
+        modules.add(named)
+    return modules
+
+def changed_modules(paths: Set[Path], dependencies: Dict) -> Optional[Set[str]]:
+    """Módulos alterados; None se a mudança afeta todos (SDC, dependencies.json)."""
+    modules = set()
+    for path in paths:
+        if path.resolve() == config.DEPENDENCIES_FILE.resolve():
+            return None
+        if path.suffix not in (".v", ".sv", ".sdc"):
+            continue
+        if path.suffix == ".sdc" and _is_within(path, config.SDC_DIR):
+            return None
+        if _is_within(path, config.TB_DIR):
+            # Arquivo auxiliar de testbench sem módulo associado: vale o nome
+            modules |= testbench_modules(path, dependencies) or {path.stem}
+        elif _is_within(path, config.RTL_DIR):
+            modules.add(path.stem)
+    return modules
+
+def affected_modules(changed: Set[str], graph: project_loader.DependencyGraph) -> Set[str]:
+    """Módulos alterados mais todos os que dependem deles (grafo reverso)."""
+    affected = set(changed)
+    for module in changed:
+        affected |= graph.dependents(module)
+    return affected
+
+# =============================================================================
+# LAÇO PRINCIPAL
+# =============================================================================
+
+def _merge_rows(rows: List[Dict], modules: Set[str], new_rows: List[Dict]) -> List[Dict]:
+    """Substitui as linhas de relatório dos módulos reconstruídos."""
+    return [row for row in rows if row["Project"] not in modules] + new_rows
+
+def _refresh_sim_only(overrides: Dict) -> Tuple[Dict, Dict[str, str]]:
+    """Reavalia o modo sim-only para a rajada atual (--detect-changes)."""
+    snapshot = build_cache.compute_source_snapshot()
+    sim_only = build_cache.only_testbenches_changed(snapshot)
+    if sim_only != overrides.get("SIM_ONLY"):
+        print("🧪 Apenas testbenches mudaram: modo sim-only" if sim_only
+              else "🏗️ Fontes de projeto mudaram: Quartus reativado")
+    scheduler.apply_overrides({"SIM_ONLY": sim_only})
+    return dict(overrides, SIM_ONLY=sim_only), snapshot
+
+def watch(dependencies: Dict, bitwidths: List[int], run_simulations: bool,
+          jobs: int, overrides: Dict, report_rows: List[Dict], detect_changes: bool = False):
+    """Reconstrói os módulos afetados a cada rajada de alterações (Ctrl+C encerra).
+
+    Com `detect_changes`, SIM_ONLY é recalculado a cada rajada a partir do
+    snapshot das fontes, salvo após cada reconstrução completa sem falhas.
+    """
+    changes = _ChangeQueue()
+    stop_monitor = _start_monitor(changes)
+
+    try:
+        while True:
+            paths = changes.drain(config.WATCH_DEBOUNCE_S)
+            module_index.invalidate()
+
+            modules = changed_modules(paths, dependencies)
+            if modules is None:
+                print("\n🔁 dependencies.json ou SDC alterado: reconstruindo todos os módulos")
+                dependencies = project_loader.load_dependencies()
+                affected = None
+            else:
+                if not modules:
+                    continue
+                graph = project_loader.dependency_graph(dependencies)
+                affected = affected_modules(modules, graph)
+                print(f"\n🔁 Alterado(s): {', '.join(sorted(modules))} → "
+                      f"reconstruindo {', '.join(sorted(affected))}")
+
+            # Re-stage: editores que regravam o arquivo quebram os hard links
+            projects = [
+                project_info for project_info in project_loader.load_projects(dependencies)
+                if affected is None or project_info[0] in affected
+            ]
+            if not projects:
+                print("ℹ️ Nenhum projeto afetado")
+                continue
+
+            if detect_changes:
+                overrides, snapshot = _refresh_sim_only(overrides)
+
+            start = time.time()
+            compiled, failed = scheduler.run_projects(
+                projects, dependencies, bitwidths, run_simulations,
+                jobs=jobs, overrides=overrides
+            )
+
+            if detect_changes and not overrides["SIM_ONLY"] and not failed:
+                build_cache.save_source_snapshot(snapshot)
+
+            rebuilt = {project_info[0] for project_info in projects}
+            print("\n📊 Atualizando relatórios dos projetos reconstruídos...")
+            new_rows = report_generator.collect_report_rows(compiled, failed)
+            report_rows = _merge_rows(report_rows, rebuilt, new_rows)
+            report_generator.write_reports(report_rows)
+
+            status = "✅" if not failed else f"⚠️ {len(failed)} variante(s) com falha ou pulada(s);"
+            print(f"{status} {len(rebuilt)} projeto(s) em {time.time() - start:.1f}s. "
+                  f"Aguardando alterações...")
+    except KeyboardInterrupt:
+        print("\n👋 Modo watch encerrado")
+    finally:
+        stop_monitor()